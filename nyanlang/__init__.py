@@ -1,36 +1,138 @@
-from .nyan import NyanInterpreter, NyanEngine, NyanBuilder
-
 from .helper import Param, ParamItem
 from .helper import Helper
 
 import sys
 
+# engine is imported on first use, so commands not running programs start fast
+exports = (
+    "NyanInterpreter", "NyanEngine", "NyanBuilder", "NyanPythonInterpreter", "NyanIO", "AsyncNyanIO", "Program",
+    "NyanBatch", "NyanProfiler", "NyanDebugger", "LimitExceeded",
+)
+
+
+def __getattr__(name):
+    if name in exports:
+        from . import nyan
+        return getattr(nyan, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def return_(v, e=1):
     print(v)
     exit(e)
 
 
+def limits(options):
+    values = {}
+    for flag, name, kind in (
+        ("--max-instructions", "max_instructions", int),
+        ("--max-tape", "max_tape", int),
+        ("--timeout", "timeout", float),
+    ):
+        if flag in options:
+            if len(options) == options.index(flag)+1:
+                raise IndexError(f"'{flag}' parameter value not specified.")
+            values[name] = kind(options[options.index(flag)+1])
+    return values
+
+
 helpgen = Helper(__file__)
 
+
+def optimize_param():
+    return Param(
+        "optimize",
+        "Optimize",
+        ParamItem("-O", "Merge moves and adds, and replace clear, scan and multiply loops with one instruction"),
+        ParamItem("negative cells", "Clear and multiply loops over a negative cell still run forever, and ~냥- is kept"),
+        optional=True,
+        kw="O"
+    )
+
+# help texts are built only when shown
 HELP = {
-    "_": helpgen.help(
+    "_": lambda: helpgen.help(
         "",
         Param(
             "command",
             "Commands",
             ParamItem("run", "Run a file"),
+            ParamItem("build", "Build a file to binary"),
+            ParamItem("compile", "Compile a file to Python source code"),
+            ParamItem("batch", "Run a file over many input files"),
+            ParamItem("profile", "Run a file and report where it spends time"),
+            ParamItem("debug", "Run a file step by step, with breakpoints and watchpoints"),
+            ParamItem("bench", "Run benchmark suite"),
         )
     ),
-    "run": helpgen.help(
+    "run": lambda: helpgen.help(
         "run",
         Param("filename", "", no_desc=True),
-        Param("debug", "", no_desc=True, optional=True, kw="d")
+        Param("debug", "", no_desc=True, optional=True, kw="d"),
+        optimize_param(),
+        Param("report", "", no_desc=True, optional=True, kw="r"),
+        Param("py", "", no_desc=True, optional=True, kw="-"),
+        Param("no-cache", "", no_desc=True, optional=True, kw="-"),
+        Param("bytes", "", no_desc=True, optional=True, kw="-"),
+        Param("encoding", "", no_desc=True, optional=True, kw="-"),
+        Param("channel-size", "", no_desc=True, optional=True, kw="-"),
+        Param("workers", "", no_desc=True, optional=True, kw="-"),
+        Param("max-instructions", "", no_desc=True, optional=True, kw="-"),
+        Param("max-tape", "", no_desc=True, optional=True, kw="-"),
+        Param("timeout", "", no_desc=True, optional=True, kw="-"),
+        Param("watch", "", no_desc=True, optional=True, kw="w")
     ),
-    "build": helpgen.help(
+    "build": lambda: helpgen.help(
         "build",
         Param("filename", "", no_desc=True),
-        Param("out", "", no_desc=True, optional=True, kw="o")
+        Param("out", "", no_desc=True, optional=True, kw="o"),
+        optimize_param(),
+        Param("analyze", "", no_desc=True, optional=True, kw="a"),
+        Param("v1", "", no_desc=True, optional=True, kw="-")
+    ),
+    "batch": lambda: helpgen.help(
+        "batch",
+        Param("filename", "", no_desc=True),
+        Param("inputs...", "", no_desc=True),
+        Param("out", "", no_desc=True, optional=True, kw="o"),
+        Param("jobs", "", no_desc=True, optional=True, kw="j"),
+        optimize_param(),
+        Param("py", "", no_desc=True, optional=True, kw="-"),
+        Param("bytes", "", no_desc=True, optional=True, kw="-"),
+        Param("encoding", "", no_desc=True, optional=True, kw="-"),
+        Param("max-instructions", "", no_desc=True, optional=True, kw="-"),
+        Param("max-tape", "", no_desc=True, optional=True, kw="-"),
+        Param("timeout", "", no_desc=True, optional=True, kw="-")
+    ),
+    "profile": lambda: helpgen.help(
+        "profile",
+        Param("filename", "", no_desc=True),
+        optimize_param(),
+        Param("top", "", no_desc=True, optional=True, kw="n"),
+        Param("json", "", no_desc=True, optional=True, kw="-")
+    ),
+    "debug": lambda: helpgen.help(
+        "debug",
+        Param("filename", "", no_desc=True),
+        optimize_param(),
+        Param("input", "", no_desc=True, optional=True, kw="-"),
+        Param("break", "", no_desc=True, optional=True, kw="b"),
+        Param("bytes", "", no_desc=True, optional=True, kw="-")
+    ),
+    "bench": lambda: helpgen.help(
+        "bench",
+        Param("directories...", "", no_desc=True, optional=True),
+        Param("out", "", no_desc=True, optional=True, kw="o"),
+        Param("compare", "", no_desc=True, optional=True, kw="-"),
+        Param("repeat", "", no_desc=True, optional=True, kw="r"),
+        Param("paths", "", no_desc=True, optional=True, kw="-")
+    ),
+    "compile": lambda: helpgen.help(
+        "compile",
+        Param("filename", "", no_desc=True),
+        Param("py", "", no_desc=True, kw="-"),
+        Param("out", "", no_desc=True, optional=True, kw="o"),
+        optimize_param()
     )
 }
 
@@ -38,31 +140,208 @@ HELP = {
 def main():
     match sys.argv:
         case [_]:
-            return_(HELP["_"])
+            return_(HELP["_"]())
         case [_, "run"]:
-            return_(HELP["run"])
+            return_(HELP["run"]())
         case [_, "run", f, *options]:
+            from .nyan import NyanEngine, NyanIO, LimitExceeded
+
             debug = False
             if "-d" in options or "--debug" in options:
                 debug = True
-            NyanEngine(f, debug=debug).run()
+            optimize = False
+            if "-O" in options or "--optimize" in options:
+                optimize = True
+            backend = "python" if "--py" in options else "interpreter"
+            cache = "--no-cache" not in options
+            io = NyanIO(mode="bytes" if "--bytes" in options else "text")
+            if "--encoding" in options:
+                if len(options) == options.index("--encoding")+1:
+                    raise IndexError("'--encoding' parameter value not specified.")
+                io = NyanIO(
+                    sys.stdin.buffer, sys.stdout.buffer,
+                    mode=io.mode, encoding=options[options.index("--encoding")+1]
+                )
+            channel_size = 1
+            if "--channel-size" in options:
+                if len(options) == options.index("--channel-size")+1:
+                    raise IndexError("'--channel-size' parameter value not specified.")
+                channel_size = int(options[options.index("--channel-size")+1])
+            workers = None
+            if "--workers" in options:
+                if len(options) == options.index("--workers")+1:
+                    raise IndexError("'--workers' parameter value not specified.")
+                workers = int(options[options.index("--workers")+1])
+            if "-w" in options or "--watch" in options:
+                from .watcher import NyanWatcher
+
+                watcher = NyanWatcher(
+                    f, report="-r" in options or "--report" in options, debug=debug, optimize=optimize,
+                    backend=backend, cache=cache, io=io, channel_size=channel_size, workers=workers, **limits(options)
+                )
+                try:
+                    watcher.run()
+                except KeyboardInterrupt:
+                    pass
+                return
+            engine = NyanEngine(
+                f, debug=debug, optimize=optimize, backend=backend, cache=cache, io=io, channel_size=channel_size,
+                workers=workers, **limits(options)
+            )
+            if "-r" in options or "--report" in options:
+                for line in engine.optimization_report():
+                    print(line, file=sys.stderr)
+            try:
+                engine.run()
+            except LimitExceeded as error:
+                print(error, file=sys.stderr)
+                exit(1)
         case [_, "build"]:
-            return_(HELP["build"])
+            return_(HELP["build"]())
         case [_, "build", f, *options]:
+            from .nyan import NyanBuilder
+
             out = None
-            if "-o" in options:
-                if len(options) == options.index("-o")+1:
-                    raise IndexError("'-o' parameter value not specified.")
-                out = options[options.index("-o")+1]
-            elif "--out" in options:
-                if len(options) == options.index("--out")+1:
-                    raise IndexError("'--out' parameter value not specified.")
-            NyanBuilder(f).build(output=out)
+            for flag in ("-o", "--out"):
+                if flag in options:
+                    if len(options) == options.index(flag)+1:
+                        raise IndexError(f"'{flag}' parameter value not specified.")
+                    out = options[options.index(flag)+1]
+            optimize = "-O" in options or "--optimize" in options
+            version = 1 if "--v1" in options else 2
+            builder = NyanBuilder(f, optimize=optimize, version=version)
+            if "-a" in options or "--analyze" in options:
+                for line in builder.analysis_report():
+                    print(line, file=sys.stderr)
+            builder.build(output=out)
+        case [_, "batch"] | [_, "batch", _]:
+            return_(HELP["batch"]())
+        case [_, "batch", f, *options]:
+            from .nyan import NyanBatch
+            import json
+            from pathlib import Path
+            import time
+
+            # values by full option name, short options being aliases
+            aliases = {"-o": "--out", "-j": "--jobs"}
+            values = {}
+            inputs = []
+            index = 0
+            while index < len(options):
+                option = options[index]
+                if option in (
+                    "-o", "--out", "-j", "--jobs", "--encoding", "--max-instructions", "--max-tape", "--timeout"
+                ):
+                    if len(options) == index+1:
+                        raise IndexError(f"'{option}' parameter value not specified.")
+                    values[aliases.get(option, option)] = options[index+1]
+                    index += 2
+                    continue
+                if not option.startswith("-"):
+                    path = Path(option)
+                    inputs += sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+                index += 1
+            batch = NyanBatch(
+                f, workers=int(values["--jobs"]) if "--jobs" in values else None,
+                optimize="-O" in options or "--optimize" in options,
+                backend="python" if "--py" in options else "interpreter",
+                mode="bytes" if "--bytes" in options else "text", encoding=values.get("--encoding", "utf-8"),
+                **limits(options)
+            )
+            failed = 0
+            start = time.perf_counter()
+            if "--out" in values:
+                results = batch.write(inputs, values["--out"])
+            else:
+                results = batch.run(inputs)
+            for result in results:
+                if "--out" not in values:
+                    print(json.dumps(result.record()), flush=True)
+                if result.error is not None:
+                    failed += 1
+                    print(f"{result.input}: failed in {result.seconds:.6f}s - {result.error}", file=sys.stderr)
+                else:
+                    print(f"{result.input}: {result.seconds:.6f}s", file=sys.stderr)
+            print(
+                f"{len(inputs)} inputs, {failed} failed in {time.perf_counter() - start:.3f}s", file=sys.stderr
+            )
+            if failed:
+                exit(1)
+        case [_, "profile"]:
+            return_(HELP["profile"]())
+        case [_, "profile", f, *options]:
+            from .nyan import NyanProfiler
+            import json
+
+            top = 10
+            for flag in ("-n", "--top"):
+                if flag in options:
+                    if len(options) == options.index(flag)+1:
+                        raise IndexError(f"'{flag}' parameter value not specified.")
+                    top = int(options[options.index(flag)+1])
+            profiler = NyanProfiler(f, optimize="-O" in options or "--optimize" in options)
+            profiler.run()
+            if "--json" in options:
+                if len(options) == options.index("--json")+1:
+                    raise IndexError("'--json' parameter value not specified.")
+                with open(options[options.index("--json")+1], "w", encoding="utf-8") as _f:
+                    json.dump(profiler.data(), _f, indent=2)
+            else:
+                for line in profiler.report(top):
+                    print(line, file=sys.stderr)
+        case [_, "debug"]:
+            return_(HELP["debug"]())
+        case [_, "debug", f, *options]:
+            from .nyan import NyanDebugger, NyanIO
+            from io import BytesIO
+
+            # standard input is for debugger commands, so program reads from --input file
+            stdin = BytesIO()
+            if "--input" in options:
+                if len(options) == options.index("--input")+1:
+                    raise IndexError("'--input' parameter value not specified.")
+                stdin = open(options[options.index("--input")+1], "rb")
+            breakpoints = []
+            for index, option in enumerate(options):
+                if option in ("-b", "--break"):
+                    if len(options) == index+1:
+                        raise IndexError(f"'{option}' parameter value not specified.")
+                    breakpoints.append(options[index+1])
+            debugger = NyanDebugger(
+                f, optimize="-O" in options or "--optimize" in options,
+                io=NyanIO(stdin, mode="bytes" if "--bytes" in options else "text")
+            )
+            for spec in breakpoints:
+                debugger.add_breakpoint(spec)
+            if breakpoints:
+                debugger.stepping = None
+            debugger.run()
+        case [_, "bench", *options]:
+            from .benchmark import main as bench
+            bench(options)
+        case [_, "compile"]:
+            return_(HELP["compile"]())
+        case [_, "compile", f, *options]:
+            if "--py" not in options:
+                return_(HELP["compile"]())
+            from .nyan import NyanPythonInterpreter
+            from pathlib import Path
+
+            out = None
+            for flag in ("-o", "--out"):
+                if flag in options:
+                    if len(options) == options.index(flag)+1:
+                        raise IndexError(f"'{flag}' parameter value not specified.")
+                    out = options[options.index(flag)+1]
+            optimize = "-O" in options or "--optimize" in options
+            NyanPythonInterpreter(Path(f).absolute(), optimize=optimize).init().export(output=out)
         case cmd:
-            try:
-                __import__("nyan_ext_"+cmd[1]).run()
-            except ModuleNotFoundError:
+            from .extensions import ExtensionRegistry
+
+            command = ExtensionRegistry().resolve(cmd[1])
+            if command is None:
                 return_(f"Invalid command \"{sys.argv[1]}\"")
+            command()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,13 @@
+from .nyan import NyanInterpreter, NyanEngine, NyanBuilder, NyanPythonInterpreter, NyanIO, AsyncNyanIO, Program
+from .nyan import NyanBatch, NyanProfiler, NyanDebugger, LimitExceeded
+from .helper import Param, ParamItem, Helper
+
+exports: tuple[str, ...]
+"""Names of :mod:`nyanlang.nyan` available here, which is imported when one is first used."""
+
+
+def main():
+    """
+    Entry point of ``nyan`` command. Engine is only imported by commands which use it,
+    and other commands are run by extensions, see :class:`nyanlang.extensions.ExtensionRegistry`.
+    """
@@ -0,0 +1,233 @@
+from .nyan import NyanEngine, NyanBuilder, NyanProfiler, NyanIO, NyanInterpreter
+
+import hashlib
+from io import BytesIO
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+class Workload:
+    def __init__(self, filename, name=None):
+        self.filename = Path(filename).absolute()
+        self.name = name or self.filename.stem
+        input_path = self.filename.with_suffix(".in")
+        self.input = input_path.read_bytes() if input_path.exists() else b""
+        self.linked = self.filename.with_suffix(".mouse").exists()
+
+    @classmethod
+    def discover(cls, directories):
+        workloads = []
+        for directory in directories:
+            files = sorted(Path(directory).rglob("*.nyan"))
+            modules = set()
+            for mouse in Path(directory).rglob("*.mouse"):
+                for line in mouse.read_text(encoding="utf-8").splitlines():
+                    if ":" in line:
+                        modules.add((mouse.parent / line.split(":", 1)[1].strip()).absolute())
+            prefix = Path(Path(directory).absolute().name)
+            workloads += [
+                cls(filename, (prefix / filename.relative_to(directory)).with_suffix("").as_posix())
+                for filename in files if filename.absolute() not in modules
+            ]
+        return workloads
+
+
+class BenchmarkRunner:
+    paths = ("text", "text-O", "python", "python-O", "bundle", "bundle-O", "v1", "workers", "cli")
+    workers = 2
+
+    def __init__(self, workloads, paths=None, repeat=3):
+        self.workloads = workloads
+        self.paths = tuple(paths) if paths else self.paths
+        self.repeat = repeat
+        self.directory = None
+
+    def prepare(self, workload, path):
+        # binary paths are built before measuring, so startup is loading time only
+        optimize = path.endswith("-O")
+        kind = path.split("-")[0]
+        if kind == "cli":
+            return workload.filename, {"cli": True}
+        if kind in ("text", "python"):
+            return workload.filename, {"optimize": optimize, "backend": "interpreter" if kind == "text" else kind}
+        if kind == "workers":
+            # a single cat has nothing to run beside it
+            return (workload.filename, {"workers": self.workers}) if workload.linked else (None, None)
+        if kind == "v1" and workload.linked:
+            return None, None
+        output = Path(self.directory) / f"{workload.name.replace('/', '-')}-{path}.nya"
+        NyanBuilder(workload.filename, optimize=optimize, version=1 if kind == "v1" else 2).build(output=output)
+        return output, {}
+
+    def launch(self, workload, filename):
+        # fresh `nyan` processes, as shell pipelines pay their startup for every input
+        command = [sys.executable, "-c", "from nyanlang import main; main()"]
+        path = os.environ.get("PYTHONPATH")
+        package = str(Path(__file__).absolute().parent.parent)
+        env = {**os.environ, "PYTHONPATH": package + os.pathsep + path if path else package}
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, env=env)
+        started = time.perf_counter()
+        process = subprocess.run(
+            [*command, "run", str(filename), "--bytes", "--no-cache"], input=workload.input, capture_output=True,
+            env=env, check=True
+        )
+        return started - start, time.perf_counter() - started, process.stdout
+
+    def execute(self, workload, filename, options):
+        if options.get("cli"):
+            return self.launch(workload, filename)
+        output = BytesIO()
+        io = NyanIO(BytesIO(workload.input), output, mode="bytes")
+        # programs compiled by earlier runs would make startup a lookup
+        NyanInterpreter.compiled.clear()
+        start = time.perf_counter()
+        engine = NyanEngine(filename, cache=False, io=io, **options)
+        loaded = time.perf_counter()
+        engine.run()
+        return loaded - start, time.perf_counter() - loaded, output.getvalue()
+
+    def instructions(self, workload):
+        profiler = NyanProfiler(workload.filename, cache=False, io=NyanIO(BytesIO(workload.input), BytesIO()))
+        profiler.run()
+        return sum(sum(profile.counts) for profile in profiler.profiles())
+
+    def measure(self, workload, path, instructions):
+        filename, options = self.prepare(workload, path)
+        if filename is None:
+            return None
+        runs = [self.execute(workload, filename, options) for _ in range(self.repeat)]
+        startup = min(run[0] for run in runs)
+        seconds = min(run[1] for run in runs)
+        peak = None
+        if not options.get("cli"):
+            tracemalloc.start()
+            try:
+                self.execute(workload, filename, options)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return {
+            "workload": workload.name,
+            "path": path,
+            "startup": startup,
+            "seconds": seconds,
+            "instructions": instructions,
+            "ips": instructions / seconds if seconds else 0.0,
+            "peak_memory": peak,
+            # version 1 binaries don't end with blank lines, so they are left out of comparison
+            "output": hashlib.sha256(runs[0][2].rstrip(b"\n")).hexdigest(),
+        }
+
+    def run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.directory = directory
+            for workload in self.workloads:
+                instructions = self.instructions(workload)
+                for path in self.paths:
+                    result = self.measure(workload, path, instructions)
+                    if result is not None:
+                        yield result
+        self.directory = None
+
+    @staticmethod
+    def environment():
+        try:
+            from importlib.metadata import version
+            nyanlang_version = version("nyanlang")
+        except Exception:
+            nyanlang_version = "unknown"
+        return {
+            "nyanlang": nyanlang_version,
+            "python": sys.version.split()[0],
+            "implementation": sys.implementation.name,
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpus": os.cpu_count(),
+        }
+
+    @staticmethod
+    def format(result):
+        return (
+            f"{result['workload']:<28} {result['path']:<10}{result['ips'] / 1e6:>8.2f} Minstr/s"
+            f"{result['seconds']:>10.4f}s run{result['startup'] * 1e3:>10.2f}ms startup"
+            + (f"{result['peak_memory'] / 1024:>10.0f}KiB peak" if result["peak_memory"] is not None else "")
+        )
+
+    @staticmethod
+    def compare(old, new, threshold=0.1):
+        lines = []
+        baseline = {(result["workload"], result["path"]): result for result in old["results"]}
+        for result in new["results"]:
+            before = baseline.get((result["workload"], result["path"]))
+            if before is None:
+                continue
+            ratio = result["seconds"] / before["seconds"] if before["seconds"] else 1.0
+            mark = ""
+            if before["output"] != result["output"]:
+                mark = "  OUTPUT CHANGED"
+            elif ratio > 1 + threshold:
+                mark = "  REGRESSION"
+            elif ratio < 1 - threshold:
+                mark = "  improved"
+            lines.append(f"{result['workload']:<28} {result['path']:<10}{ratio:>8.2f}x time{mark}")
+        return lines
+
+    @staticmethod
+    def contention(results):
+        # cats talking more than they compute wait on messages crossing processes
+        text = {result["workload"]: result["seconds"] for result in results if result["path"] == "text"}
+        return [
+            (result["workload"], result["seconds"] / text[result["workload"]])
+            for result in results
+            if result["path"] == "workers" and result["seconds"] > text.get(result["workload"], result["seconds"])
+        ]
+
+    @staticmethod
+    def mismatches(results):
+        outputs = {}
+        for result in results:
+            outputs.setdefault(result["workload"], set()).add(result["output"])
+        return [workload for workload, hashes in outputs.items() if len(hashes) > 1]
+
+
+def main(options):
+    directories = [option for option in options if not option.startswith("-") and Path(option).is_dir()]
+    if not directories:
+        directories = [directory for directory in ("benchmarks", "examples") if Path(directory).is_dir()]
+    values = {}
+    for flag in ("-o", "--out", "--compare", "-r", "--repeat", "--paths"):
+        if flag in options:
+            if len(options) == options.index(flag)+1:
+                raise IndexError(f"'{flag}' parameter value not specified.")
+            values[flag.lstrip("-")[0] if flag not in ("--compare", "--paths") else flag[2:]] = \
+                options[options.index(flag)+1]
+    runner = BenchmarkRunner(
+        Workload.discover(directories),
+        paths=values["paths"].split(",") if "paths" in values else None,
+        repeat=int(values.get("r", 3)),
+    )
+    results = []
+    for result in runner.run():
+        results.append(result)
+        print(runner.format(result), flush=True)
+    report = {"environment": runner.environment(), "results": results}
+    for workload in runner.mismatches(results):
+        print(f"{workload}: output differs between paths", file=sys.stderr)
+    for workload, ratio in runner.contention(results):
+        print(f"{workload}: workers are {ratio:.1f}x slower than text, its cats wait on messages", file=sys.stderr)
+    if "o" in values:
+        with open(values["o"], "w", encoding="utf-8") as _f:
+            json.dump(report, _f, indent=2)
+    if "compare" in values:
+        with open(values["compare"], "r", encoding="utf-8") as _f:
+            for line in runner.compare(json.load(_f), report):
+                print(line)
+    return report
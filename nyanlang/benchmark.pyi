@@ -0,0 +1,138 @@
+import collections
+from pathlib import Path
+
+
+class Workload:
+    """
+    Program measured by :class:`BenchmarkRunner`.\n
+    Input is read from ``<stem>.in`` next to program, if it exists.
+    """
+    filename: Path
+    name: str
+    input: bytes
+    linked: bool
+    """True if program has mouse info, which version 1 binary cannot carry."""
+
+    def __init__(self, filename, name=None):
+        """
+        :param str | Path filename:
+        :param str | None name: name in results, stem of filename if None.
+        """
+
+    @classmethod
+    def discover(cls, directories) -> list[Workload]:
+        """
+        Find every program in directories, except modules linked by mouse info.\n
+        Each is named by directory name and its path in directory, e.g. ``benchmarks/pingpong/main``.
+        :param collections.Iterable[str | Path] directories:
+        """
+
+
+class BenchmarkRunner:
+    """
+    Runs every workload through every execution path, and measures them.\n
+    Paths are ``text`` (:class:`NyanInterpreter`), ``python`` (:class:`NyanPythonInterpreter`),
+    ``bundle`` (:class:`NyanBinaryInterpreter` running version 2 build) and ``v1`` (version 1 build),
+    with ``-O`` for optimized instructions, ``workers`` which runs cats of linked programs in `workers` processes,
+    and ``cli`` which runs ``nyan run`` in a new process.\n
+    Each result has:
+     + `startup`: seconds taken to load engine, without cache. For ``cli``, seconds taken by ``nyan`` process
+       which only prints help, so it's the fixed cost of every invocation
+     + `seconds`: seconds taken to run, least of `repeat` runs
+     + `instructions`: instructions run by unoptimized text program, counted by :class:`NyanProfiler`
+     + `ips`: instructions per second, comparable between paths as instructions are the same
+     + `peak_memory`: peak bytes allocated while loading and running, measured by a separate run.
+       None for ``cli``
+     + `output`: hash of output without trailing newlines, which version 1 binaries don't write
+    """
+    paths: tuple[str, ...]
+    workers: int
+    """Worker processes of ``workers`` path."""
+    workloads: list[Workload]
+    repeat: int
+    directory: str | None
+
+    def __init__(self, workloads, paths=None, repeat=3):
+        """
+        :param list[Workload] workloads:
+        :param collections.Iterable[str] | None paths: paths to measure, every path if None.
+        :param int repeat: runs of each path
+        """
+
+    def prepare(self, workload, path) -> tuple[Path | None, dict | None]:
+        """
+        Build binary of path if needed.
+        :return: file to run and options of :class:`NyanEngine`, None if workload can't run in path.
+        """
+
+    def launch(self, workload, filename) -> tuple[float, float, bytes]:
+        """
+        Run ``nyan`` without command and ``nyan run`` of program, each in a new process.
+        :return: seconds of ``nyan`` process, seconds of ``nyan run`` process and its output
+        """
+
+    def execute(self, workload, filename, options) -> tuple[float, float, bytes]:
+        """
+        Load and run program once.
+        :return: startup seconds, run seconds and output
+        """
+
+    def instructions(self, workload) -> int:
+        """
+        :return: instructions run by unoptimized text program
+        """
+
+    def measure(self, workload, path, instructions) -> dict | None:
+        """
+        :return: result of workload in path, None if workload can't run in path.
+        """
+
+    def run(self) -> collections.Generator[dict, None, None]:
+        """
+        Measure every workload in every path, yielding each result.
+        """
+
+    @staticmethod
+    def environment() -> dict:
+        """
+        :return: versions and machine, stored with results.
+        """
+
+    @staticmethod
+    def format(result) -> str:
+        """
+        :return: result as a line of report.
+        """
+
+    @staticmethod
+    def compare(old, new, threshold=0.1) -> list[str]:
+        """
+        Compare run time of results of same workload and path.
+        :param dict old: stored results
+        :param dict new: stored results
+        :param float threshold: ratio of change which is reported as regression or improvement
+        :return: report lines
+        """
+
+    @staticmethod
+    def contention(results) -> list[tuple[str, float]]:
+        """
+        Workers only pay off when cats compute a lot between messages, as every message crosses processes.
+        :return: name of each workload whose ``workers`` path is slower than ``text``, and how many times slower.
+        """
+
+    @staticmethod
+    def mismatches(results) -> list[str]:
+        """
+        :return: names of workloads whose output differs between paths.
+        """
+
+
+def main(options) -> dict:
+    """
+    ``nyan bench [directories...] [-o results.json] [--compare old.json] [-r N] [--paths text,python]``\n
+    Runs benchmarks of directories, ``benchmarks`` and ``examples`` of current directory by default.
+    Workloads whose output differs between paths, or which run slower with workers, are reported to standard error.
+    :param list[str] options: command line options
+    :return: stored results
+    """
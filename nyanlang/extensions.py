@@ -0,0 +1,100 @@
+import importlib
+import json
+import os
+from pathlib import Path
+import sys
+
+
+class ExtensionRegistry:
+    group = "nyanlang.commands"
+    prefix = "nyan_ext_"
+    version = 1
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else self.default_path()
+        self.commands = None
+
+    @staticmethod
+    def default_path():
+        cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return Path(cache) / "nyanlang" / "extensions.json"
+
+    @staticmethod
+    def stamp():
+        # installing or removing a package changes its directory on path, which makes index stale
+        stamp = []
+        for entry in sys.path:
+            try:
+                stamp.append([entry, os.stat(entry or ".").st_mtime_ns])
+            except OSError:
+                stamp.append([entry, None])
+        return stamp
+
+    def scan(self):
+        import pkgutil
+        from importlib.metadata import entry_points
+
+        commands = {}
+        for entry in entry_points(group=self.group):
+            commands[entry.name] = entry.value
+        # nyan_ext_<command> modules were the only extensions before entry points, so they keep their commands
+        for module in pkgutil.iter_modules():
+            if module.name.startswith(self.prefix):
+                commands[module.name[len(self.prefix):]] = f"{module.name}:run"
+        return commands
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as _f:
+                index = json.load(_f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(index, dict) or index.get("version") != self.version:
+            return None
+        if index.get("executable") != sys.executable or index.get("stamp") != self.stamp():
+            return None
+        return index.get("commands")
+
+    def store(self, commands):
+        index = {"version": self.version, "executable": sys.executable, "stamp": self.stamp(), "commands": commands}
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "w", encoding="utf-8") as _f:
+                json.dump(index, _f, indent=2)
+            os.replace(temporary, self.path)
+        except OSError:
+            # commands still work without index, found again by next invocation
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+    def refresh(self):
+        self.commands = self.scan()
+        self.store(self.commands)
+        return self.commands
+
+    def find(self, name):
+        if self.commands is None:
+            self.commands = self.load()
+            if self.commands is None:
+                self.refresh()
+        return self.commands.get(name)
+
+    def resolve(self, name):
+        target = self.find(name)
+        if target is None:
+            return None
+        module_name, _, attribute = target.partition(":")
+        try:
+            value = importlib.import_module(module_name)
+        except ModuleNotFoundError as error:
+            if error.name != module_name:
+                raise
+            # module is gone without path changing, e.g. removed by hand
+            self.refresh()
+            return None
+        for part in attribute.split(".") if attribute else ():
+            value = getattr(value, part)
+        return value
@@ -0,0 +1,75 @@
+from pathlib import Path
+import typing
+
+
+class ExtensionRegistry:
+    """
+    Commands of extensions, run by ``nyan <command>``.\n
+    Extensions are entry points of group ``nyanlang.commands``, e.g. in ``pyproject.toml``::
+
+        [tool.poetry.plugins."nyanlang.commands"]
+        greet = "nyan_greet:main"
+
+    or modules named ``nyan_ext_<command>`` with ``run()``, which take precedence.\n
+    Finding them searches every installed package, so found commands are kept in an index file,
+    which is used while directories of ``sys.path`` are unchanged and interpreter is the same.
+    """
+    group: str
+    prefix: str
+    version: int
+    """Version of index format."""
+    path: Path
+    commands: dict[str, str] | None
+    """``module:attribute`` of each command, None before index is loaded."""
+
+    def __init__(self, path=None):
+        """
+        :param str | Path | None path: index file, :meth:`default_path` if None.
+        """
+
+    @staticmethod
+    def default_path() -> Path:
+        """
+        :return: ``nyanlang/extensions.json`` in ``$XDG_CACHE_HOME``, or ``~/.cache``.
+        """
+
+    @staticmethod
+    def stamp() -> list[list]:
+        """
+        :return: every directory of ``sys.path`` with its modification time, which changes as packages are installed.
+        """
+
+    def scan(self) -> dict[str, str]:
+        """
+        Find every extension command, without index.
+        :return: ``module:attribute`` of each command
+        """
+
+    def load(self) -> dict[str, str] | None:
+        """
+        :return: commands of index file, None if it's missing or stale.
+        """
+
+    def store(self, commands):
+        """
+        Write index file. Commands still run if it can't be written, and are found again next time.
+        :param dict[str, str] commands:
+        """
+
+    def refresh(self) -> dict[str, str]:
+        """
+        :meth:`scan` and :meth:`store` commands.
+        """
+
+    def find(self, name) -> str | None:
+        """
+        :param str name: command
+        :return: ``module:attribute`` of command, None if no extension has it.
+        """
+
+    def resolve(self, name) -> typing.Callable[[], typing.Any] | None:
+        """
+        Import function of command. Index is refreshed if its module is gone.
+        :param str name: command
+        :return: function, None if no extension has command.
+        """
@@ -16,7 +16,10 @@ class Param:
         self.description_name = description_name
         self.items: tuple[ParamItem, ...] = items
         self.no = no_desc
-        if kw:
+        if kw == "-":
+            # long option without short one
+            self.command_name = self.command_name[:1] + f"--{self.command_name[1:]}"
+        elif kw:
             self.command_name = self.command_name[:1] + f"-{kw} | --{self.command_name[1:]}"
 
 
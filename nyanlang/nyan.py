@@ -1,44 +1,89 @@
 import os
+from array import array
+from bisect import bisect_right
+import codecs
+import copy
+from collections import deque
+import hashlib
+from io import BytesIO, StringIO, TextIOBase
+import marshal
 from pathlib import Path
 import re
+import struct
 import sys
-import logging
+import time
+from types import MappingProxyType
+import zlib
 
-logging.basicConfig(level=logging.ERROR)
+# asyncio, multiprocessing, threading, queue and json are imported by the features using them,
+# as importing them costs more than running most programs.
 
-_logger = logging.getLogger("NyanEngine")
+
+class NyanLogger:
+    # messages can only be shown by someone who imported logging and configured it,
+    # so logging isn't imported just to drop them
+    def __init__(self, name):
+        self.name = name
+
+    def logger(self):
+        logging = sys.modules.get("logging")
+        return logging.getLogger(self.name) if logging is not None else None
+
+    def enabled(self, level):
+        logger = self.logger()
+        return logger is not None and logger.isEnabledFor(sys.modules["logging"].getLevelName(level))
+
+    def debug(self, message, *args):
+        logger = self.logger()
+        if logger is not None:
+            logger.debug(message, *args)
+
+    def info(self, message, *args):
+        logger = self.logger()
+        if logger is not None:
+            logger.info(message, *args)
+
+
+_logger = NyanLogger("NyanEngine")
 
 
 class Communicator:
-    def __init__(self, nyan_a, nyan_b):
+    def __init__(self, nyan_a, nyan_b, capacity=1):
+        if capacity < 1:
+            raise ValueError("Capacity of communicator must be at least 1")
         self.nyan_a = nyan_a
         self.nyan_b = nyan_b
-        self.a_to_b_fill = False
-        self.b_to_a_fill = False
-        self.a_to_b = None
-        self.b_to_a = None
+        self.capacity = capacity
+        self.a_to_b = deque(maxlen=capacity)
+        self.b_to_a = deque(maxlen=capacity)
 
     def send(self, nyan, data):
         if nyan == self.nyan_a:
-            self.a_to_b = data
-            self.a_to_b_fill = True
+            self.a_to_b.append(data)
+            return len(self.a_to_b) == self.capacity
         elif nyan == self.nyan_b:
-            self.b_to_a = data
-            self.b_to_a_fill = True
+            self.b_to_a.append(data)
+            return len(self.b_to_a) == self.capacity
         else:
             raise ValueError("Invalid nyan")
 
     def receive(self, nyan):
         if nyan == self.nyan_a:
-            if self.b_to_a_fill is False:
+            if not self.b_to_a:
                 return None
-            self.b_to_a_fill = False
-            return self.b_to_a
+            return self.b_to_a.popleft()
         elif nyan == self.nyan_b:
-            if self.a_to_b_fill is False:
+            if not self.a_to_b:
                 return None
-            self.a_to_b_fill = False
-            return self.a_to_b
+            return self.a_to_b.popleft()
+        else:
+            raise ValueError("Invalid nyan")
+
+    def pending(self, nyan):
+        if nyan == self.nyan_a:
+            return len(self.a_to_b)
+        elif nyan == self.nyan_b:
+            return len(self.b_to_a)
         else:
             raise ValueError("Invalid nyan")
 
@@ -58,7 +103,35 @@ class Signals:
     KEEP_GOING = 4
 
 
+class Opcodes:
+    ADD = 0
+    MOVE = 1
+    JUMP_ZERO = 2
+    JUMP_NONZERO = 3
+    OUTPUT = 4
+    INPUT = 5
+    PRINT = 6
+    MODULE_MOVE = 7
+    TOGGLE = 8
+    READ = 9
+    WRITE = 10
+    CALL = 11
+    HALT = 12
+    SET = 13
+    SCAN = 14
+    MULTIPLY = 15
+
+
+def native(opcode, arg=None):
+    def wrapper(handler):
+        handler.instruction = (opcode, arg)
+        return handler
+    return wrapper
+
+
 class Pointer:
+    __slots__ = ("_v",)
+
     def __init__(self, initial=None):
         if initial is None:
             initial = 0
@@ -77,98 +150,1626 @@ class Pointer:
         return self._v
 
 
+class NyanIO:
+    modes = ("text", "bytes")
+    buffer_size = 1 << 13
+
+    def __init__(
+        self, stdin=None, stdout=None, *,
+        mode="text", encoding="utf-8", errors="strict", buffer_size=None, line_buffering=None
+    ):
+        if mode not in self.modes:
+            raise ValueError(f"Invalid mode {mode} - Mode must be one of {', '.join(self.modes)}")
+        self.stdin = stdin
+        self.stdout = stdout
+        self.mode = mode
+        self.encoding = encoding
+        self.errors = errors
+        if buffer_size is not None:
+            self.buffer_size = buffer_size
+        self.line_buffering = line_buffering
+        self.output = []
+        self.size = 0
+        self.pending = "" if mode == "text" else b""
+        self.position = 0
+        self.decoder = None
+
+    def write(self, value, count=1):
+        data = chr(value) * count if self.mode == "text" else bytes((value,)) * count
+        self.output.append(data)
+        self.size += len(data)
+        if self.size >= self.buffer_size or (value == 10 and self.line_buffered()):
+            self.flush()
+
+    def write_text(self, text):
+        self.write_chunk(text if self.mode == "text" else text.encode(self.encoding, self.errors))
+
+    def write_chunk(self, data):
+        self.output.append(data)
+        self.size += len(data)
+        if self.size >= self.buffer_size or (("\n" if self.mode == "text" else b"\n") in data and self.line_buffered()):
+            self.flush()
+
+    def line_buffered(self):
+        if self.line_buffering is None:
+            stream = self.stdout if self.stdout is not None else sys.stdout
+            try:
+                self.line_buffering = stream.isatty()
+            except (AttributeError, ValueError):
+                self.line_buffering = False
+        return self.line_buffering
+
+    def flush(self):
+        if not self.output:
+            return
+        data = "".join(self.output) if self.mode == "text" else b"".join(self.output)
+        self.output = []
+        self.size = 0
+        stream = self.stdout if self.stdout is not None else sys.stdout
+        if isinstance(stream, TextIOBase):
+            if self.mode == "text":
+                stream.write(data)
+            else:
+                stream.flush()
+                stream = stream.buffer
+                stream.write(data)
+        else:
+            stream.write(data.encode(self.encoding, self.errors) if self.mode == "text" else data)
+        stream.flush()
+
+    def read(self, count=1):
+        value = 0
+        for _ in range(count):
+            if self.position >= len(self.pending) and not self.fill():
+                return 0
+            value = self.pending[self.position]
+            self.position += 1
+        return ord(value) if self.mode == "text" else value
+
+    def read_chunk(self):
+        if self.position >= len(self.pending):
+            self.fill()
+        data = self.pending[self.position:]
+        self.position = len(self.pending)
+        return data
+
+    def fill(self):
+        # output is flushed before blocking on input, so prompts are shown
+        self.flush()
+        stream = self.stdin if self.stdin is not None else sys.stdin
+        encoding = self.encoding
+        if isinstance(stream, TextIOBase):
+            if not hasattr(stream, "buffer"):
+                data = stream.read(self.buffer_size)
+                self.pending = data if self.mode == "text" else data.encode(encoding, self.errors)
+                self.position = 0
+                return bool(data)
+            encoding = stream.encoding or encoding
+            stream = stream.buffer
+        read = getattr(stream, "read1", stream.read)
+        while True:
+            chunk = read(self.buffer_size)
+            if self.mode == "bytes":
+                data = chunk
+            else:
+                if self.decoder is None:
+                    self.decoder = codecs.getincrementaldecoder(encoding)(self.errors)
+                data = self.decoder.decode(chunk, final=not chunk)
+            if data or not chunk:
+                break
+        self.pending = data
+        self.position = 0
+        return bool(data)
+
+    def starved(self, count=1):
+        return False
+
+    def dump(self):
+        # only buffered data is saved, streams are left to their owners
+        return self.mode, self.pending[self.position:], ("" if self.mode == "text" else b"").join(self.output)
+
+    def load(self, state):
+        mode, self.pending, output = state
+        if mode != self.mode:
+            raise ValueError(f"Snapshot of {mode} mode can't be loaded to {self.mode} mode")
+        self.position = 0
+        self.output = [output] if output else []
+        self.size = len(output)
+
+    async def drain(self):
+        self.flush()
+
+
+class AsyncNyanIO(NyanIO):
+    def __init__(self, reader=None, writer=None, **options):
+        super().__init__(**options)
+        self.reader = reader
+        self.writer = writer
+        if writer is not None and self.line_buffering is None:
+            self.line_buffering = False
+        self.eof = reader is None
+        self.wanted = 0
+
+    def flush(self):
+        if self.writer is None:
+            return super().flush()
+        if not self.output:
+            return
+        data = "".join(self.output) if self.mode == "text" else b"".join(self.output)
+        self.output = []
+        self.size = 0
+        self.writer.write(data.encode(self.encoding, self.errors) if self.mode == "text" else data)
+
+    def starved(self, count=1):
+        if self.eof or len(self.pending) - self.position >= count:
+            return False
+        self.wanted = count
+        return True
+
+    def fill(self):
+        # input is only read by fill_async, so it has ended when this is reached
+        self.flush()
+        return False
+
+    async def fill_async(self):
+        await self.drain()
+        count = self.wanted
+        while self.starved(count):
+            chunk = await self.reader.read(self.buffer_size)
+            if isinstance(chunk, str):
+                data = chunk if self.mode == "text" else chunk.encode(self.encoding, self.errors)
+            elif self.mode == "bytes":
+                data = chunk
+            else:
+                if self.decoder is None:
+                    self.decoder = codecs.getincrementaldecoder(self.encoding)(self.errors)
+                data = self.decoder.decode(chunk, final=not chunk)
+            if not chunk:
+                self.eof = True
+            self.pending = self.pending[self.position:] + data
+            self.position = 0
+        self.wanted = 0
+
+    async def drain(self):
+        self.flush()
+        if self.writer is not None:
+            await self.writer.drain()
+
+
+class LimitExceeded(RuntimeError):
+    kinds = ("instructions", "cells", "seconds")
+
+    def __init__(self, kind, limit, filename=None, index=None, position=None):
+        self.kind = kind
+        self.limit = limit
+        self.filename = filename
+        self.index = index
+        self.position = position
+        super().__init__(self.describe())
+
+    def describe(self):
+        message = f"Limit of {self.limit} {self.kind} exceeded"
+        if self.filename is None:
+            return message
+        if self.position is not None:
+            return f"{message} in {self.filename} at line {self.position[0]}, column {self.position[1]}"
+        if self.index is not None:
+            return f"{message} in {self.filename} at index {self.index}"
+        return f"{message} in {self.filename}"
+
+    def at(self, nyan):
+        # errors raised by tape don't know their cat, engine locates them
+        if self.filename is None:
+            self.filename = nyan.filename
+            self.index = nyan.cursor
+            self.position = nyan.position()
+            self.args = (self.describe(),)
+        return self
+
+    def __reduce__(self):
+        return type(self), (self.kind, self.limit, self.filename, self.index, self.position)
+
+
 class Memory:
+    cell_bits = None
+    mask = -1
+    initial_size = 64
+    # cells left of start, so a pointer going just left of it stays in one chunk
+    initial_origin = 16
+    limit = None
+
     def __init__(self, initial=None):
-        if initial is None:
-            initial = {}
-        self.memory = initial
+        self.promoted = False
+        # cells is the chunk the pointer is in, and origin is the index of address 0 in it.
+        # tape grows right by extending the last chunk, and left by adding chunks in front,
+        # so existing cells are never moved.
+        self.cells = self.allocate(self.initial_size)
+        self.origin = self.initial_origin
+        self.chunks = [self.cells]
+        self.starts = [-self.origin]
+        if initial is not None:
+            for address, value in initial.items():
+                self.write(address, value)
+
+    @property
+    def memory(self):
+        return {
+            start + index: value
+            for start, chunk in zip(self.starts, self.chunks) for index, value in enumerate(chunk) if value
+        }
+
+    def size(self):
+        return sum(map(len, self.chunks))
+
+    def allocate(self, size):
+        if self.promoted:
+            return [0] * size
+        return array("q", bytes(8 * size))
+
+    def promote(self):
+        # cells outgrew 64 bits; continue with python integers
+        self.promoted = True
+        current = [chunk is self.cells for chunk in self.chunks].index(True)
+        self.chunks = [list(chunk) for chunk in self.chunks]
+        self.cells = self.chunks[current]
+
+    def reserve(self, address):
+        if 0 <= address + self.origin < len(self.cells):
+            return
+        starts = self.starts
+        if address >= starts[-1]:
+            last = self.chunks[-1]
+            need = address - starts[-1] - len(last) + 1
+            if need > 0:
+                last.extend(self.allocate(self.bound(max(need, self.size()), need)))
+            self.cells = last
+            self.origin = -starts[-1]
+        elif address >= starts[0]:
+            number = bisect_right(starts, address) - 1
+            self.cells = self.chunks[number]
+            self.origin = -starts[number]
+        else:
+            need = starts[0] - address
+            self.cells = self.allocate(self.bound(max(need, self.size()), need))
+            self.origin = len(self.cells) - starts[0]
+            self.chunks.insert(0, self.cells)
+            starts.insert(0, -self.origin)
+
+    def bound(self, grow, need):
+        # tape doubles as it grows, but never past its limit
+        if self.limit is None:
+            return grow
+        size = self.size()
+        if size + need > self.limit:
+            raise LimitExceeded("cells", self.limit)
+        return min(grow, self.limit - size)
+
+    def chunk(self, address):
+        # chunk holding address and its start, None if the tape never grew to it
+        if 0 <= address + self.origin < len(self.cells):
+            return self.cells, -self.origin
+        if address < self.starts[0]:
+            return None
+        number = bisect_right(self.starts, address) - 1
+        if address - self.starts[number] >= len(self.chunks[number]):
+            return None
+        return self.chunks[number], self.starts[number]
+
+    def read(self, address):
+        index = address + self.origin
+        if 0 <= index < len(self.cells):
+            return self.cells[index]
+        found = self.chunk(address)
+        if found is None:
+            return 0
+        return found[0][address - found[1]]
+
+    def write(self, address, value):
+        self.reserve(address)
+        try:
+            self.cells[address + self.origin] = value & self.mask
+        except OverflowError:
+            self.promote()
+            self.cells[address + self.origin] = value & self.mask
+
+    def scan(self, address, step):
+        # cells past the ends of the tape are 0
+        while (found := self.chunk(address)) is not None:
+            cells, start = found
+            index = address - start
+            if step == 1:
+                try:
+                    return cells.index(0, index) + start
+                except ValueError:
+                    address = start + len(cells)
+                    continue
+            while 0 <= index < len(cells) and cells[index]:
+                index += step
+            address = index + start
+            if 0 <= index < len(cells):
+                return address
+        return address
+
+    def multiply(self, address, pairs):
+        # loop decreasing cell by 1 ends only if it's positive
+        value = self.read(address)
+        if value > 0:
+            for offset, factor in pairs:
+                self.write(address + offset, self.read(address + offset) + value * factor)
+            self.write(address, 0)
+
+    def pack(self, cells):
+        if isinstance(cells, list):
+            return cells
+        if isinstance(cells, array) and sys.byteorder != "little":
+            cells = array("q", cells)
+            cells.byteswap()
+        return bytes(cells)
+
+    def unpack(self, data):
+        if isinstance(data, list):
+            return data
+        cells = self.allocate(0)
+        if isinstance(cells, array):
+            cells.frombytes(data)
+            if sys.byteorder != "little":
+                cells.byteswap()
+        else:
+            cells += data
+        return cells
+
+    def dump(self):
+        # chunks are saved as one, as if the tape grew in one piece
+        cells = self.chunks[0]
+        for chunk in self.chunks[1:]:
+            cells = cells + chunk
+        return -self.starts[0], self.promoted, self.pack(cells)
+
+    def load(self, state):
+        self.origin, self.promoted, data = state
+        self.cells = self.unpack(data)
+        self.chunks = [self.cells]
+        self.starts = [-self.origin]
 
     def increase(self, pointer):
-        self.memory[pointer.get()] = self.memory.get(pointer.get(), 0) + 1
+        self.write(pointer.get(), self.read(pointer.get()) + 1)
 
     def decrease(self, pointer):
-        self.memory[pointer.get()] = self.memory.get(pointer.get(), 0) - 1
+        self.write(pointer.get(), self.read(pointer.get()) - 1)
 
     def set(self, pointer, value):
-        self.memory[pointer.get()] = value
+        self.write(pointer.get(), value)
 
     def get(self, pointer):
-        return self.memory.get(pointer.get(), 0)
+        return self.read(pointer.get())
+
+
+class ByteMemory(Memory):
+    cell_bits = 8
+    mask = 0xFF
+
+    def allocate(self, size):
+        return bytearray(size)
+
+    def scan(self, address, step):
+        if step != -1:
+            return super().scan(address, step)
+        while (found := self.chunk(address)) is not None:
+            cells, start = found
+            index = cells.rfind(0, 0, address - start + 1)
+            if index >= 0:
+                return index + start
+            address = start - 1
+        return address
+
+
+class PagedMemory(Memory):
+    page_bits = 12
+
+    def __init__(self, initial=None):
+        self.pages = {}
+        self.cell_limit = None
+        super().__init__(initial)
+        self.reserve(0)
+
+    @property
+    def limit(self):
+        return self.cell_limit
+
+    @limit.setter
+    def limit(self, limit):
+        # pages are at most a 16th of limit, so tape stops less than a page short of it, and never past it
+        self.cell_limit = limit
+        bits = type(self).page_bits if limit is None else min(type(self).page_bits, max(limit.bit_length() - 5, 0))
+        if bits != self.page_bits:
+            self.repage(bits)
+
+    def repage(self, bits):
+        cells = self.memory
+        address = -self.origin
+        limit, self.cell_limit = self.cell_limit, None
+        self.page_bits = bits
+        self.pages = {}
+        for key, value in cells.items():
+            self.write(key, value)
+        self.reserve(address)
+        self.cell_limit = limit
+
+    @property
+    def memory(self):
+        return {
+            (number << self.page_bits) + index: value
+            for number, page in self.pages.items() for index, value in enumerate(page) if value
+        }
+
+    def promote(self):
+        self.promoted = True
+        for number, page in self.pages.items():
+            self.pages[number] = list(page)
+        self.cells = self.pages[-self.origin >> self.page_bits]
+
+    def reserve(self, address):
+        number = address >> self.page_bits
+        if number not in self.pages:
+            if self.limit is not None and (len(self.pages) + 1) << self.page_bits > self.limit:
+                raise LimitExceeded("cells", self.limit)
+            self.pages[number] = self.allocate(1 << self.page_bits)
+        self.cells = self.pages[number]
+        self.origin = -(number << self.page_bits)
+
+    def dump(self):
+        pages = {number: self.pack(page) for number, page in self.pages.items()}
+        return self.origin, self.promoted, self.page_bits, pages
+
+    def load(self, state):
+        self.origin, self.promoted, self.page_bits, pages = state
+        self.pages = {number: self.unpack(page) for number, page in pages.items()}
+        self.cells = self.pages[-self.origin >> self.page_bits]
+        # pages of dumped tape follow its own limit
+        self.limit = self.limit
+
+    def read(self, address):
+        page = self.pages.get(address >> self.page_bits)
+        if page is None:
+            return 0
+        return page[address & ((1 << self.page_bits) - 1)]
+
+    def scan(self, address, step):
+        while self.read(address):
+            address += step
+        return address
+
+
+TAPES = {
+    "int": Memory,
+    "byte": ByteMemory,
+    "paged": PagedMemory,
+}
+
+
+def tape_type(tape):
+    if tape is None:
+        return Memory
+    if isinstance(tape, type) and issubclass(tape, Memory):
+        return tape
+    if tape not in TAPES:
+        raise ValueError(f"Invalid tape {tape} - Tape must be one of {', '.join(TAPES)}")
+    return TAPES[tape]
+
+
+# tapes of programs proven to stay within bounds, made once for each bounds
+FIXED_TAPES = {}
+
+
+def fixed_tape(tape, low, high):
+    key = tape, low, high
+    if key not in FIXED_TAPES:
+        FIXED_TAPES[key] = type(
+            f"Fixed{tape.__name__}", (tape,), {"initial_size": high - low + 1, "initial_origin": -low}
+        )
+    return FIXED_TAPES[key]
+
+
+class SourceMap:
+    def __init__(self):
+        self.indexes = array("q")
+        self.offsets = array("q")
+        self.line_starts = array("q", [0])
+
+    def add(self, index, offset):
+        if self.indexes and offset - self.offsets[-1] == index - self.indexes[-1]:
+            return
+        self.indexes.append(index)
+        self.offsets.append(offset)
+
+    def offset(self, index):
+        segment = bisect_right(self.indexes, index) - 1
+        if segment < 0:
+            return index
+        return self.offsets[segment] + index - self.indexes[segment]
+
+    def locate(self, index):
+        offset = self.offset(index)
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
 
 
 class ProgramParser:
-    def __init__(self, filename):
+    chunk_size = 1 << 16
+    tokens = re.compile(r'[^"\n ]+|["\n ]')
+
+    def __init__(self, filename, text=None):
         self.filename = filename
+        self.text = text
         self.program = None
+        self.source_map = None
 
     def parse(self):
-        if not os.path.exists(self.filename):
+        if self.text is None and not os.path.exists(self.filename):
             raise FileNotFoundError(f"File \"{self.filename}\" not found")
         if self.filename.suffix != ".nyan":
             raise ValueError(f"Invalid file extension {self.filename.suffix} - File extension must be .nyan")
-        with open(self.filename, "r", encoding="utf-8") as _f:
-            self.program = re.sub(r'"(.?(\\")?)*?"', "", _f.read().replace("\n", "").replace(" ", "")) + "    "
+        source_map = SourceMap()
+        pieces = []
+        length = 0
+        offset = 0
+        comment = None
+        with open(self.filename, "r", encoding="utf-8") if self.text is None else StringIO(self.text) as _f:
+            while chunk := _f.read(self.chunk_size):
+                cursor = 0
+                while cursor < len(chunk):
+                    if comment is None:
+                        token = self.tokens.match(chunk, cursor)
+                        text = token.group()
+                        if text == '"':
+                            comment = [(text, offset + cursor)]
+                            tail = text
+                            escaped_at = None
+                        elif text == "\n":
+                            source_map.line_starts.append(offset + cursor + 1)
+                        elif text != " ":
+                            source_map.add(length, offset + cursor)
+                            pieces.append(text)
+                            length += len(text)
+                        cursor = token.end()
+                        continue
+                    end = chunk.find('"', cursor)
+                    if end < 0:
+                        end = len(chunk)
+                    comment.append((chunk[cursor:end + 1], offset + cursor))
+                    tail = (tail + chunk[cursor:end].replace(" ", "").replace("\n", ""))[-2:]
+                    while (cursor := chunk.find("\n", cursor, end) + 1) > 0:
+                        source_map.line_starts.append(offset + cursor)
+                    if end < len(chunk):
+                        # \" right after a commented character does not end the comment
+                        if tail[-1] == "\\" and tail[-2] != '"':
+                            tail = tail[-1] + '"'
+                            escaped_at = offset + end
+                        else:
+                            comment = None
+                    cursor = end + 1
+                offset += len(chunk)
+        if comment is not None:
+            # unterminated comment ends at last escaped quote, or is not a comment at all
+            for text, start in comment:
+                for token in self.tokens.finditer(text):
+                    if escaped_at is not None and start + token.start() <= escaped_at:
+                        continue
+                    if token.group() not in (" ", "\n"):
+                        source_map.add(length, start + token.start())
+                        pieces.append(token.group())
+                        length += len(token.group())
+        source_map.add(length, offset)
+        self.source_map = source_map
+        self.program = "".join(pieces) + "    "
         return self.program
 
 
+class ProgramCompiler:
+    foldable = (
+        Opcodes.ADD, Opcodes.MOVE, Opcodes.MODULE_MOVE,
+        Opcodes.OUTPUT, Opcodes.INPUT, Opcodes.PRINT
+    )
+    forwarded = (Opcodes.TOGGLE, Opcodes.READ, Opcodes.WRITE)
+
+    def __init__(self, program, keywords):
+        self.program = program
+        self.keywords = keywords
+        self.code = None
+        self.origins = None
+
+    def compile(self):
+        code = []
+        origins = []
+        loops = []
+        previous = None
+        end = len(self.program)
+        for index, char in enumerate(self.program):
+            if char == " ":
+                end = index
+                break
+            instruction = getattr(self.keywords.get(char), "instruction", None)
+            if instruction is None:
+                code.append((Opcodes.CALL, char))
+                origins.append(index)
+                previous = None
+                continue
+            op, arg = instruction
+            if op in self.foldable and char == previous:
+                code[-1] = (op, code[-1][1] + arg)
+                continue
+            if op in self.forwarded:
+                arg = char
+            elif op == Opcodes.JUMP_ZERO:
+                loops.append(len(code))
+            elif op == Opcodes.JUMP_NONZERO:
+                if not loops:
+                    raise SyntaxError("No matching ~ for -")
+                start = loops.pop()
+                code[start] = (Opcodes.JUMP_ZERO, len(code) + 1)
+                arg = start + 1
+            code.append((op, arg))
+            origins.append(index)
+            previous = char
+        if loops:
+            raise SyntaxError("No matching - for ~")
+        code.append((Opcodes.HALT, None))
+        origins.append(end)
+        self.code = code
+        self.origins = origins
+        return self.code
+
+
+class BinaryProgramCompiler(ProgramCompiler):
+    # version 1 builds, where a compressed keyword is followed by 3 bytes of its count
+    def __init__(self, program, table):
+        super().__init__(program, None)
+        self.table = table
+
+    def compile(self):
+        code = []
+        origins = []
+        loops = []
+        previous = None
+        cursor = 0
+        while cursor < len(self.program):
+            byte = self.program[cursor]
+            op, arg, width = self.table[byte]
+            count = int.from_bytes(self.program[cursor + 1:cursor + 4], "big") if width == 4 else 1
+            if op is None:
+                code += [(Opcodes.CALL, bytes((byte,)))] * count
+                origins += [cursor] * count
+                previous = None
+                cursor += width
+                continue
+            if op in self.foldable:
+                arg *= count
+                if byte == previous:
+                    code[-1] = (op, code[-1][1] + arg)
+                    cursor += width
+                    continue
+            elif op == Opcodes.JUMP_ZERO:
+                loops.append(len(code))
+            elif op == Opcodes.JUMP_NONZERO:
+                if not loops:
+                    raise SyntaxError("No matching ~ for -")
+                start = loops.pop()
+                code[start] = (Opcodes.JUMP_ZERO, len(code) + 1)
+                arg = start + 1
+            code.append((op, arg))
+            origins.append(cursor)
+            previous = byte
+            cursor += width
+        if loops:
+            raise SyntaxError("No matching - for ~")
+        code.append((Opcodes.HALT, None))
+        origins.append(len(self.program))
+        self.code = code
+        self.origins = origins
+        return self.code
+
+
+class ProgramOptimizer:
+    mergeable = (Opcodes.ADD, Opcodes.MOVE, Opcodes.MODULE_MOVE)
+
+    def __init__(self, code, origins, wraps=False):
+        self.code = code
+        self.origins = origins
+        # cells of wrapping tapes reach 0 from either side, so clear and multiply loops always end
+        self.wraps = wraps
+        self.rewrites = []
+
+    def optimize(self):
+        code = []
+        origins = []
+        loops = []
+        for (op, arg), origin in zip(self.code, self.origins):
+            previous = code[-1][0] if code else None
+            if op in self.mergeable and previous == op:
+                op, arg = op, code.pop()[1] + arg
+                origin = origins.pop()
+                if not arg:
+                    continue
+            elif op == Opcodes.ADD and previous == Opcodes.SET:
+                op, arg = Opcodes.SET, code.pop()[1] + arg
+                origin = origins.pop()
+            elif op == Opcodes.JUMP_ZERO:
+                loops.append(len(code))
+            elif op == Opcodes.JUMP_NONZERO:
+                start = loops.pop()
+                idiom = self.recognize(code[start + 1:])
+                if idiom is not None:
+                    kind, rewrite = idiom
+                    self.rewrites.append((origins[start], kind))
+                    if rewrite[0] == Opcodes.MULTIPLY and not self.wraps:
+                        # multiply only takes positive cells, and leaves others to the loop, which never ends
+                        code.insert(start, rewrite)
+                        origins.insert(start, origins[start])
+                    else:
+                        op, arg = rewrite
+                        origin = origins[start]
+                        del code[start:], origins[start:]
+            if op in self.mergeable and not arg:
+                continue
+            if op == Opcodes.SET and code and code[-1][0] == Opcodes.ADD:
+                # value added right before being set is never read
+                code.pop()
+                origins.pop()
+            code.append((op, arg))
+            origins.append(origin)
+
+        for pc, (op, arg) in enumerate(code):
+            if op == Opcodes.JUMP_ZERO:
+                loops.append(pc)
+            elif op == Opcodes.JUMP_NONZERO:
+                start = loops.pop()
+                code[start] = (Opcodes.JUMP_ZERO, pc + 1)
+                code[pc] = (Opcodes.JUMP_NONZERO, start + 1)
+        self.code = code
+        self.origins = origins
+        return self.code
+
+    def recognize(self, body):
+        if any(op not in (Opcodes.ADD, Opcodes.MOVE) for op, _ in body):
+            return None
+        if len(body) == 1:
+            op, arg = body[0]
+            if op == Opcodes.ADD and arg in (1, -1) and self.wraps:
+                return "set", (Opcodes.SET, 0)
+            if op == Opcodes.ADD and arg == -1:
+                # multiply without pairs clears positive cells
+                return "set", (Opcodes.MULTIPLY, ())
+            if op == Opcodes.MOVE:
+                return "scan", (Opcodes.SCAN, arg)
+            return None
+        offsets = {}
+        position = 0
+        for op, arg in body:
+            if op == Opcodes.MOVE:
+                position += arg
+            else:
+                offsets[position] = offsets.get(position, 0) + arg
+        if position != 0 or offsets.get(0) != -1:
+            return None
+        pairs = tuple((offset, factor) for offset, factor in offsets.items() if offset and factor)
+        return "multiply", (Opcodes.MULTIPLY, pairs)
+
+
+class ProgramAnalysis:
+    # fixed tapes bigger than this are allocated as they are reached instead
+    max_size = 1 << 16
+    input_range = (0, 0x10FFFF)
+
+    def __init__(self, low=None, high=None, balanced=False, reads_input=False, modules=False, calls=False,
+                 values=(None, None)):
+        self.low = low
+        self.high = high
+        self.balanced = balanced
+        self.reads_input = reads_input
+        self.modules = modules
+        self.calls = calls
+        self.values = values
+
+    @property
+    def bounded(self):
+        return self.low is not None and self.high is not None
+
+    @property
+    def size(self):
+        return self.high - self.low + 1 if self.bounded else None
+
+    def dump(self):
+        return self.low, self.high, self.balanced, self.reads_input, self.modules, self.calls, self.values
+
+    @classmethod
+    def load(cls, state):
+        return cls(*state)
+
+    def tape(self, tape, limit=None):
+        # only flat tapes are preallocated; pages are already allocated as they are reached
+        if not self.bounded or self.size > self.max_size or tape not in (Memory, ByteMemory):
+            return tape
+        if limit is not None and self.size > limit:
+            return tape
+        return fixed_tape(tape, self.low, self.high)
+
+    def report(self, filename, tape=Memory, limit=None):
+        def bound(value):
+            return "?" if value is None else str(value)
+
+        cells = f"{self.low}..{self.high} ({self.size} cells)" if self.bounded else "unbounded"
+        chosen = self.tape(tape, limit)
+        uses = [name for name, used in (
+            ("input", self.reads_input), ("modules", self.modules), ("custom keywords", self.calls)
+        ) if used]
+        return [
+            f"{filename}: tape {cells}, {chosen.__name__} tape",
+            f"{filename}: loops {'balanced' if self.balanced else 'unbalanced'}, "
+            f"values {bound(self.values[0])}..{bound(self.values[1])}, "
+            f"uses {', '.join(uses) if uses else 'nothing outside'}",
+        ]
+
+
+class ProgramAnalyzer:
+    def __init__(self, code):
+        self.code = code
+
+    def analyze(self):
+        # pointer offsets are followed while they are known; a loop that moves pointer leaves them unknown
+        offset = 0
+        low = high = 0
+        known = True
+        balanced = True
+        reads_input = modules = calls = False
+        loops = []
+        adds = [0, 0]
+        sets = [0, 0]
+        grows = [False, False]
+        for op, arg in self.code:
+            if op == Opcodes.MOVE:
+                offset += arg
+                low, high = min(low, offset), max(high, offset)
+            elif op == Opcodes.ADD:
+                if loops:
+                    grows[arg > 0] = True
+                else:
+                    adds[arg > 0] += arg
+            elif op == Opcodes.SET:
+                sets = [min(sets[0], arg), max(sets[1], arg)]
+            elif op == Opcodes.MULTIPLY:
+                for pair_offset, _ in arg:
+                    low, high = min(low, offset + pair_offset), max(high, offset + pair_offset)
+                grows = [True, True]
+            elif op == Opcodes.INPUT:
+                reads_input = True
+                sets = [min(sets[0], ProgramAnalysis.input_range[0]), max(sets[1], ProgramAnalysis.input_range[1])]
+            elif op in (Opcodes.READ, Opcodes.WRITE, Opcodes.TOGGLE, Opcodes.MODULE_MOVE):
+                modules = True
+                if op == Opcodes.READ:
+                    grows = [True, True]
+            elif op == Opcodes.CALL:
+                # custom keywords may do anything to tape
+                calls = True
+                known = False
+                grows = [True, True]
+            elif op == Opcodes.SCAN:
+                known = balanced = False
+            elif op == Opcodes.JUMP_ZERO:
+                loops.append(offset)
+            elif op == Opcodes.JUMP_NONZERO:
+                if loops.pop() != offset:
+                    known = balanced = False
+        values = (
+            None if grows[0] else sets[0] + adds[0],
+            None if grows[1] else sets[1] + adds[1],
+        )
+        if not known:
+            low = high = None
+        return ProgramAnalysis(low, high, balanced, reads_input, modules, calls, values)
+
+
+class ProgramCache:
+    version = 6
+    directory_name = "__nyancache__"
+    magic = b"NYC\x00"
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory).absolute() if directory else None
+
+    def path(self, filename, tag):
+        if self.directory is None:
+            return filename.parent / self.directory_name / f"{filename.name}.{tag}.nyc"
+        digest = hashlib.sha1(str(filename).encode("utf-8")).hexdigest()[:16]
+        return self.directory / f"{filename.name}.{digest}.{tag}.nyc"
+
+    def key(self, filename, tag, signature=""):
+        try:
+            with open(filename, "rb") as _f:
+                data = _f.read()
+        except OSError:
+            return None
+        digest = hashlib.sha256(f"{self.version}:{sys.implementation.cache_tag}:{tag}:{signature}:".encode("utf-8"))
+        digest.update(data)
+        return digest.digest()
+
+    def load(self, filename, tag, key):
+        path = self.path(filename, tag)
+        try:
+            with open(path, "rb") as _f:
+                data = _f.read()
+        except OSError:
+            return None
+        if not data.startswith(self.magic):
+            _logger.debug("Invalid cache %s", path)
+            return None
+        try:
+            stored_key, entry = marshal.loads(data[len(self.magic):])
+        except (EOFError, ValueError, TypeError):
+            _logger.debug("Invalid cache %s", path)
+            return None
+        if stored_key != key:
+            _logger.debug("Stale cache %s", path)
+            return None
+        return entry
+
+    def store(self, filename, tag, key, entry):
+        path = self.path(filename, tag)
+        temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp, "wb") as _f:
+                _f.write(self.magic + marshal.dumps((key, entry)))
+            os.replace(temp, path)
+        except (OSError, ValueError):
+            # unwritable directory or unmarshallable keyword argument, runs without cache
+            _logger.debug("Cannot write cache %s", path)
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+
+class Bundle:
+    magic = b"\x02NYA"
+    version = 2
+    header = struct.Struct("<4sIqqq")
+    module_entry = struct.Struct("<6q")
+    link_entry = struct.Struct("<4q")
+
+    def __init__(self, data, filename=None):
+        self.data = data
+        self.filename = filename
+        magic, version, module_count, link_count, self.root = self.header.unpack_from(data, 0)
+        if magic != self.magic:
+            raise SyntaxError(f"Invalid start bytes {magic}")
+        if version != self.version:
+            raise ValueError(f"Unsupported bundle version {version}")
+        offset = self.header.size
+        self.modules = []
+        for _ in range(module_count):
+            self.modules.append(self.module_entry.unpack_from(data, offset))
+            offset += self.module_entry.size
+        self.links = []
+        for _ in range(link_count):
+            self.links.append(self.link_entry.unpack_from(data, offset))
+            offset += self.link_entry.size
+
+    @classmethod
+    def open(cls, filename):
+        # read at once, as modules are decoded into lists on load; a mapping would only be kept open for them
+        with open(filename, "rb") as _f:
+            return cls(_f.read(), filename)
+
+    @classmethod
+    def is_bundle(cls, data):
+        return data[:len(cls.magic)] == cls.magic
+
+    def words(self, offset, length):
+        if sys.byteorder == "little":
+            return memoryview(self.data)[offset:offset + length * 8].cast("q")
+        words = array("q", self.data[offset:offset + length * 8])
+        words.byteswap()
+        return words
+
+    def name(self, index):
+        name_offset, name_length = self.modules[index][:2]
+        return bytes(self.data[name_offset:name_offset + name_length]).decode("utf-8")
+
+    def code(self, index):
+        return self.words(*self.modules[index][2:4])
+
+    def constants(self, index):
+        return self.words(*self.modules[index][4:6])
+
+    @classmethod
+    def write(cls, filename, modules, links, root=0):
+        offset = cls.header.size + len(modules) * cls.module_entry.size + len(links) * cls.link_entry.size
+        entries = []
+        sections = []
+        for name, code, constants in modules:
+            entry = []
+            for data in (name.encode("utf-8"), code, constants):
+                if isinstance(data, array):
+                    length = len(data)
+                    if sys.byteorder != "little":
+                        data = array("q", data)
+                        data.byteswap()
+                    data = data.tobytes()
+                else:
+                    length = len(data)
+                entry += [offset, length]
+                sections.append(data + bytes(-len(data) % 8))
+                offset += len(sections[-1])
+            entries.append(entry)
+        with open(filename, "wb") as _f:
+            _f.write(cls.header.pack(cls.magic, cls.version, len(modules), len(links), root))
+            for entry in entries:
+                _f.write(cls.module_entry.pack(*entry))
+            for link in links:
+                _f.write(cls.link_entry.pack(*link))
+            for section in sections:
+                _f.write(section)
+
+
+class Snapshot:
+    magic = b"\x02NYS"
+    version = 1
+    header = struct.Struct("<4sI")
+
+    def __init__(self, data):
+        magic, version = self.header.unpack_from(data, 0)
+        if magic != self.magic:
+            raise SyntaxError(f"Invalid start bytes {magic}")
+        if version != self.version:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        self.state = marshal.loads(zlib.decompress(data[self.header.size:]))
+
+    @classmethod
+    def encode(cls, state):
+        # zero cells of tape compress away
+        return cls.header.pack(cls.magic, cls.version) + zlib.compress(marshal.dumps(state))
+
+
+class PythonGenerator:
+    indent = "    "
+    max_depth = 16
+    state = "memory, mask, cells, origin, size, i, fuel"
+    # instructions of loops compiled by generate_loop, which never give way inside loop
+    tiered = (
+        Opcodes.ADD, Opcodes.MOVE, Opcodes.SET, Opcodes.OUTPUT, Opcodes.PRINT, Opcodes.INPUT, Opcodes.SCAN,
+        Opcodes.MULTIPLY, Opcodes.MODULE_MOVE, Opcodes.TOGGLE, Opcodes.JUMP_ZERO, Opcodes.JUMP_NONZERO,
+    )
+    header = """from nyanlang.nyan import Signals
+
+
+def window(memory, address):
+    memory.reserve(address)
+    return memory.cells, memory.origin, len(memory.cells), address + memory.origin
+
+
+def promote(memory):
+    memory.promote()
+    return memory.cells
+
+
+def channel(o):
+    if o.pointing_parents:
+        if o.module_pointer.get() in o.parents:
+            return o.parents[o.module_pointer.get()]
+        raise ValueError("Parent cat does not exist")
+    if o.module_pointer.get() in o.children:
+        return o.children[o.module_pointer.get()]
+    raise ValueError("Child cat does not exist")
+
+
+def call(o, keyword):
+    if keyword not in o.keywords:
+        raise SyntaxError(f"Invalid character {keyword}")
+    return o.keywords[keyword](o)
+"""
+    footer = """
+
+if __name__ == "__main__":
+    from nyanlang import NyanEngine
+    NyanEngine(__file__).run()
+"""
+
+    def __init__(self, code, origins=None, source_map=None, name="<nyan>", fuel=False):
+        self.code = code
+        self.origins = origins
+        self.source_map = source_map
+        self.name = name
+        self.fuel = fuel
+        self.functions = None
+
+    def generate(self):
+        main = {
+            "name": "run",
+            "lines": [
+                "def run(o):",
+                "    memory = o.memory",
+                "    mask = memory.mask",
+                "    io = o.io",
+                "    write = io.write",
+                "    fuel = o.fuel_left or o.fuel or o.unlimited",
+                "    cells, origin, size, i = window(memory, o.pointer.get())",
+            ],
+            "loops": [],
+            "yields": False,
+        }
+        frames = [main]
+        self.functions = [main]
+        for pc, (op, arg) in enumerate(self.code):
+            frame = frames[-1]
+            depth = len(frame["loops"]) + 1
+            if op == Opcodes.JUMP_ZERO:
+                if depth > self.max_depth:
+                    frame = {
+                        "name": f"loop_{pc}",
+                        "lines": [
+                            f"def loop_{pc}(o, {self.state}):",
+                            "    io = o.io",
+                            "    write = io.write",
+                        ],
+                        "loops": [],
+                        "yields": False,
+                        "call": len(frames[-1]["lines"]),
+                    }
+                    frames[-1]["lines"].append(None)
+                    frames.append(frame)
+                    self.functions.append(frame)
+                    depth = 1
+                self.emit(frame, depth, f"while cells[i]:{self.comment(pc)}")
+                frame["loops"].append(len(frame["lines"]))
+            elif op == Opcodes.JUMP_NONZERO:
+                if self.fuel:
+                    # back-edges spend fuel by length of loop, so long loops give way to other programs
+                    for line in [
+                        f"fuel -= {pc - arg + 1}",
+                        "if fuel <= 0:",
+                        "    o.fuel_left = 0",
+                        f"    o.cursor = {arg}",
+                        "    o.pointer.set(i - origin)",
+                        "    yield Signals.KEEP_GOING, o.pointing_parents, o.module_pointer.get()",
+                        "    fuel = o.fuel_left or o.fuel or o.unlimited",
+                    ]:
+                        self.emit(frame, depth, line)
+                    frame["yields"] = True
+                if len(frame["lines"]) == frame["loops"].pop():
+                    self.emit(frame, depth, "pass")
+                if not frame["loops"] and "call" in frame:
+                    self.emit(frame, 1, f"return {self.state}")
+                    frames.pop()
+                    parent = frames[-1]
+                    call = f"{self.state} = {frame['name']}(o, {self.state})"
+                    if frame["yields"]:
+                        call = f"{self.state} = yield from {frame['name']}(o, {self.state})"
+                        parent["yields"] = True
+                    parent["lines"][frame["call"]] = self.indent * (len(parent["loops"]) + 1) + call
+            else:
+                for line in self.statements(frame, op, arg, pc):
+                    self.emit(frame, depth, line)
+        if self.fuel:
+            main["lines"].append("    o.fuel_left = fuel")
+        main["lines"] += ["    return", "    yield"]
+
+        lines = [f"# generated by nyanlang from {self.name}", self.header]
+        for function in reversed(self.functions):
+            lines += ["", ""] + function["lines"]
+        return "\n".join(lines) + "\n" + self.footer
+
+    def generate_loop(self, start):
+        # loop made hot in NyanInterpreter, which goes on from returned cursor
+        end = self.code[start][1] - 1
+        lines = [
+            f"def loop_{start}(o, memory, mask, cells, origin, size, i, fuel):",
+            "    io = o.io",
+            "    write = io.write",
+        ]
+        frame = {"lines": lines}
+        depth = 1
+        loops = []
+        for pc in range(start, end + 1):
+            op, arg = self.code[pc]
+            if op not in self.tiered:
+                return None
+            if op == Opcodes.JUMP_ZERO:
+                if len(loops) >= self.max_depth:
+                    return None
+                loops.append(pc)
+                body = [f"if cells[i]:{self.comment(pc)}", "    while True:"]
+            elif op == Opcodes.JUMP_NONZERO:
+                loops.pop()
+                depth -= 2
+                # fuel is spent only when loop goes round, as in interpreter
+                body = [
+                    "        if not cells[i]:",
+                    "            break",
+                    f"        fuel -= {pc - arg + 1}",
+                    "        if fuel <= 0:",
+                    f"            return {arg}, cells, origin, size, i, fuel",
+                ]
+            elif op == Opcodes.INPUT:
+                body = [
+                    f"if io.starved({arg}):",
+                    f"    return {pc}, cells, origin, size, i, fuel",
+                    f"cells[i] = io.read({arg}) & mask",
+                ]
+            else:
+                body = self.statements(frame, op, arg, pc)
+            for line in body:
+                self.emit(frame, depth, line)
+            if op == Opcodes.JUMP_ZERO:
+                depth += 2
+        lines.append(f"    return {end + 1}, cells, origin, size, i, fuel")
+        return "\n".join([f"# generated by nyanlang from {self.name}", self.header, "", ""] + lines) + "\n"
+
+    def comment(self, pc):
+        if self.origins is None or self.source_map is None:
+            return ""
+        line, column = self.source_map.locate(self.origins[pc])
+        return f"  # {line}:{column}"
+
+    def emit(self, frame, depth, line):
+        frame["lines"].append(self.indent * depth + line)
+
+    @staticmethod
+    def signed(arg):
+        return f"+ {arg}" if arg > 0 else f"- {-arg}"
+
+    @staticmethod
+    def store(target, value):
+        # cells are written in place until one outgrows 64 bits, then tape goes on with python integers
+        line = f"cells[{target}] = {value}"
+        return ["try:", f"    {line}", "except OverflowError:", "    cells = promote(memory)", f"    {line}"]
+
+    def statements(self, frame, op, arg, pc):
+        # with fuel, cursor is kept where tape may grow, so limits can tell where they were exceeded
+        locate = [f"o.cursor = {pc}"] if self.fuel else []
+        sync = ["o.pointer.set(i - origin)"] + locate
+        if op == Opcodes.ADD:
+            return self.store("i", f"(cells[i] {self.signed(arg)}) & mask")
+        if op == Opcodes.MOVE:
+            return [
+                f"i {self.signed(arg)[0]}= {abs(arg)}",
+                "if not 0 <= i < size:",
+                *["    " + line for line in locate],
+                "    cells, origin, size, i = window(memory, i - origin)",
+            ]
+        if op == Opcodes.SET:
+            return self.store("i", f"{arg} & mask")
+        if op == Opcodes.OUTPUT:
+            return ["write(cells[i])" if arg == 1 else f"write(cells[i], {arg})"]
+        if op == Opcodes.PRINT:
+            text = '"{" + str(cells[i]) + "}"'
+            return [f"io.write_text({text if arg == 1 else f'({text}) * {arg}'})"]
+        if op == Opcodes.INPUT:
+            frame["yields"] = True
+            return [
+                f"while io.starved({arg}):",
+                "    o.pointer.set(i - origin)",
+                "    yield Signals.KEEP_GOING, o.pointing_parents, o.module_pointer.get()",
+                f"cells[i] = io.read({arg}) & mask",
+            ]
+        if op == Opcodes.SCAN:
+            return locate + [f"cells, origin, size, i = window(memory, memory.scan(i - origin, {arg}))"]
+        if op == Opcodes.MULTIPLY:
+            if not arg:
+                return ["if cells[i] > 0:", "    cells[i] = 0"]
+            # cells in window are written in place, tape grows through memory otherwise
+            low = min(0, *(offset for offset, _ in arg))
+            high = max(0, *(offset for offset, _ in arg))
+            return [
+                "value = cells[i]",
+                "if value > 0:",
+                f"    if {-low} <= i < size - {high}:",
+                *[
+                    "        " + line
+                    for offset, factor in arg
+                    for line in self.store(
+                        f"i {self.signed(offset)}",
+                        f"(cells[i {self.signed(offset)}] "
+                        f"{'+' if factor > 0 else '-'} value{f' * {abs(factor)}' if abs(factor) != 1 else ''}) & mask"
+                    )
+                ],
+                "        cells[i] = 0",
+                "    else:",
+                *["        " + line for line in locate],
+                f"        memory.multiply(i - origin, {arg!r})",
+                "        cells, origin, size, i = window(memory, i - origin)",
+            ]
+        if op == Opcodes.MODULE_MOVE:
+            return [f"o.module_pointer.set(o.module_pointer.get() {self.signed(arg)})"]
+        if op == Opcodes.TOGGLE:
+            return ["o.pointing_parents = not o.pointing_parents"]
+        frame["yields"] = True
+        if op == Opcodes.HALT:
+            return sync + [
+                "while (response := o.drain()) is not None:",
+                "    yield response",
+            ]
+        if op == Opcodes.WRITE:
+            return sync + [
+                "if o.send(cells[i]):",
+                "    yield Signals.PAUSE, o.pointing_parents, o.module_pointer.get()",
+            ]
+        if op == Opcodes.READ:
+            return sync + [
+                "while not (received := channel(o).receive(o)):",
+                "    yield Signals.PAUSE, o.pointing_parents, o.module_pointer.get()",
+                *self.store("i", "received & mask"),
+            ]
+        return sync + [
+            f"response = call(o, {arg!r})",
+            "if type(response) == tuple:",
+            "    yield response",
+            "memory = o.memory",
+            "mask = memory.mask",
+            "cells, origin, size, i = window(memory, o.pointer.get())",
+        ]
+
+
+@native(Opcodes.READ)
+def read_module(o):
+    if o.pointing_parents:
+        if o.module_pointer.get() in o.parents:
+            _received = o.parents[o.module_pointer.get()].receive(o)
+            if not _received:
+                return Signals.PAUSE, o.pointing_parents, o.module_pointer.get()
+            o.memory.set(o.pointer, _received)
+        else:
+            raise ValueError("Parent cat does not exist")
+    else:
+        if o.module_pointer.get() in o.children:
+            _received = o.children[o.module_pointer.get()].receive(o)
+            if not _received:
+                return Signals.PAUSE, o.pointing_parents, o.module_pointer.get()
+            o.memory.set(o.pointer, _received)
+        else:
+            raise ValueError("Child cat does not exist")
+
+
+@native(Opcodes.WRITE)
+def write_module(o):
+    if o.send(o.memory.get(o.pointer)):
+        o.cursor += 1
+        return Signals.PAUSE, o.pointing_parents, o.module_pointer.get()
+
+
+@native(Opcodes.JUMP_ZERO)
+def jump_zero(o):
+    if o.memory.get(o.pointer) == 0:
+        o.cursor = o.next_points[o.cursor]
+
+
+@native(Opcodes.JUMP_NONZERO)
+def jump_nonzero(o):
+    if o.memory.get(o.pointer) != 0:
+        o.cursor = o.jump_points[o.cursor]
+
+
+@native(Opcodes.TOGGLE)
+def toggle_module(o):
+    o.pointing_parents = not o.pointing_parents
+
+
 class NyanInterpreter:
-    def __init__(self, filename, subprocess=False, debug=False):
+    __slots__ = (
+        "filename", "initialized", "cache", "io", "program", "text", "debug", "tape", "optimize", "rewrites",
+        "cursor", "memory", "pointer", "module_pointer", "pointing_parents", "children", "parents", "waiting",
+        "fuel", "fuel_left", "tape_limit", "jump_points", "next_points", "source_map", "code", "origins",
+        "analysis", "heat", "loops", "keywords", "sub",
+    )
+    cache_tag = "text"
+    unlimited = 1 << 62
+    # every cat starts with these handlers, and add_keyword copies them for its own
+    keyword_table = MappingProxyType({
+        "?": native(Opcodes.MOVE, 1)(lambda o: o.pointer.increase()),
+        "!": native(Opcodes.MOVE, -1)(lambda o: o.pointer.decrease()),
+        "냥": native(Opcodes.ADD, 1)(lambda o: o.memory.increase(o.pointer)),
+        "냐": native(Opcodes.ADD, -1)(lambda o: o.memory.decrease(o.pointer)),
+        "먕": native(Opcodes.MODULE_MOVE, 1)(lambda o: o.module_pointer.increase()),
+        "먀": native(Opcodes.MODULE_MOVE, -1)(lambda o: o.module_pointer.decrease()),
+        ".": native(Opcodes.OUTPUT, 1)(lambda o: o.io.write(o.memory.get(o.pointer))),
+        ",": native(Opcodes.INPUT, 1)(lambda o: o.memory.set(o.pointer, o.io.read())),
+        "뀨": native(Opcodes.PRINT, 1)(lambda o: o.io.write_text("{"+str(o.memory.get(o.pointer))+"}")),
+        ";": write_module,
+        ":": read_module,
+        "'": toggle_module,
+        "-": jump_nonzero,
+        "~": jump_zero,
+    })
+    # compiled programs of files loaded in this process, which cats loading the same file share
+    compiled = {}
+    compiled_size = 256
+    # loops going round this many times are compiled to python, and at most loops_size of them are kept
+    hot_threshold = 512
+    loops_size = 64
+
+    def __init__(self, filename, subprocess=False, debug=False, tape=None, optimize=False, cache=None, io=None):
         self.filename = filename
         self.initialized = False
+        self.cache = cache
+        self.io = io if io is not None else NyanIO()
 
         self.program = None
+        self.text = None
         self.debug = debug
+        self.tape = tape_type(tape)
+        self.optimize = optimize
+        self.rewrites = []
 
         self.cursor = 0
-        self.memory = Memory()
+        self.memory = self.tape()
         self.pointer = Pointer()
         self.module_pointer = Pointer()
         self.pointing_parents = False
         self.children = {}
         self.parents = {}
+        self.waiting = deque()
+        self.fuel = None
+        self.fuel_left = None
+        self.tape_limit = None
 
         self.jump_points = {}
         self.next_points = {}
+        self.source_map = None
 
-        self.keywords = {
-            "?": lambda o: o.pointer.increase(),
-            "!": lambda o: o.pointer.decrease(),
-            "냥": lambda o: o.memory.increase(o.pointer),
-            "냐": lambda o: o.memory.decrease(o.pointer),
-            "먕": lambda o: o.module_pointer.increase(),
-            "먀": lambda o: o.module_pointer.decrease(),
-            ".": lambda o: print(chr(o.memory.get(o.pointer)), end=""),
-            ",": lambda o: o.memory.set(o.pointer, ord(i) if (i := sys.stdin.read(1)) else 0),
-            "뀨": lambda o: print("{"+str(o.memory.get(o.pointer))+"}", end=""),
-        }
-        self.module_write()
-        self.module_read()
-        self.module_control()
-        self.jumper_end()
-        self.jumper_start()
+        self.code = None
+        self.origins = None
+        self.analysis = None
+        self.heat = None
+        self.loops = {}
+
+        self.keywords = self.keyword_table
 
         self.sub = subprocess
 
-    def init(self):
-        self.parse_program()
-        self.parse_loop_points()
+    def init(self, compiled=None):
+        # memo of an engine is bounded by its owner, and the one of this process by compiled_size
+        memo = self.compiled if compiled is None else compiled
+        tag = f"{self.cache_tag}-O{int(bool(self.optimize))}"
+        if self.optimize and self.tape.mask != -1:
+            tag += "-wrap"
+        key = None
+        if self.cache is not None or self.text is None:
+            # file is read once, for keys of both memo and cache
+            key = (self.cache or ProgramCache()).key(self.filename, tag, self.signature())
+        shared = self.shared_key(tag, key)
+        if shared is not None and shared in memo:
+            self.restore(memo[shared])
+            self.loops = memo[shared]["loops"]
+            self.memory = self.new_memory()
+            self.initialized = True
+            _logger.debug("Nyan \"%s\" shares program loaded before.", self.filename.stem)
+            return self
+        entry = self.cache.load(self.filename, tag, key) if self.cache is not None and key is not None else None
+        if entry is None:
+            self.parse_program()
+            self.parse_loop_points()
+            self.compile_program()
+            if self.cache is not None and key is not None:
+                self.cache.store(self.filename, tag, key, self.cache_entry())
+        else:
+            self.restore(entry)
+            _logger.debug("Nyan \"%s\" loaded from cache.", self.filename.stem)
+        if shared is not None:
+            if compiled is None and len(memo) >= self.compiled_size:
+                del memo[next(iter(memo))]
+            # loops made hot by any cat of program are compiled once for all of them
+            memo[shared] = {**self.cache_entry(), "loops": self.loops}
+        self.memory = self.new_memory()
         self.initialized = True
-        _logger.debug(f"Nyan \"{self.filename.stem}\" initialized.")
+        _logger.debug("Nyan \"%s\" initialized.", self.filename.stem)
         return self
 
+    def shared_key(self, tag, key=None):
+        # program is shared while file has same contents, and is compiled with same keywords
+        if self.text is not None:
+            return type(self), tag, self.filename, self.text, self.signature()
+        if key is None:
+            return None
+        return type(self), tag, self.filename, key
+
+    def new_memory(self):
+        # programs proven to stay within bounds get their whole tape at once
+        tape = self.analysis.tape(self.tape, self.tape_limit) if self.analysis is not None else self.tape
+        memory = tape()
+        memory.limit = self.tape_limit
+        return memory
+
     def reset(self):
         self.cursor = 0
-        self.memory = Memory()
+        self.memory = self.new_memory()
         self.pointer = Pointer()
         self.module_pointer = Pointer()
         self.pointing_parents = False
-        _logger.debug(f"Nyan \"{self.filename.stem}\" initialized.")
+        self.waiting = deque()
+        _logger.debug("Nyan \"%s\" initialized.", self.filename.stem)
+
+    def clone(self, io=None):
+        # compiled program is shared, and only runtime attributes are new
+        nyan = copy.copy(self)
+        nyan.io = io if io is not None else self.io
+        nyan.children = {}
+        nyan.parents = {}
+        nyan.reset()
+        return nyan
 
     def add_keyword(self, keyword):
         def wrapper(handler):
+            if not isinstance(self.keywords, dict):
+                self.keywords = dict(self.keywords)
             self.keywords[keyword] = handler
+            self.code = None
+            self.analysis = None
+            self.heat = None
+            self.loops = {}
         return wrapper
 
+    def fingerprint(self):
+        # states are only loaded to programs compiled the same way
+        code = self.code if self.code is not None else self.program
+        data = marshal.dumps(code) if isinstance(code, (list, str)) else bytes(code or b"")
+        return hashlib.blake2b(data, digest_size=8).digest()
+
+    def dump_state(self):
+        return (
+            self.cursor, self.pointer.get(), self.module_pointer.get(), self.pointing_parents,
+            self.tape.__name__, self.memory.dump(), tuple(self.waiting),
+        )
+
+    def load_state(self, state):
+        cursor, pointer, module_pointer, pointing_parents, tape, memory, waiting = state
+        if tape != self.tape.__name__:
+            raise ValueError(f"Snapshot of {tape} tape can't be loaded to {self.tape.__name__} tape")
+        self.cursor = cursor
+        self.pointer = Pointer(pointer)
+        self.module_pointer = Pointer(module_pointer)
+        self.pointing_parents = pointing_parents
+        self.memory = self.new_memory()
+        self.memory.load(memory)
+        self.waiting = deque(waiting)
+
+    def signature(self):
+        return repr(sorted(
+            (keyword, getattr(handler, "instruction", None)) for keyword, handler in self.keywords.items()
+        ))
+
+    def cache_entry(self):
+        return {
+            "program": self.program,
+            "source_map": (
+                self.source_map.indexes.tobytes(),
+                self.source_map.offsets.tobytes(),
+                self.source_map.line_starts.tobytes(),
+            ) if self.source_map is not None else None,
+            "jump_points": self.jump_points,
+            "next_points": self.next_points,
+            "code": self.code,
+            "origins": self.origins,
+            "rewrites": self.rewrites,
+            "analysis": self.analysis.dump() if self.analysis is not None else None,
+        }
+
+    def restore(self, entry):
+        self.program = entry["program"]
+        if entry["source_map"] is not None:
+            self.source_map = SourceMap()
+            for values, data in zip(
+                (self.source_map.indexes, self.source_map.offsets, self.source_map.line_starts), entry["source_map"]
+            ):
+                del values[:]
+                values.frombytes(data)
+        self.jump_points = entry["jump_points"]
+        self.next_points = entry["next_points"]
+        self.code = entry["code"]
+        self.origins = entry["origins"]
+        self.rewrites = entry["rewrites"]
+        self.heat = None
+        self.loops = {}
+        self.analysis = ProgramAnalysis.load(entry["analysis"]) if entry["analysis"] is not None else None
+
     def add_parent(self, parent, pos):
         if pos in self.parents:
             raise ValueError("Parent cat already exists")
@@ -180,25 +1781,73 @@ class NyanInterpreter:
         self.children[pos] = child
 
     def parse_program(self):
-        self.program = ProgramParser(self.filename).parse()
+        parser = ProgramParser(self.filename, self.text)
+        self.program = parser.parse()
+        self.source_map = parser.source_map
+
+    def compiler(self):
+        return ProgramCompiler(self.program, self.keywords)
+
+    def compile_program(self):
+        compiler = self.compiler()
+        self.code = compiler.compile()
+        self.origins = compiler.origins
+        if self.optimize:
+            optimizer = ProgramOptimizer(self.code, self.origins, self.tape.mask != -1)
+            self.code = optimizer.optimize()
+            self.origins = optimizer.origins
+            self.rewrites = optimizer.rewrites
+        self.analysis = ProgramAnalyzer(self.code).analyze()
+        self.heat = None
+        self.loops = {}
+
+    def optimization_report(self):
+        report = []
+        for index, kind in self.rewrites:
+            position = self.locate(index)
+            where = f"{position[0]}:{position[1]}" if position else f"{index}"
+            report.append(f"{self.filename}:{where}: {kind} loop")
+        return report
+
+    def analysis_report(self):
+        if self.analysis is None:
+            return [f"{self.filename}: not analyzed"]
+        return self.analysis.report(self.filename, self.tape, self.tape_limit)
+
+    def locate(self, index):
+        if self.source_map is None:
+            return None
+        return self.source_map.locate(index)
+
+    def position(self, cursor=None):
+        cursor = self.cursor if cursor is None else cursor
+        if self.code is not None and self.origins is not None:
+            if not 0 <= cursor < len(self.origins):
+                return None
+            cursor = self.origins[cursor]
+        return self.locate(cursor)
 
     def parse_loop_points(self):
-        def _find_match(start_pair):
-            next_to = -1
-            for j in range(start_pair + 1, len(self.program)):
-                if j <= next_to:
-                    continue
-                if self.program[j] == "-":
-                    self.jump_points[j] = start_pair
-                    self.next_points[start_pair] = j
-                    return j
-                if self.program[j] == "~":
-                    next_to = _find_match(j)
-            raise SyntaxError("No matching - for ~")
-
-        for i in range(len(self.program)):
-            if self.program[i] == "~":
-                _find_match(i)
+        loops = []
+        for match in re.finditer("[~-]", self.program):
+            index = match.start()
+            if match.group() == "~":
+                loops.append(index)
+            elif not loops:
+                raise self.loop_error("No matching ~ for -", index)
+            else:
+                start_pair = loops.pop()
+                self.jump_points[index] = start_pair
+                self.next_points[start_pair] = index
+        if loops:
+            raise self.loop_error("No matching - for ~", loops[-1])
+
+    def loop_error(self, message, index):
+        position = self.locate(index)
+        if position is None:
+            return SyntaxError(f"{message} at index {index}", (str(self.filename), None, index + 1, None))
+        line, column = position
+        return SyntaxError(f"{message} at line {line}, column {column}", (str(self.filename), line, column, None))
 
     def before_run(self):
         ...
@@ -213,96 +1862,339 @@ class NyanInterpreter:
         ...
 
     def module_read(self, keyword=":"):
-        def wrapper(o):
-            if o.pointing_parents:
-                if o.module_pointer.get() in o.parents:
-                    _received = o.parents[o.module_pointer.get()].receive(o)
-                    if not _received:
-                        return Signals.PAUSE, o.pointing_parents, o.module_pointer.get()
-                    o.memory.set(o.pointer, _received)
-                else:
-                    raise ValueError("Parent cat does not exist")
-            else:
-                if o.module_pointer.get() in o.children:
-                    _received = o.children[o.module_pointer.get()].receive(o)
-                    if not _received:
-                        return Signals.PAUSE, o.pointing_parents, o.module_pointer.get()
-                    o.memory.set(o.pointer, _received)
-                else:
-                    raise ValueError("Child cat does not exist")
-        self.add_keyword(keyword)(wrapper)
+        self.add_keyword(keyword)(read_module)
 
     def module_write(self, keyword=";"):
-        def wrapper(o):
-            if o.pointing_parents:
-                if o.module_pointer.get() in o.parents:
-                    o.parents[o.module_pointer.get()].send(o, o.memory.get(o.pointer))
-                    o.cursor += 1
-                    return Signals.PAUSE, o.pointing_parents, o.module_pointer.get()
-                else:
-                    raise ValueError("Parent cat does not exist")
-            else:
-                if o.module_pointer.get() in o.children:
-                    o.children[o.module_pointer.get()].send(o, o.memory.get(o.pointer))
-                    o.cursor += 1
-                    return Signals.PAUSE, o.pointing_parents, o.module_pointer.get()
-                else:
-                    raise ValueError("Child cat does not exist")
-        self.add_keyword(keyword)(wrapper)
+        self.add_keyword(keyword)(write_module)
 
     def jumper_start(self, keyword="~"):
-        def wrapper(o):
-            if o.memory.get(o.pointer) == 0:
-                o.cursor = o.next_points[o.cursor]
-        self.add_keyword(keyword)(wrapper)
+        self.add_keyword(keyword)(jump_zero)
 
     def jumper_end(self, keyword="-"):
-        def wrapper(o):
-            if o.memory.get(o.pointer) != 0:
-                o.cursor = o.jump_points[o.cursor]
-        self.add_keyword(keyword)(wrapper)
+        self.add_keyword(keyword)(jump_nonzero)
 
     def module_control(self, keyword="'"):
-        def wrapper(o):
-            o.pointing_parents = not o.pointing_parents
-        self.add_keyword(keyword)(wrapper)
+        self.add_keyword(keyword)(toggle_module)
+
+    def send(self, value):
+        pos = self.module_pointer.get()
+        if self.pointing_parents:
+            if pos not in self.parents:
+                raise ValueError("Parent cat does not exist")
+            channel = self.parents[pos]
+        else:
+            if pos not in self.children:
+                raise ValueError("Child cat does not exist")
+            channel = self.children[pos]
+        if channel.send(self, value):
+            return True
+        # receiver runs later, when channel is full, on input or before halting
+        if (self.pointing_parents, pos) not in self.waiting:
+            self.waiting.append((self.pointing_parents, pos))
+        return False
+
+    def drain(self):
+        while self.waiting:
+            pointing_parents, pos = self.waiting.popleft()
+            if (self.parents if pointing_parents else self.children)[pos].pending(self):
+                return Signals.PAUSE, pointing_parents, pos
+        return None
+
+    def hooked(self):
+        return (
+            type(self).start_of_loop is not NyanInterpreter.start_of_loop
+            or type(self).end_of_loop is not NyanInterpreter.end_of_loop
+        )
+
+    def hot_loop(self, start):
+        # loop is compiled once it's hot, then run by compiled function whenever it goes round
+        loop = self.loops.get(start)
+        if loop is None:
+            source = PythonGenerator(self.code, self.origins, self.source_map, self.filename.name, fuel=True)
+            source = source.generate_loop(start)
+            if source is None:
+                # loop talks to modules or keywords, and stays interpreted
+                self.heat[start + 1] = -1
+                return None
+            namespace = {"__name__": f"nyan_{self.filename.stem}"}
+            exec(compile(source, str(self.filename), "exec"), namespace)
+            loop = namespace[f"loop_{start}"]
+            if len(self.loops) >= self.loops_size:
+                evicted = next(iter(self.loops))
+                del self.loops[evicted]
+                self.heat[evicted + 1] = self.hot_threshold
+            self.loops[start] = loop
+            _logger.debug("Nyan \"%s\" compiled hot loop at %d.", self.filename.stem, start)
+        self.heat[start + 1] = 1
+        return loop
+
+    def step(self):
+        op, arg = self.code[self.cursor]
+        return self.execute(op, arg)
+
+    def execute(self, op, arg):
+        if op == Opcodes.ADD:
+            self.memory.set(self.pointer, self.memory.get(self.pointer) + arg)
+        elif op == Opcodes.MOVE:
+            self.pointer.set(self.pointer.get() + arg)
+        elif op == Opcodes.MODULE_MOVE:
+            self.module_pointer.set(self.module_pointer.get() + arg)
+        elif op == Opcodes.JUMP_ZERO:
+            if self.memory.get(self.pointer) == 0:
+                self.cursor = arg
+                return
+        elif op == Opcodes.JUMP_NONZERO:
+            if self.memory.get(self.pointer) != 0:
+                self.cursor = arg
+                return
+        elif op == Opcodes.OUTPUT:
+            self.io.write(self.memory.get(self.pointer), arg)
+        elif op == Opcodes.PRINT:
+            self.io.write_text(("{"+str(self.memory.get(self.pointer))+"}") * arg)
+        elif op == Opcodes.INPUT:
+            if self.io.starved(arg):
+                return Signals.KEEP_GOING, self.pointing_parents, self.module_pointer
+            self.memory.set(self.pointer, self.io.read(arg))
+        elif op == Opcodes.SET:
+            self.memory.set(self.pointer, arg)
+        elif op == Opcodes.SCAN:
+            self.pointer.set(self.memory.scan(self.pointer.get(), arg))
+        elif op == Opcodes.MULTIPLY:
+            self.memory.multiply(self.pointer.get(), arg)
+        elif op == Opcodes.HALT:
+            if (raw_response := self.drain()) is not None:
+                return raw_response
+            if self.sub:
+                return Signals.SUB_EOF, self.pointing_parents, self.module_pointer
+            self.io.write_text("\n\n")
+            self.io.flush()
+            return Signals.MAIN_EOF, self.pointing_parents, self.module_pointer
+        else:
+            if arg not in self.keywords:
+                raise SyntaxError(f"Invalid character {arg}")
+            raw_response = self.keywords[arg](self)
+            if type(raw_response) == tuple:
+                return raw_response
+        self.cursor += 1
 
     def run(self):
+        if self.code is None:
+            self.compile_program()
         self.before_run()
-        while True:
-            self.start_of_loop()
-            char = self.program[self.cursor]
-            if char == " ":
-                if not self.sub:
-                    print("\n")
-                break
-            if char in self.keywords:
-                raw_response = self.keywords[char](self)
-                if type(raw_response) == tuple:
+        fuel = self.fuel_left or self.fuel or self.unlimited
+        if self.hooked():
+            while True:
+                self.start_of_loop()
+                raw_response = self.step()
+                if raw_response is not None:
+                    self.fuel_left = fuel
                     return raw_response
-            else:
-                raise SyntaxError(f"Invalid character {char}")
+                self.end_of_loop()
+                fuel -= 1
+                if fuel <= 0:
+                    self.fuel_left = 0
+                    return Signals.KEEP_GOING, self.pointing_parents, self.module_pointer
+
+        # opcodes bound to locals, attribute lookups dominate the dispatch otherwise
+        ADD, MOVE, SET = Opcodes.ADD, Opcodes.MOVE, Opcodes.SET
+        JUMP_ZERO, JUMP_NONZERO = Opcodes.JUMP_ZERO, Opcodes.JUMP_NONZERO
+        OUTPUT, SCAN, MULTIPLY = Opcodes.OUTPUT, Opcodes.SCAN, Opcodes.MULTIPLY
+        write = self.io.write
+        memory = self.memory
+        memory.reserve(self.pointer.get())
+        code = self.code
+        if self.heat is None:
+            self.heat = [self.hot_threshold] * len(code)
+        heat = self.heat
+        cells = memory.cells
+        origin = memory.origin
+        mask = memory.mask
+        size = len(cells)
+        index = self.pointer.get() + origin
+        pc = self.cursor
+        while True:
+            try:
+                while True:
+                    op, arg = code[pc]
+                    if op == ADD:
+                        cells[index] = (cells[index] + arg) & mask
+                    elif op == MOVE:
+                        index += arg
+                        if not 0 <= index < size:
+                            memory.reserve(index - origin)
+                            index += memory.origin - origin
+                            cells = memory.cells
+                            origin = memory.origin
+                            size = len(cells)
+                    elif op == JUMP_ZERO:
+                        if not cells[index]:
+                            pc = arg
+                            continue
+                    elif op == JUMP_NONZERO:
+                        if cells[index]:
+                            # back-edges spend fuel by length of loop, so long loops give way to other programs
+                            fuel -= pc - arg + 1
+                            pc = arg
+                            if fuel <= 0:
+                                self.fuel_left = 0
+                                self.cursor = pc
+                                self.pointer.set(index - origin)
+                                return Signals.KEEP_GOING, self.pointing_parents, self.module_pointer
+                            heat[pc] -= 1
+                            if not heat[pc] and (loop := self.hot_loop(pc - 1)) is not None:
+                                self.cursor = pc
+                                try:
+                                    pc, cells, origin, size, index, fuel = loop(
+                                        self, memory, mask, cells, origin, size, index, fuel
+                                    )
+                                except LimitExceeded:
+                                    pc = self.cursor
+                                    raise
+                                if fuel <= 0:
+                                    self.fuel_left = 0
+                                    self.cursor = pc
+                                    self.pointer.set(index - origin)
+                                    return Signals.KEEP_GOING, self.pointing_parents, self.module_pointer
+                            continue
+                    elif op == OUTPUT:
+                        write(cells[index], arg)
+                    elif op == SET:
+                        cells[index] = arg & mask
+                    elif op == SCAN or op == MULTIPLY:
+                        address = index - origin
+                        if op == SCAN:
+                            address = memory.scan(address, arg)
+                        else:
+                            memory.multiply(address, arg)
+                        memory.reserve(address)
+                        cells = memory.cells
+                        origin = memory.origin
+                        size = len(cells)
+                        index = address + origin
+                    else:
+                        # rare instructions run through the slow path on synced state
+                        self.cursor = pc
+                        self.pointer.set(index - origin)
+                        raw_response = self.execute(op, arg)
+                        if raw_response is not None:
+                            self.fuel_left = fuel
+                            return raw_response
+                        memory = self.memory
+                        memory.reserve(self.pointer.get())
+                        code = self.code
+                        cells = memory.cells
+                        origin = memory.origin
+                        mask = memory.mask
+                        size = len(cells)
+                        index = self.pointer.get() + origin
+                        pc = self.cursor
+                        continue
+                    pc += 1
+            except OverflowError:
+                memory.promote()
+                cells = memory.cells
+            except LimitExceeded:
+                # tape ran out while moving, error is located at synced cursor
+                self.cursor = pc
+                raise
+
+
+class NyanBinaryInterpreter(NyanInterpreter):
+    __slots__ = ("constant_program", "bundle", "module", "constants", "multipliers", "table")
+    cache_tag = "binary"
+    # handlers by byte of builder, made once as builder is defined after this class
+    binary_keyword_table = None
+
+    def __init__(self, filename, subprocess=False, debug=False, tape=None, optimize=False, cache=None, io=None):
+        super().__init__(filename, subprocess, debug, tape, optimize, cache, io)
+        if NyanBinaryInterpreter.binary_keyword_table is None:
+            NyanBinaryInterpreter.binary_keyword_table = MappingProxyType(
+                {value: NyanInterpreter.keyword_table[keyword] for keyword, value in NyanBuilder.keywords.items()}
+            )
+        self.keywords = self.binary_keyword_table
+        self.constant_program = None
+        self.bundle = None
+        self.module = None
+        self.constants = None
+        self.multipliers = {}
+        self.table = None
+
+    def init(self, compiled=None):
+        if self.filename.suffix == ".nya" and os.path.exists(self.filename):
+            with open(self.filename, "rb") as _f:
+                start = _f.read(len(Bundle.magic))
+            if Bundle.is_bundle(start):
+                bundle = Bundle.open(self.filename)
+                return self.load(bundle, bundle.root)
+        return super().init(compiled)
+
+    def load(self, bundle, module):
+        self.bundle = bundle
+        self.module = module
+        self.constants = bundle.constants(module)
+        self.multipliers = {}
+        # words are decoded once, and run by the same loop as text programs
+        self.code = []
+        for word in bundle.code(module):
+            op = word & 0xFF
+            self.code.append((op, self.argument(op, word >> 8)))
+        self.analysis = ProgramAnalyzer(self.code).analyze()
+        self.heat = None
+        self.loops = {}
+        self.memory = self.new_memory()
+        self.initialized = True
+        _logger.debug("Nyan \"%s\" loaded from bundle.", self.filename.stem)
+        return self
 
-            self.cursor += 1
-            self.end_of_loop()
+    def compiler(self):
+        return BinaryProgramCompiler(self.program, self.instructions())
+
+    def compile_program(self):
+        # version 1 builds keep their file data, modules of bundles are decoded by load
+        if self.constant_program is not None:
+            super().compile_program()
+
+    def argument(self, op, arg):
+        if op in (Opcodes.TOGGLE, Opcodes.READ, Opcodes.WRITE, Opcodes.CALL):
+            return arg.to_bytes(1, "big")
+        if op == Opcodes.MULTIPLY:
+            if arg not in self.multipliers:
+                pairs = self.constants[arg + 1:arg + 1 + 2 * self.constants[arg]]
+                self.multipliers[arg] = tuple(zip(pairs[::2], pairs[1::2]))
+            return self.multipliers[arg]
+        return arg
+
+    def execute(self, op, arg):
+        if op != Opcodes.HALT or self.constant_program is None:
+            return super().execute(op, arg)
+        # version 1 builds end without the blank lines of text programs
+        if (raw_response := self.drain()) is not None:
+            return raw_response
         if self.sub:
             return Signals.SUB_EOF, self.pointing_parents, self.module_pointer
+        self.io.flush()
         return Signals.MAIN_EOF, self.pointing_parents, self.module_pointer
 
+    def cache_entry(self):
+        entry = super().cache_entry()
+        entry["constant_program"] = self.constant_program
+        return entry
 
-class NyanBinaryInterpreter(NyanInterpreter):
-    def __init__(self, filename, subprocess=False, debug=False):
-        super().__init__(filename, subprocess, debug)
-        sample = NyanInterpreter(Path("."))
-        _temp = {}
-        for k, v in NyanBuilder.keywords.items():
-            _temp[v] = sample.keywords[k]
-        self.keywords = {**_temp}
-        self.constant_program = None
+    def restore(self, entry):
+        super().restore(entry)
+        self.constant_program = entry["constant_program"]
 
     def add_binary_keyword(self, keyword):
         def wrapper(handler):
+            if not isinstance(self.keywords, dict):
+                self.keywords = dict(self.keywords)
             self.keywords[keyword] = handler
+            self.table = None
+            if self.constant_program is not None:
+                self.code = None
+                self.analysis = None
+                self.heat = None
+                self.loops = {}
         return wrapper
 
     def parse_program(self):
@@ -311,86 +2203,469 @@ class NyanBinaryInterpreter(NyanInterpreter):
         if self.filename.suffix != ".nya":
             raise ValueError(f"Invalid file extension {self.filename.suffix} - File extension must be .nya")
         with open(self.filename, "rb") as _f:
-            self.program = _f.read()
-            self.constant_program = self.program
-            if self.program[0].to_bytes(1, "big") == b"\x00":
-                cursor = 3
-                for _ in range(int(self.program[1:3].hex(), 16)):
-                    filename_break = self.program.index(b"\x0a", cursor+4) + 1
-                    cursor += filename_break - cursor
-                self.program = self.program[cursor:]
-            elif self.program[0].to_bytes(1, "big") == b"\x01":
-                self.program = self.program[1:]
-            else:
-                raise SyntaxError(f"Invalid start byte {self.program[0].to_bytes(1, 'big')}")
+            self.constant_program = _f.read()
+        # program is a view of file data, indexing it gives opcodes as int
+        if self.constant_program[0] == 0x00:
+            cursor = 3
+            for _ in range(int.from_bytes(self.constant_program[1:3], "big")):
+                cursor = self.constant_program.index(b"\x0a", cursor+4) + 1
+            self.program = memoryview(self.constant_program)[cursor:]
+        elif self.constant_program[0] == 0x01:
+            self.program = memoryview(self.constant_program)[1:]
+        else:
+            raise SyntaxError(f"Invalid start byte {self.constant_program[0].to_bytes(1, 'big')}")
 
     def parse_loop_points(self):
-        def _find_match(start_pair):
-            next_to = -1
-            find_point = start_pair + 1
-            while find_point <= len(self.program):
-                char = self.program[find_point].to_bytes(1, "big")
-                if find_point > next_to:
-                    if char == NyanBuilder.keywords["-"]:
-                        self.jump_points[find_point] = start_pair
-                        self.next_points[start_pair] = find_point
-                        return find_point
-                    if char == NyanBuilder.keywords["~"]:
-                        next_to = _find_match(find_point)
-                if char in NyanBuilder.compress_target:
-                    find_point += 4
-                else:
-                    find_point += 1
-            raise SyntaxError("No matching - for ~")
-
+        loops = []
+        start_byte = NyanBuilder.keywords["~"][0]
+        end_byte = NyanBuilder.keywords["-"][0]
         cursor = 0
         while cursor < len(self.program):
-            char = self.program[cursor].to_bytes(1, "big")
-            if char == NyanBuilder.keywords["~"]:
-                _find_match(cursor)
-            if char in NyanBuilder.compress_target:
+            byte = self.program[cursor]
+            if byte == start_byte:
+                loops.append(cursor)
+            elif byte == end_byte:
+                if not loops:
+                    raise self.loop_error("No matching ~ for -", cursor)
+                start_pair = loops.pop()
+                self.jump_points[cursor] = start_pair
+                self.next_points[start_pair] = cursor
+            if byte in NyanBuilder.compress_target:
                 cursor += 4
             else:
                 cursor += 1
+        if loops:
+            raise self.loop_error("No matching - for ~", loops[-1])
+
+    def instructions(self):
+        # (opcode, argument, width) by byte, made once for keywords of this cat
+        if self.table is None:
+            self.table = []
+            for byte in range(256):
+                keyword = byte.to_bytes(1, "big")
+                op, arg = getattr(self.keywords.get(keyword), "instruction", (None, None))
+                if op in ProgramCompiler.forwarded:
+                    arg = keyword
+                self.table.append((op, arg, 4 if byte in NyanBuilder.compress_target else 1))
+        return self.table
+
+
+class NyanPythonInterpreter(NyanInterpreter):
+    __slots__ = ("source", "bytecode", "function", "fueled", "generator")
+    cache_tag = "python"
+
+    def __init__(self, filename, subprocess=False, debug=False, tape=None, optimize=False, cache=None, io=None):
+        super().__init__(filename, subprocess, debug, tape, optimize, cache, io)
+        self.source = None
+        self.bytecode = None
+        self.function = None
+        self.fueled = None
+        self.generator = None
+
+    def parse_program(self):
+        if self.filename.suffix != ".py":
+            return super().parse_program()
+        if not os.path.exists(self.filename):
+            raise FileNotFoundError(f"File \"{self.filename}\" not found")
+        with open(self.filename, "r", encoding="utf-8") as _f:
+            self.source = _f.read()
+        self.load_source()
+
+    def parse_loop_points(self):
+        if self.filename.suffix != ".py":
+            super().parse_loop_points()
+
+    def compile_program(self):
+        if self.filename.suffix == ".py":
+            return
+        super().compile_program()
+        self.source = PythonGenerator(self.code, self.origins, self.source_map, self.filename.name).generate()
+        self.load_source()
+
+    def load_source(self):
+        self.bytecode = compile(self.source, str(self.filename), "exec")
+        self.load_bytecode()
+
+    def load_bytecode(self):
+        namespace = {"__name__": f"nyan_{self.filename.stem}"}
+        exec(self.bytecode, namespace)
+        self.function = namespace["run"]
+        self.fueled = None
+        self.generator = None
+
+    def fueled_function(self):
+        # loops spending fuel are slower, so they are generated only for runs with fuel
+        if self.fueled is None:
+            if self.code is None:
+                self.fueled = self.function
+            else:
+                source = PythonGenerator(self.code, self.origins, self.source_map, self.filename.name, fuel=True)
+                namespace = {"__name__": f"nyan_{self.filename.stem}"}
+                exec(compile(source.generate(), str(self.filename), "exec"), namespace)
+                self.fueled = namespace["run"]
+        return self.fueled
+
+    def cache_entry(self):
+        return {**super().cache_entry(), "source": self.source, "bytecode": self.bytecode}
+
+    def restore(self, entry):
+        super().restore(entry)
+        self.source = entry["source"]
+        self.bytecode = entry["bytecode"]
+        self.load_bytecode()
+
+    def reset(self):
+        super().reset()
+        self.generator = None
+
+    def dump_state(self):
+        # generated code keeps its place in a generator, which can't be saved
+        if self.generator is not None:
+            raise ValueError(f"Cat {self.filename} is running generated Python code, which can't be saved")
+        return super().dump_state()
+
+    def load_state(self, state):
+        if state[0]:
+            raise ValueError(f"Cat {self.filename} runs generated Python code, which can't resume from a cursor")
+        super().load_state(state)
+        self.generator = None
+
+    def export(self, output=None):
+        if output:
+            out = Path(output).absolute()
+            if out.suffix != ".py":
+                raise ValueError("Output file suffix must end with .py")
+        else:
+            out = Path(self.filename.stem+".py")
+        _logger.info("Compiling %s", self.filename.stem)
+        with open(out, "w", encoding="utf-8") as _f:
+            _f.write(self.source)
+        return out
 
     def run(self):
+        if self.function is None or (self.code is None and self.filename.suffix != ".py"):
+            self.compile_program()
+        if self.generator is None:
+            self.generator = (self.function if self.fuel is None else self.fueled_function())(self)
         self.before_run()
-        while True:
-            self.start_of_loop()
-            try:
-                char = self.program[self.cursor].to_bytes(1, 'big')
-            except IndexError:
-                break
-            if char in NyanBuilder.compress_target:
-                times = int(self.program[self.cursor + 1:self.cursor + 4].hex(), 16)
-                for _ in range(times):
-                    self.keywords[char](self)
-                self.cursor += 4
-            else:
-                raw_response = self.keywords[char](self)
-                if type(raw_response) == tuple:
-                    return raw_response
-                self.cursor += 1
-            self.end_of_loop()
+        try:
+            return next(self.generator)
+        except StopIteration:
+            self.generator = None
         if self.sub:
             return Signals.SUB_EOF, self.pointing_parents, self.module_pointer
+        self.io.write_text("\n\n")
+        self.io.flush()
         return Signals.MAIN_EOF, self.pointing_parents, self.module_pointer
 
 
+class Mailbox:
+    # pipe every process writes to under a lock, so messages are read in the order they were written. queues of
+    # multiprocessing write from a thread of their own, where a message may overtake one another process wrote first.
+    def __init__(self, context):
+        self.reader, self.writer = context.Pipe(duplex=False)
+        self.lock = context.Lock()
+
+    def put(self, message):
+        with self.lock:
+            self.writer.send(message)
+
+    def get(self, timeout=None):
+        import queue
+
+        if timeout is not None and not self.reader.poll(timeout):
+            raise queue.Empty
+        return self.reader.recv()
+
+
+class ParallelChannel:
+    def __init__(self, worker, cat, link, target):
+        self.worker = worker
+        self.cat = cat
+        self.link = link
+        self.target = target
+        self.received = 0
+        self.credits = worker.options["channel_size"]
+
+    def send(self, nyan, data):
+        # output before a message is written before anything its receiver prints
+        nyan.io.flush()
+        self.credits -= 1
+        # channel is full, so like NyanEngine.run this cat waits until receiver gives way
+        waiters = [] if self.credits else self.worker.give_way(self.cat, "sending")
+        # engine counts the value before receiver can read it, and value goes straight to receiver's worker.
+        # receiver waiting on this cat is let go by the same message
+        self.worker.post(("send", self.cat, self.link))
+        self.worker.post((
+            "value", self.target, self.link, data, None if self.credits else self.cat,
+            [link for sender, link in waiters if sender == self.target]
+        ), self.target)
+        self.worker.grant([(sender, link) for sender, link in waiters if sender != self.target])
+        if not self.credits:
+            self.credits = self.worker.credits[self.cat, self.link].get()
+        return False
+
+    def receive(self, nyan):
+        inbound = self.worker.inbound[self.cat, self.link]
+        if inbound.empty():
+            nyan.io.flush()
+            waiters = self.worker.give_way(self.cat, self.link, inbound.empty)
+            if waiters is not None:
+                self.worker.grant(waiters)
+                self.worker.post(("blocked", self.cat, self.link, self.received))
+        value = inbound.get()
+        self.received += 1
+        self.worker.received[self.cat] += 1
+        return value
+
+    def pending(self, nyan):
+        if not nyan.sub:
+            self.worker.grant(self.worker.give_way(self.cat, "quiet"))
+            self.worker.post(("quiet", self.cat))
+            self.worker.quiet[self.cat].get()
+        return 0
+
+
+class ChannelIO(NyanIO):
+    def __init__(self, worker, cat, **options):
+        super().__init__(**options)
+        self.worker = worker
+        self.cat = cat
+
+    def flush(self):
+        if not self.output:
+            return
+        data = "".join(self.output) if self.mode == "text" else b"".join(self.output)
+        self.output = []
+        self.size = 0
+        self.worker.post(("output", self.cat, data))
+
+    def fill(self):
+        self.flush()
+        self.worker.post(("input", self.cat))
+        self.pending = self.worker.inputs[self.cat].get()
+        self.position = 0
+        return bool(self.pending)
+
+
+class NyanWorker:
+    def __init__(self, index, owners, recipes, links, options, mailboxes, events):
+        self.index = index
+        self.owners = owners
+        self.cats = [cat for cat, owner in enumerate(owners) if owner == index]
+        self.recipes = recipes
+        self.links = links
+        self.options = options
+        self.mailboxes = mailboxes
+        self.events = events
+        self.nyans = {}
+        self.inbound = {}
+        self.credits = {}
+        self.inputs = {}
+        self.quiet = {}
+        self.starts = {}
+        self.received = {}
+        self.delivered = {}
+        self.held = {}
+        # what each cat gave way to - None while it runs, link it waits to read, "idle", "sending", "quiet" or
+        # "halted" - and cats which filled a channel to it, waiting for it to give way
+        self.given = {}
+        self.waiters = {}
+        self.lock = None
+        self.posting = None
+
+    def create_nyan(self, cat):
+        interpreter, path, subprocess, entry = self.recipes[cat]
+        io = ChannelIO(self, cat, mode=self.options["mode"], encoding=self.options["encoding"])
+        nyan = interpreter(
+            path, subprocess=subprocess, debug=self.options["debug"], tape=self.options["tape"],
+            optimize=self.options["optimize"], io=io
+        )
+        # instructions are counted by coordinator, which hears of every fuel spent
+        nyan.fuel = self.options["fuel"]
+        nyan.tape_limit = self.options["max_tape"]
+        # program is the one engine compiled, so sources in memory run and files changed since don't
+        nyan.restore(marshal.loads(entry))
+        nyan.memory = nyan.new_memory()
+        nyan.initialized = True
+        return nyan
+
+    def give_way(self, cat, given, check=None):
+        # senders waiting on cat go on once it stops running, like NyanEngine.run switching back to them
+        with self.lock:
+            if check is not None and not check():
+                return None
+            self.given[cat] = given
+            waiters, self.waiters[cat] = self.waiters[cat], []
+        return waiters
+
+    def post(self, message, cat=None):
+        # message to engine, or to worker of cat. worker stops between messages, leaving no lock of pipes held
+        with self.posting:
+            (self.events if cat is None else self.mailboxes[self.owners[cat]]).put(message)
+
+    def grant(self, waiters):
+        for sender, link in waiters:
+            self.post(("credit", sender, link), sender)
+
+    def credit(self, cat, link):
+        with self.lock:
+            self.given[cat] = None
+        self.credits[cat, link].put(self.options["channel_size"])
+
+    def start(self, cat):
+        with self.lock:
+            self.given[cat] = None
+        self.starts[cat].put(True)
+
+    def run(self):
+        import queue
+        import threading
+
+        self.lock = threading.Lock()
+        self.posting = threading.Lock()
+        for cat in self.cats:
+            self.nyans[cat] = self.create_nyan(cat)
+            self.inputs[cat] = queue.Queue()
+            self.quiet[cat] = queue.Queue()
+            self.starts[cat] = queue.Queue()
+            self.received[cat] = 0
+            self.delivered[cat] = 0
+            self.given[cat] = "idle" if self.nyans[cat].sub else None
+            self.waiters[cat] = []
+        for link, (parent, pos, child, tpos) in enumerate(self.links):
+            if parent in self.nyans:
+                self.inbound[parent, link] = queue.Queue()
+                self.credits[parent, link] = queue.Queue()
+                self.nyans[parent].add_child(ParallelChannel(self, parent, link, child), pos)
+            if child in self.nyans:
+                self.inbound[child, link] = queue.Queue()
+                self.credits[child, link] = queue.Queue()
+                self.nyans[child].add_parent(ParallelChannel(self, child, link, parent), tpos)
+        for cat in self.cats:
+            threading.Thread(target=self.serve, args=(cat,), daemon=True).start()
+        mailbox = self.mailboxes[self.index]
+        while True:
+            command, *args = mailbox.get()
+            match command:
+                case "start":
+                    cat, expected = args
+                    # values engine counted before starting cat may still be on their way from other workers
+                    if self.delivered[cat] < expected:
+                        self.held[cat] = expected
+                    else:
+                        self.start(cat)
+                case "value":
+                    cat, link, value, sender, credited = args
+                    self.delivered[cat] += 1
+                    with self.lock:
+                        self.inbound[cat, link].put(value)
+                        if self.given[cat] == link:
+                            self.given[cat] = None
+                        # cat let go by this message runs on, so its sender waits for it to give way again
+                        for credit in credited:
+                            self.given[cat] = None
+                            self.credits[cat, credit].put(self.options["channel_size"])
+                        # an idle cat runs once engine starts it for this value
+                        waits = sender is not None and self.given[cat] in (None, "idle")
+                        if waits:
+                            self.waiters[cat].append((sender, link))
+                    if sender is not None and not waits:
+                        self.grant([(sender, link)])
+                    if self.held.get(cat) == self.delivered[cat]:
+                        del self.held[cat]
+                        self.start(cat)
+                case "credit":
+                    self.credit(*args)
+                case "input":
+                    cat, data = args
+                    self.inputs[cat].put(data)
+                case "quiet":
+                    with self.lock:
+                        self.given[args[0]] = None
+                    self.quiet[args[0]].put(True)
+                case "stop":
+                    for cat in self.cats:
+                        self.nyans[cat].io.flush()
+                    self.posting.acquire()
+                    return
+
+    def serve(self, cat):
+        nyan = self.nyans[cat]
+        try:
+            while True:
+                if nyan.sub:
+                    self.starts[cat].get()
+                self.received[cat] = 0
+                while True:
+                    # pause only comes from reading 0, which is read again like in NyanEngine.run
+                    signal, parent_mode, mouse_pointer = nyan.run()
+                    if signal == Signals.KEEP_GOING:
+                        self.post(("spent", cat, nyan.fuel, nyan.cursor, nyan.position()))
+                        nyan.fuel_left = None
+                    elif signal != Signals.PAUSE:
+                        break
+                nyan.io.flush()
+                if signal == Signals.MAIN_EOF:
+                    self.grant(self.give_way(cat, "halted"))
+                    self.post(("halt", cat))
+                    return
+                nyan.reset()
+                # engine may start cat again as soon as it hears it's idle
+                self.grant(self.give_way(cat, "idle"))
+                self.post(("idle", cat, self.received[cat]))
+        except LimitExceeded as error:
+            nyan.io.flush()
+            self.post(("limit", cat, error.at(nyan)))
+        except Exception as error:
+            nyan.io.flush()
+            self.post(("error", cat, f"{type(error).__name__}: {error}"))
+
+
 class NyanEngine:
-    def __init__(self, root_name, *, debug=False):
+    backends = ("interpreter", "python")
+    limit_fuel = 1 << 16
+
+    def __init__(
+        self, root_name, *, debug=False, tape=None, optimize=False, backend="interpreter", cache=True, io=None,
+        channel_size=1, workers=None, sources=None, max_instructions=None, max_tape=None, timeout=None, compiled=None
+    ):
         self.debug = debug
+        self.compiled = compiled
+        self.sources = {Path(path).absolute(): data for path, data in (sources or {}).items()}
+        self.channel_size = channel_size
+        self.workers = workers
+        for name, value in (("max_instructions", max_instructions), ("max_tape", max_tape), ("timeout", timeout)):
+            if value is not None and value <= 0:
+                raise ValueError(f"Invalid {name} {value} - Limits must be positive")
+        self.max_instructions = max_instructions
+        self.max_tape = max_tape
+        self.timeout = timeout
+        self.spent = 0
+        self.deadline = None
+        self.io = io if io is not None else NyanIO()
+        self.tape = tape_type(tape)
+        self.optimize = optimize
+        if cache is True:
+            self.cache = ProgramCache()
+        elif cache:
+            self.cache = ProgramCache(cache)
+        else:
+            self.cache = None
+        if backend not in self.backends:
+            raise ValueError(f"Invalid backend {backend} - Backend must be one of {', '.join(self.backends)}")
+        self.backend = backend
         if self.debug:
+            import logging
+
             logging.basicConfig(level=logging.DEBUG)
-            _logger.level = logging.DEBUG
+            logging.getLogger(_logger.name).setLevel(logging.DEBUG)
 
         path = Path(root_name).absolute()
-        if path.suffix == ".nya":
-            self.root = NyanBinaryInterpreter(Path(root_name).absolute(), debug=self.debug).init()
-        else:
-            self.root = NyanInterpreter(Path(root_name).absolute(), debug=self.debug).init()
+        self.root = self.create_nyan(path)
         self.nodetree = []
         self.references = {}
+        self.links = []
 
         self.nyans = [self.root]
 
@@ -399,26 +2674,99 @@ class NyanEngine:
         else:
             self.find_mouse_info()
 
+    def interpreter(self, path):
+        if path.suffix == ".nya":
+            return NyanBinaryInterpreter
+        if path.suffix == ".py" or self.backend == "python":
+            return NyanPythonInterpreter
+        return NyanInterpreter
+
+    def create_nyan(self, path, subprocess=False, lazy=False):
+        # lazy modules are parsed by load when first switched to
+        interpreter = self.interpreter(path)
+        if path not in self.sources:
+            if lazy and not path.exists():
+                raise FileNotFoundError(f"Module {path} not found")
+            nyan = interpreter(
+                path, subprocess=subprocess, debug=self.debug, tape=self.tape, optimize=self.optimize,
+                cache=self.cache, io=self.io
+            )
+            # tape is chosen by init, which keeps it within limit
+            nyan.tape_limit = self.max_tape
+            return nyan if lazy else nyan.init(self.compiled)
+        # sources in memory are never cached, as cache keys are made of files
+        nyan = interpreter(
+            path, subprocess=subprocess, debug=self.debug, tape=self.tape, optimize=self.optimize, io=self.io
+        )
+        nyan.tape_limit = self.max_tape
+        data = self.sources[path]
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            bundle = Bundle(data, path)
+            return nyan.load(bundle, bundle.root)
+        nyan.text = data
+        return nyan if lazy else nyan.init(self.compiled)
+
+    def load(self, nyan):
+        if not nyan.initialized:
+            nyan.init(self.compiled)
+        return nyan
+
+    def load_modules(self):
+        for nyan in self.nyans:
+            self.load(nyan)
+
+    def clone(self, io=None):
+        # clones share compiled programs, so modules are parsed once here instead of in every clone
+        self.load_modules()
+        engine = copy.copy(self)
+        engine.io = io if io is not None else self.io
+        nyans = {id(nyan): nyan.clone(engine.io) for nyan in self.nyans}
+        engine.root = nyans[id(self.root)]
+        engine.nyans = list(nyans.values())
+        engine.references = {path: nyans[id(nyan)] for path, nyan in self.references.items()}
+        engine.links = [(nyans[id(parent)], pos, nyans[id(child)], tpos) for parent, pos, child, tpos in self.links]
+        engine.nodetree = []
+        for parent, pos, child, tpos in engine.links:
+            _comm = Communicator(parent, child, self.channel_size)
+            parent.add_child(_comm, pos)
+            child.add_parent(_comm, tpos)
+        return engine
+
+    def optimization_report(self):
+        self.load_modules()
+        return [line for nyan in self.nyans for line in nyan.optimization_report()]
+
+    def analysis_report(self):
+        self.load_modules()
+        return [line for nyan in self.nyans for line in nyan.analysis_report()]
+
     def read_mouse(self, path):
-        with open(path, "r", encoding="utf-8") as _f:
-            for index, line in enumerate(_f.readlines()):
-                mobj = re.match(r"(?P<position>-?\d+)\s*->\s*(?P<target_pos>-?\d+):\s*(?P<filename>.*)\n?", line)
-                if not mobj:
-                    raise SyntaxError(f"Invalid mouse info: line {index}")
-                try:
-                    _pos = int(mobj.group("position"))
-                    _tpos = int(mobj.group("target_pos"))
-                    _file = str(mobj.group("filename"))
-                except ValueError:
-                    raise ValueError(f"Invalid mouse position in line {index} - "
-                                     f"{mobj.group('position')} or {mobj.group('target_pos')}")
-                yield _pos, _tpos, _file
+        if Path(path) in self.sources:
+            lines = self.sources[Path(path)].splitlines(keepends=True)
+        else:
+            with open(path, "r", encoding="utf-8") as _f:
+                lines = _f.readlines()
+        for index, line in enumerate(lines):
+            mobj = re.match(r"(?P<position>-?\d+)\s*->\s*(?P<target_pos>-?\d+):\s*(?P<filename>.*)\n?", line)
+            if not mobj:
+                raise SyntaxError(f"Invalid mouse info: line {index}")
+            try:
+                _pos = int(mobj.group("position"))
+                _tpos = int(mobj.group("target_pos"))
+                _file = str(mobj.group("filename"))
+            except ValueError:
+                raise ValueError(f"Invalid mouse position in line {index} - "
+                                 f"{mobj.group('position')} or {mobj.group('target_pos')}")
+            yield _pos, _tpos, _file
 
     def mouse_exists(self, nyan=None):
         if not nyan:
             _mpath = os.path.join(self.root.filename.parent, self.root.filename.stem + ".mouse")
         else:
             _mpath = os.path.join(nyan.filename.parent, nyan.filename.stem + ".mouse")
+        # modules in memory only have mouse info in memory
+        if (nyan or self.root).filename in self.sources:
+            return _mpath if Path(_mpath) in self.sources else ""
         if not os.path.exists(_mpath):
             return ""
         return _mpath
@@ -426,46 +2774,50 @@ class NyanEngine:
     def find_mouse_info(self, nyan=None):
         if not (_mpath := self.mouse_exists(nyan)):
             return
-        with open(_mpath, "r", encoding="utf-8") as _f:
-            for pos, tpos, filename in self.read_mouse(_mpath):
-                new_path = Path(
-                    os.path.join(
-                        (self.root.filename.parent if not nyan else nyan.filename.parent),
-                        Path(filename)
-                    )
-                ).absolute()
-                child_is_binary = False
-                if new_path.suffix == ".nya":
-                    child_is_binary = True
-                if new_path not in self.references:
-                    if child_is_binary:
-                        _child = NyanBinaryInterpreter(new_path, subprocess=True, debug=self.debug).init()
-                    else:
-                        _child = NyanInterpreter(new_path, subprocess=True, debug=self.debug).init()
-                    self.references[new_path] = _child
-                    self.nyans.append(_child)
-                else:
-                    _child = self.references[new_path]
-                if not nyan:
-                    _comm = Communicator(self.root, _child)
-                    self.root.add_child(_comm, pos)
-                else:
-                    _comm = Communicator(nyan, _child)
-                    nyan.add_child(_comm, pos)
-                _child.add_parent(_comm, tpos)
-                if child_is_binary:
-                    self.find_binary_mouse_info(_child)
-                else:
-                    self.find_mouse_info(_child)
+        for pos, tpos, filename in self.read_mouse(_mpath):
+            new_path = Path(
+                os.path.join(
+                    (self.root.filename.parent if not nyan else nyan.filename.parent),
+                    Path(filename)
+                )
+            ).absolute()
+            child_is_binary = False
+            if new_path.suffix == ".nya":
+                child_is_binary = True
+            # modules linked again are already walked, with their links
+            walked = new_path in self.references
+            if not walked:
+                _child = self.create_nyan(new_path, subprocess=True, lazy=not child_is_binary)
+                self.references[new_path] = _child
+                self.nyans.append(_child)
+            else:
+                _child = self.references[new_path]
+            if not nyan:
+                _comm = Communicator(self.root, _child, self.channel_size)
+                self.root.add_child(_comm, pos)
+            else:
+                _comm = Communicator(nyan, _child, self.channel_size)
+                nyan.add_child(_comm, pos)
+            _child.add_parent(_comm, tpos)
+            self.links.append((nyan or self.root, pos, _child, tpos))
+            if walked:
+                continue
+            if child_is_binary:
+                self.find_binary_mouse_info(_child)
+            else:
+                self.find_mouse_info(_child)
 
     def read_binary_mouse(self, path):
         count = int(path[1:3].hex(), 16)
         cursor = 3
         for _ in range(count):
             pos = int(path[cursor:cursor+2].hex(), 16)
-            tpos = int(path[cursor+2:cursor+4].hex(), 16)
-            filename_break = path.index(b"\x0a", cursor+4)+1
-            filename = path[cursor+4:filename_break].decode(encoding="utf-8")[2:-1]
+            if path[cursor+2] == 1:
+                tpos = int(path[cursor+3:cursor+5].hex(), 16)
+            else:
+                tpos = int(path[cursor+2:cursor+4].hex(), 16)
+            filename_break = path.index(b"\x0a", cursor+6)+1
+            filename = path[cursor+6:filename_break-1].decode(encoding="utf-8")
             yield pos, tpos, filename
             cursor += filename_break - cursor
 
@@ -480,6 +2832,8 @@ class NyanEngine:
             target_nyan = nyan
         else:
             target_nyan = self.root
+        if target_nyan.bundle is not None:
+            return self.find_bundle_info(target_nyan)
         if not self.binary_mouse_exists(target_nyan.constant_program):
             return
         for pos, tpos, filename in self.read_binary_mouse(target_nyan.constant_program):
@@ -492,48 +2846,340 @@ class NyanEngine:
             child_is_binary = False
             if new_path.suffix == ".nya":
                 child_is_binary = True
-            if new_path not in self.references:
-                if child_is_binary:
-                    _child = NyanBinaryInterpreter(new_path, subprocess=True, debug=self.debug).init()
-                else:
-                    _child = NyanInterpreter(new_path, subprocess=True, debug=self.debug).init()
+            # modules linked again are already walked, with their links
+            walked = new_path in self.references
+            if not walked:
+                _child = self.create_nyan(new_path, subprocess=True, lazy=not child_is_binary)
                 self.references[new_path] = _child
                 self.nyans.append(_child)
             else:
                 _child = self.references[new_path]
-            _comm = Communicator(target_nyan, _child)
+            _comm = Communicator(target_nyan, _child, self.channel_size)
             target_nyan.add_child(_comm, pos)
             _child.add_parent(_comm, tpos)
+            self.links.append((target_nyan, pos, _child, tpos))
+            if walked:
+                continue
             if child_is_binary:
                 self.find_binary_mouse_info(_child)
             else:
                 self.find_mouse_info(_child)
 
-    def run(self):
-        while True:
-            if not self.nodetree:
-                nyan = self.root
-            else:
-                nyan = self.nodetree[-1]
-            _logger.debug(f"Running {nyan.filename.stem}")
-            signal, parent_mode, mouse_pointer = nyan.run()
-            match signal:
-                case Signals.PAUSE:
-                    if parent_mode:
-                        points = nyan.parents[mouse_pointer].get_nyan(nyan)
-                    else:
-                        points = nyan.children[mouse_pointer].get_nyan(nyan)
-                    if len(self.nodetree) >= 2 and self.nodetree[-2] == points:
-                        self.nodetree = self.nodetree[:-1]
-                        continue
-                    self.nodetree.append(points)
-                    continue
-                case Signals.SUB_EOF:
-                    nyan.reset()
-                    self.nodetree = self.nodetree[:-1]
+    def find_bundle_info(self, nyan):
+        bundle = nyan.bundle
+        modules = {nyan.module: nyan}
+        for module in range(len(bundle.modules)):
+            if module in modules:
+                continue
+            path = Path(os.path.join(nyan.filename.parent, bundle.name(module))).absolute()
+            if path not in self.references:
+                _child = type(nyan)(
+                    path, subprocess=True, debug=self.debug, tape=self.tape, optimize=self.optimize, io=self.io
+                ).load(bundle, module)
+                self.references[path] = _child
+                self.nyans.append(_child)
+            modules[module] = self.references[path]
+        for parent, pos, child, tpos in bundle.links:
+            _comm = Communicator(modules[parent], modules[child], self.channel_size)
+            modules[parent].add_child(_comm, pos)
+            modules[child].add_parent(_comm, tpos)
+            self.links.append((modules[parent], pos, modules[child], tpos))
+
+    def run_parallel(self):
+        import multiprocessing
+        import queue
+
+        context = multiprocessing.get_context()
+        self.load_modules()
+        cats = {id(nyan): cat for cat, nyan in enumerate(self.nyans)}
+        # compiled programs are sent as the cache stores them, which any start method can pass
+        recipes = [
+            (type(nyan), nyan.filename, nyan.sub, marshal.dumps(nyan.cache_entry())) for nyan in self.nyans
+        ]
+        links = [(cats[id(parent)], pos, cats[id(child)], tpos) for parent, pos, child, tpos in self.links]
+        options = {
+            "debug": self.debug, "tape": self.tape, "optimize": self.optimize,
+            "mode": self.io.mode, "encoding": self.io.encoding, "max_tape": self.max_tape,
+            "channel_size": self.channel_size,
+            "fuel": min(self.limit_fuel, self.max_instructions) if self.max_instructions is not None else None,
+        }
+        count = min(self.workers, len(recipes))
+        owners = [cat % count for cat in range(len(recipes))]
+        events = Mailbox(context)
+        mailboxes = [Mailbox(context) for _ in range(count)]
+        processes = [
+            context.Process(
+                target=NyanWorker(index, owners, recipes, links, options, mailboxes, events).run, daemon=True
+            )
+            for index in range(count)
+        ]
+        for process in processes:
+            process.start()
+
+        # every cat is idle, running or blocked on reading a link. sub cats start on message (or read) like
+        # they would be switched to by NyanEngine.run, and run again while messages they didn't read are left.
+        state = ["running"] + ["idle"] * (len(recipes) - 1)
+        tokens = [0] * len(recipes)
+        values = [0] * len(recipes)
+        blocked = [None] * len(recipes)
+        sent = {}
+        quiet = None
+        halted = False
+        error = None
+        self.spent = 0
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+
+        def start(cat):
+            tokens[cat] = max(tokens[cat] - 1, 0)
+            state[cat] = "running"
+            mailboxes[owners[cat]].put(("start", cat, values[cat]))
+
+        def settled():
+            return all(
+                state[cat] == "blocked" or (state[cat] == "idle" and not tokens[cat])
+                for cat in range(1, len(recipes))
+            )
+
+        try:
+            while True:
+                try:
+                    event, cat, *args = events.get(timeout=max(deadline - time.monotonic(), 0) if deadline else None)
+                except queue.Empty:
+                    event, cat, args = "timeout", state.index("running") if "running" in state else 0, []
+                if deadline is not None and time.monotonic() >= deadline:
+                    error = LimitExceeded("seconds", self.timeout, recipes[cat][1])
+                    break
+                match event:
+                    case "output":
+                        self.io.write_chunk(args[0])
+                    case "input":
+                        mailboxes[owners[cat]].put(("input", cat, self.io.read_chunk()))
+                    case "send":
+                        # value itself goes straight to worker of target
+                        link = args[0]
+                        parent, _, child, _ = links[link]
+                        target = child if cat == parent else parent
+                        sent[target, link] = sent.get((target, link), 0) + 1
+                        values[target] += 1
+                        tokens[target] += 1
+                        if state[target] == "idle":
+                            start(target)
+                        elif state[target] == "blocked" and blocked[target] == link:
+                            state[target] = "running"
+                    case "blocked":
+                        link, received = args
+                        # a value already on its way wakes the cat up without any more events
+                        if sent.get((cat, link), 0) == received:
+                            state[cat] = "blocked"
+                            blocked[cat] = link
+                            parent, _, child, _ = links[link]
+                            target = child if cat == parent else parent
+                            if state[target] == "idle":
+                                tokens[target] += 1
+                                start(target)
+                    case "idle":
+                        tokens[cat] = max(tokens[cat] - max(args[0] - 1, 0), 0)
+                        state[cat] = "idle"
+                        if tokens[cat]:
+                            start(cat)
+                    case "quiet":
+                        quiet = cat
+                    case "halt":
+                        halted = True
+                    case "spent":
+                        self.spent += args[0]
+                        if self.spent >= self.max_instructions:
+                            error = LimitExceeded("instructions", self.max_instructions, recipes[cat][1], *args[1:])
+                            break
+                    case "limit":
+                        error = args[0]
+                        break
+                    case "error":
+                        error = RuntimeError(f"Cat {recipes[cat][1]} failed - {args[0]}")
+                        break
+                if quiet is not None and settled():
+                    mailboxes[owners[quiet]].put(("quiet", quiet))
+                    quiet = None
+                if halted and settled():
+                    break
+        finally:
+            for mailbox in mailboxes:
+                mailbox.put(("stop", None))
+            while any(process.is_alive() for process in processes):
+                # output flushed by stopping workers
+                try:
+                    event, cat, *args = events.get(timeout=0.1)
+                except queue.Empty:
                     continue
-                case Signals.MAIN_EOF:
+                if event == "output":
+                    self.io.write_chunk(args[0])
+            for process in processes:
+                process.join()
+            self.io.flush()
+        if error is not None:
+            raise error
+
+    def follow(self, nyan, signal, parent_mode, mouse_pointer):
+        match signal:
+            case Signals.PAUSE:
+                if parent_mode:
+                    points = nyan.parents[mouse_pointer].get_nyan(nyan)
+                else:
+                    points = nyan.children[mouse_pointer].get_nyan(nyan)
+                self.load(points)
+                # modules sharing an I/O layer keep output order in one buffer
+                if points.io is not nyan.io:
+                    nyan.io.flush()
+                if len(self.nodetree) >= 2 and self.nodetree[-2] == points:
+                    self.nodetree.pop()
+                else:
+                    self.nodetree.append(points)
+            case Signals.SUB_EOF:
+                nyan.reset()
+                if self.nodetree:
+                    self.nodetree.pop()
+                if (self.nodetree[-1] if self.nodetree else self.root).io is not nyan.io:
+                    nyan.io.flush()
+            case Signals.MAIN_EOF:
+                return True
+        return False
+
+    def limited(self):
+        return self.max_instructions is not None or self.max_tape is not None or self.timeout is not None
+
+    def limit(self, fuel=None):
+        # limits are checked when interpreters run out of fuel, so loops only count their back-edges
+        self.spent = 0
+        self.deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        if self.limited():
+            fuel = min(fuel or self.limit_fuel, self.max_instructions or self.limit_fuel)
+        for nyan in self.nyans:
+            nyan.fuel = fuel
+            nyan.fuel_left = None
+            nyan.tape_limit = self.max_tape
+            nyan.memory.limit = self.max_tape
+
+    def unlimit(self):
+        for nyan in self.nyans:
+            nyan.fuel = None
+            nyan.fuel_left = None
+
+    def spend(self, nyan):
+        if nyan.fuel_left != 0:
+            # gave way for input, fuel is left
+            return
+        nyan.fuel_left = None
+        self.spent += nyan.fuel
+        if self.max_instructions is not None:
+            if self.spent >= self.max_instructions:
+                raise LimitExceeded("instructions", self.max_instructions).at(nyan)
+            if self.max_instructions - self.spent < nyan.fuel:
+                for other in self.nyans:
+                    other.fuel = self.max_instructions - self.spent
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise LimitExceeded("seconds", self.timeout).at(nyan)
+
+    def snapshot(self):
+        cats = {id(nyan): cat for cat, nyan in enumerate(self.nyans)}
+        ios = list({id(nyan.io): nyan.io for nyan in self.nyans}.values())
+        return Snapshot.encode((
+            tuple(
+                (nyan.filename.name, nyan.fingerprint() if nyan.initialized else None, nyan.dump_state())
+                for nyan in self.nyans
+            ),
+            tuple(cats[id(nyan)] for nyan in self.nodetree),
+            tuple(
+                (tuple(parent.children[pos].a_to_b), tuple(parent.children[pos].b_to_a))
+                for parent, pos, _, _ in self.links
+            ),
+            tuple(io.dump() for io in ios),
+        ))
+
+    def restore(self, data):
+        cats, nodetree, links, states = Snapshot(data).state
+        ios = list({id(nyan.io): nyan.io for nyan in self.nyans}.values())
+        if len(cats) != len(self.nyans) or len(links) != len(self.links) or len(states) != len(ios):
+            raise ValueError("Snapshot is of another program")
+        for nyan, (name, fingerprint, _) in zip(self.nyans, cats):
+            # modules which never ran are in their first state, which any program can load
+            if name != nyan.filename.name or (
+                fingerprint is not None and fingerprint != self.load(nyan).fingerprint()
+            ):
+                raise ValueError(f"Snapshot of {name} doesn't match program of {nyan.filename}")
+        for nyan, (_, _, state) in zip(self.nyans, cats):
+            nyan.load_state(state)
+        for io, state in zip(ios, states):
+            io.load(state)
+        self.nodetree = [self.nyans[cat] for cat in nodetree]
+        for (parent, pos, _, _), values in zip(self.links, links):
+            communicator = parent.children[pos]
+            for channel, sent in zip((communicator.a_to_b, communicator.b_to_a), values):
+                channel.clear()
+                channel.extend(sent)
+
+    def run(self):
+        if self.workers:
+            return self.run_parallel()
+        self.run_for()
+
+    def run_for(self, instructions=None):
+        # with instructions, run pauses when fuel runs out past them, at a point it can resume or be saved from
+        limited = self.limited() or instructions is not None
+        if limited:
+            self.limit(min(instructions, self.limit_fuel) if instructions is not None else None)
+        nyan = self.root
+        # module switches are hot in programs talking a lot, so log messages aren't built unless shown
+        debug = _logger.enabled("DEBUG")
+        try:
+            while True:
+                nyan = self.nodetree[-1] if self.nodetree else self.root
+                if debug:
+                    _logger.debug("Running %s", nyan.filename.stem)
+                signal, parent_mode, mouse_pointer = nyan.run()
+                if signal == Signals.KEEP_GOING:
+                    if limited:
+                        self.spend(nyan)
+                        if instructions is not None and self.spent >= instructions:
+                            return False
+                elif self.follow(nyan, signal, parent_mode, mouse_pointer):
+                    return True
+        except LimitExceeded as error:
+            raise error.at(nyan)
+        finally:
+            if limited:
+                self.unlimit()
+            for io in {id(nyan.io): nyan.io for nyan in [self.root, *self.nyans]}.values():
+                io.flush()
+
+    async def run_async(self, fuel=1 << 16):
+        import asyncio
+
+        ios = {id(nyan.io): nyan.io for nyan in [self.root, *self.nyans]}.values()
+        limited = self.limited()
+        self.limit(fuel)
+        nyan = self.root
+        try:
+            while True:
+                nyan = self.nodetree[-1] if self.nodetree else self.root
+                signal, parent_mode, mouse_pointer = nyan.run()
+                if signal == Signals.KEEP_GOING:
+                    # interpreters give way when fuel runs out, or when input isn't ready
+                    if limited:
+                        self.spend(nyan)
+                    if getattr(nyan.io, "wanted", 0):
+                        await nyan.io.fill_async()
+                elif self.follow(nyan, signal, parent_mode, mouse_pointer):
                     return
+                else:
+                    await nyan.io.drain()
+                # every yield and module switch gives way to other tasks
+                await asyncio.sleep(0)
+        except LimitExceeded as error:
+            raise error.at(nyan)
+        finally:
+            self.unlimit()
+            for io in ios:
+                await io.drain()
 
 
 class NyanBuilder(NyanEngine):
@@ -556,52 +3202,90 @@ class NyanBuilder(NyanEngine):
 
     compress_target = b"\x00\x01\x02\x03\x04\x05\x08\x09"
 
-    def __init__(self, root_name, *, debug=False):
+    def __init__(self, root_name, *, debug=False, optimize=False, version=Bundle.version):
+        if version not in (1, Bundle.version):
+            raise ValueError(f"Unsupported bundle version {version}")
         self.program = []
-        super().__init__(root_name, debug=debug)
+        self.version = version
+        super().__init__(root_name, debug=debug, optimize=optimize)
 
     @staticmethod
     def byte_add(byte, count=1):
         return (int(byte.hex(), 16)+count).to_bytes(3, 'big')
 
-    def find_mouse_info(self, nyan=None):
-        _mpath = os.path.join(self.root.filename.parent, self.root.filename.stem + ".mouse")
-        if not os.path.exists(_mpath):
-            self.program.append(b"\x01")
-        else:
-            self.program.append(b"\x00")
-            mouse_count = 0
-            for pos, tpos, filename in self.read_mouse(_mpath):
-                mouse_count += 1
-                print(
-                    pos, tpos, filename
-                )
-                print(
-                    pos.to_bytes(2, 'big') + bytes(1)
-                    + pos.to_bytes(2, 'big') + bytes(1)
-                    + filename.encode(encoding="utf-8") + b"\x0a"
-                )
-                self.program.append(
-                    pos.to_bytes(2, 'big')+bytes(1)
-                    + pos.to_bytes(2, 'big')+bytes(1)
-                    + filename.encode(encoding="utf-8")+b"\x0a"
-                )
-            self.program.insert(1, mouse_count.to_bytes(2, 'big'))
+    def module_name(self, nyan):
+        if nyan is self.root:
+            return nyan.filename.name
+        return Path(os.path.relpath(nyan.filename, self.root.filename.parent)).as_posix()
+
+    def header(self):
+        links = [(pos, tpos, child) for parent, pos, child, tpos in self.links if parent is self.root]
+        if not links:
+            return [b"\x01"]
+        header = [b"\x00", len(links).to_bytes(2, 'big')]
+        # version 1 first repeated pos where tpos would be, so readers took its high byte as tpos.
+        # links that can't be read so flag their own tpos field, and other builds stay the same
+        for pos, tpos, child in links:
+            if tpos == pos >> 8:
+                fields = pos.to_bytes(2, 'big') + bytes(1) + pos.to_bytes(2, 'big') + bytes(1)
+            else:
+                fields = pos.to_bytes(2, 'big') + b"\x01" + tpos.to_bytes(2, 'big') + bytes(1)
+            header.append(fields + self.module_name(child).encode(encoding="utf-8") + b"\x0a")
+        return header
+
+    def encode(self, nyan):
+        if isinstance(nyan, NyanBinaryInterpreter):
+            raise ValueError(f"Binary module {nyan.filename} cannot be bundled, build it from source")
+        code = array("q")
+        constants = array("q")
+        for pc, (op, arg) in enumerate(nyan.code):
+            if op in (Opcodes.TOGGLE, Opcodes.READ, Opcodes.WRITE, Opcodes.CALL):
+                if arg not in self.keywords:
+                    line, column = nyan.locate(nyan.origins[pc])
+                    raise SyntaxError(
+                        f"Invalid character {arg} at line {line}, column {column}",
+                        (str(nyan.filename), line, column, None)
+                    )
+                arg = self.keywords[arg][0]
+            elif op == Opcodes.MULTIPLY:
+                offset = len(constants)
+                constants.append(len(arg))
+                for pair in arg:
+                    constants.extend(pair)
+                arg = offset
+            elif arg is None:
+                arg = 0
+            if not -(1 << 55) <= arg < 1 << 55:
+                raise OverflowError(f"Argument {arg} of instruction {pc} in {nyan.filename} is too large")
+            code.append(arg << 8 | op)
+        return code, constants
 
     def build(self, output=None):
         if output:
             out = Path(output).absolute()
-            if not out.exists():
+            if not out.parent.exists():
                 raise ValueError("Output path not found.")
             if out.suffix != ".nya":
                 raise ValueError("Output file suffix must end with .nya")
         else:
             out = Path(self.root.filename.stem+".nya")
+        self.load_modules()
+        if self.version == 1:
+            return self.build_v1(out)
+        _logger.info("Building %s with %d modules", self.root.filename.stem, len(self.nyans))
+        modules = [(self.module_name(nyan), *self.encode(nyan)) for nyan in self.nyans]
+        indexes = {nyan: index for index, nyan in enumerate(self.nyans)}
+        links = [(indexes[parent], pos, indexes[child], tpos) for parent, pos, child, tpos in self.links]
+        Bundle.write(out, modules, links, indexes[self.root])
+        return out
+
+    def build_v1(self, out):
+        self.program = self.header()
         if not self.nodetree:
             nyan = self.root
         else:
             nyan = self.nodetree[-1]
-        _logger.info(f"Building {nyan.filename.stem}")
+        _logger.info("Building %s", nyan.filename.stem)
         # code validation
         if nyan.program.count("~") != nyan.program.count("-"):
             raise SyntaxError("LoopPointNotMatching")
@@ -623,3 +3307,474 @@ class NyanBuilder(NyanEngine):
         with open(out, "wb") as _r:
             for b in self.program:
                 _r.write(b)
+        return out
+
+
+class Profile:
+    def __init__(self, nyan):
+        self.nyan = nyan
+        self.counts = [0] * len(nyan.code)
+        self.seconds = 0.0
+
+    def instructions(self):
+        # (index, opcode, loop end) of every counted position
+        for index, (op, arg) in enumerate(self.nyan.code):
+            if self.counts[index] or op == Opcodes.JUMP_ZERO:
+                yield index, op, arg - 1 if op == Opcodes.JUMP_ZERO else None
+
+    def position(self, index):
+        nyan = self.nyan
+        if nyan.code is not None and nyan.origins is not None and nyan.source_map is not None:
+            return nyan.source_map.locate(nyan.origins[index])
+        return None
+
+    def where(self, index):
+        position = self.position(index)
+        return f"{position[0]}:{position[1]}" if position else f"@{index}"
+
+    def data(self):
+        names = {value: name for name, value in vars(Opcodes).items() if not name.startswith("_")}
+        positions = []
+        loops = []
+        opcodes = {}
+        for index, op, end in self.instructions():
+            count = self.counts[index]
+            if count:
+                positions.append({"index": index, "at": self.where(index), "op": names[op], "count": count})
+                opcodes[names[op]] = opcodes.get(names[op], 0) + count
+            if end is not None:
+                loops.append({
+                    "index": index, "at": self.where(index), "end": self.where(end),
+                    "entries": count, "iterations": self.counts[end],
+                })
+        positions.sort(key=lambda item: -item["count"])
+        loops.sort(key=lambda item: -item["iterations"])
+        return {
+            "file": str(self.nyan.filename),
+            "seconds": self.seconds,
+            "instructions": sum(self.counts),
+            "opcodes": dict(sorted(opcodes.items(), key=lambda item: -item[1])),
+            "positions": positions,
+            "loops": loops,
+        }
+
+
+class ProfiledInterpreter:
+    # mixed into interpreter classes by NyanProfiler, so hooks are only called while profiling
+    profile = None
+
+    def start_of_loop(self):
+        self.profile.counts[self.cursor] += 1
+
+    def run(self):
+        if self.profile is None:
+            if self.code is None:
+                self.compile_program()
+            self.profile = Profile(self)
+        start = time.perf_counter()
+        try:
+            return super().run()
+        finally:
+            self.profile.seconds += time.perf_counter() - start
+
+
+class NyanProfiler(NyanEngine):
+    classes = {}
+
+    def __init__(self, root_name, **options):
+        super().__init__(root_name, **{**options, "backend": "interpreter", "workers": None})
+
+    def interpreter(self, path):
+        interpreter = super().interpreter(path)
+        if interpreter not in self.classes:
+            self.classes[interpreter] = type(f"Profiled{interpreter.__name__}", (ProfiledInterpreter, interpreter), {})
+        return self.classes[interpreter]
+
+    def profiles(self):
+        return [nyan.profile for nyan in self.nyans if nyan.profile is not None]
+
+    def data(self):
+        return {"cats": [profile.data() for profile in self.profiles()]}
+
+    def report(self, top=10):
+        lines = []
+        for profile in sorted(self.profiles(), key=lambda item: -item.seconds):
+            data = profile.data()
+            lines.append(f"{data['file']}: {data['instructions']} instructions in {data['seconds']:.6f}s")
+            lines.append("  opcodes:")
+            lines += [f"    {name:<14}{count:>12}" for name, count in data["opcodes"].items()]
+            lines.append("  hot positions:")
+            lines += [
+                f"    {item['at']:<14}{item['count']:>12}  {item['op']}" for item in data["positions"][:top]
+            ]
+            lines.append("  hot loops:")
+            lines += [
+                f"    {item['at'] + '-' + item['end']:<14}{item['iterations']:>12}  entered {item['entries']}"
+                for item in data["loops"][:top]
+            ]
+        return lines
+
+
+class DebuggedInterpreter:
+    # mixed into interpreter classes by NyanDebugger, so checks only run while debugging
+    debugger = None
+    breakpoints = frozenset()
+    watchpoints = {}
+
+    def start_of_loop(self):
+        if self.debugger.stepping is None and self.cursor not in self.breakpoints and not self.watchpoints:
+            return
+        self.debugger.check(self)
+
+
+class NyanDebugger(NyanEngine):
+    classes = {}
+    usage = (
+        "s(tep)                        run one instruction, following module switches",
+        "n(ext)                        run until next instruction of this cat",
+        "c(ontinue)                    run until a breakpoint or watchpoint stops",
+        "b(reak) [file:]line:col|@i    add breakpoint, list breakpoints without argument",
+        "d(elete) [file:]line:col|@i   delete breakpoint",
+        "w(atch) address               stop when cell of this cat changes",
+        "u(nwatch) address             delete watchpoint",
+        "p(rint) [start [end]]         print cells, around pointer by default",
+        "i(nfo)                        print pointers, cats and stops",
+        "l(ist)                        print source around cursor",
+        "q(uit)                        stop program",
+    )
+
+    def __init__(self, root_name, *, commands=None, output=None, **options):
+        super().__init__(root_name, **{**options, "backend": "interpreter", "workers": None})
+        self.commands = iter(commands) if commands is not None else None
+        self.output = output
+        # stops before first instruction, so breakpoints can be set
+        self.stepping = True
+        for nyan in self.nyans:
+            nyan.debugger = self
+            nyan.breakpoints = set()
+            nyan.watchpoints = {}
+
+    def interpreter(self, path):
+        interpreter = super().interpreter(path)
+        if interpreter not in self.classes:
+            self.classes[interpreter] = type(f"Debugged{interpreter.__name__}", (DebuggedInterpreter, interpreter), {})
+        return self.classes[interpreter]
+
+    def write(self, line):
+        print(line, file=self.output if self.output is not None else sys.stderr, flush=True)
+
+    def read(self):
+        if self.commands is not None:
+            command = next(self.commands, None)
+            if command is not None:
+                self.write(f"(nyan) {command}")
+            return command
+        try:
+            return input("(nyan) ")
+        except EOFError:
+            return None
+
+    def find(self, name):
+        for nyan in self.nyans:
+            if name in (nyan.filename.name, nyan.filename.stem, str(nyan.filename)):
+                return nyan
+        raise ValueError(f"No cat named {name}")
+
+    def resolve(self, spec, nyan=None):
+        # "[file:]line:col" or "[file]@index", in given cat if file is left out
+        # file names may have spaces, colons or @ in them, so location is split from the right
+        name, at, index = spec.rpartition("@")
+        if at and ":" not in index:
+            nyan = self.find(name) if name else nyan or self.root
+            self.load(nyan)
+            return nyan, int(index)
+        parts = spec.rsplit(":", 2)
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Invalid location {spec} - Location must be [file:]line:col or [file]@index")
+        nyan = self.find(parts[0]) if len(parts) == 3 else nyan or self.root
+        line, column = int(parts[-2]), int(parts[-1])
+        self.load(nyan)
+        size = len(nyan.code) if nyan.code is not None else len(nyan.program)
+        for cursor in range(size):
+            position = nyan.position(cursor)
+            if position is not None and position >= (line, column):
+                return nyan, cursor
+        raise ValueError(f"No instruction at or after {line}:{column} in {nyan.filename.name}")
+
+    def add_breakpoint(self, spec, nyan=None):
+        nyan, cursor = self.resolve(spec, nyan)
+        nyan.breakpoints.add(cursor)
+        return nyan, cursor
+
+    def remove_breakpoint(self, spec, nyan=None):
+        nyan, cursor = self.resolve(spec, nyan)
+        nyan.breakpoints.discard(cursor)
+        return nyan, cursor
+
+    def watch(self, address, nyan=None):
+        nyan = nyan or self.root
+        nyan.watchpoints[address] = nyan.memory.read(address)
+
+    def unwatch(self, address, nyan=None):
+        (nyan or self.root).watchpoints.pop(address, None)
+
+    def instruction(self, nyan, cursor):
+        names = {value: name for name, value in vars(Opcodes).items() if not name.startswith("_")}
+        if cursor >= len(nyan.code):
+            return "END"
+        op, arg = nyan.code[cursor]
+        return names[op] if arg is None else f"{names[op]} {arg!r}"
+
+    def where(self, nyan, cursor=None):
+        cursor = nyan.cursor if cursor is None else cursor
+        position = nyan.position(cursor)
+        at = f"{position[0]}:{position[1]} " if position else ""
+        return f"{nyan.filename.name}:{at}@{cursor} {self.instruction(nyan, cursor)}"
+
+    def check(self, nyan):
+        reasons = []
+        if self.stepping is True or self.stepping is nyan:
+            reasons.append("step")
+        if nyan.cursor in nyan.breakpoints:
+            reasons.append("breakpoint")
+        for address, value in nyan.watchpoints.items():
+            current = nyan.memory.read(address)
+            if current != value:
+                nyan.watchpoints[address] = current
+                reasons.append(f"watch [{address}] {value} -> {current}")
+        if reasons:
+            self.stop(nyan, ", ".join(reasons))
+
+    def stop(self, nyan, reason):
+        # output so far is shown before prompt
+        nyan.io.flush()
+        self.stepping = None
+        self.write(f"{self.where(nyan)}  ({reason})")
+        self.prompt(nyan)
+
+    def cells(self, nyan, start=None, end=None):
+        pointer = nyan.pointer.get()
+        start = pointer - 8 if start is None else start
+        end = start + 16 if end is None else end
+        return " ".join(
+            f"{'*' if address == pointer else ''}{address}:{nyan.memory.read(address)}" for address in range(start, end)
+        )
+
+    def info(self, nyan):
+        lines = [
+            f"cat {nyan.filename} ({'sub' if nyan.sub else 'root'}), cursor {nyan.cursor}",
+            f"pointer {nyan.pointer.get()} = {nyan.memory.read(nyan.pointer.get())}",
+            f"module pointer {nyan.module_pointer.get()} to {'parents' if nyan.pointing_parents else 'children'}",
+            "cats " + " > ".join(cat.filename.name for cat in [self.root, *self.nodetree]),
+        ]
+        for parents, links in ((True, nyan.parents), (False, nyan.children)):
+            for pos, channel in links.items():
+                lines.append(
+                    f"{'parent' if parents else 'child'} {pos} {channel.get_nyan(nyan).filename.name}: "
+                    f"{channel.pending(nyan)} sent, {channel.pending(channel.get_nyan(nyan))} to read"
+                )
+        for cat in self.nyans:
+            lines += [f"breakpoint {self.where(cat, cursor)}" for cursor in sorted(cat.breakpoints)]
+            lines += [f"watch {cat.filename.name} [{address}] = {value}" for address, value in cat.watchpoints.items()]
+        return lines
+
+    def source(self, nyan):
+        if nyan.text is not None:
+            text = nyan.text
+        elif nyan.filename.suffix == ".nyan" and nyan.filename.exists():
+            text = nyan.filename.read_text(encoding="utf-8")
+        else:
+            return []
+        position = nyan.position()
+        if position is None:
+            return []
+        line, column = position
+        lines = text.splitlines()
+        first = max(line - 2, 1)
+        listing = [f"{number:>5} {lines[number - 1]}" for number in range(first, min(line + 2, len(lines)) + 1)]
+        listing.insert(line - first + 1, " " * (5 + column) + "^")
+        return listing
+
+    def prompt(self, nyan):
+        while True:
+            command = self.read()
+            if command is None:
+                # out of commands, program runs to its end
+                for cat in self.nyans:
+                    cat.breakpoints.clear()
+                    cat.watchpoints.clear()
+                return
+            name, *rest = command.split(maxsplit=1) or ["step"]
+            # locations are the rest of line, as file names may have spaces in them
+            location = rest[0].strip() if rest else ""
+            args = location.split()
+            try:
+                match name:
+                    case "s" | "step":
+                        self.stepping = True
+                        return
+                    case "n" | "next":
+                        self.stepping = nyan
+                        return
+                    case "c" | "continue":
+                        return
+                    case "b" | "break" if args:
+                        self.write(f"breakpoint {self.where(*self.add_breakpoint(location, nyan))}")
+                    case "b" | "break":
+                        for line in self.info(nyan):
+                            if line.startswith("breakpoint"):
+                                self.write(line)
+                    case "d" | "delete":
+                        self.write(f"deleted {self.where(*self.remove_breakpoint(location, nyan))}")
+                    case "w" | "watch":
+                        self.watch(int(args[0]), nyan)
+                    case "u" | "unwatch":
+                        self.unwatch(int(args[0]), nyan)
+                    case "p" | "print":
+                        self.write(self.cells(nyan, *(int(arg) for arg in args[:2])))
+                    case "i" | "info":
+                        for line in self.info(nyan):
+                            self.write(line)
+                    case "l" | "list":
+                        for line in self.source(nyan):
+                            self.write(line)
+                    case "q" | "quit":
+                        raise SystemExit(1)
+                    case _:
+                        for line in self.usage:
+                            self.write(line)
+            except (ValueError, IndexError) as error:
+                self.write(f"{type(error).__name__}: {error}")
+
+
+class ProgramResult:
+    def __init__(self, output, memory, pointer):
+        self.output = output
+        self.memory = memory
+        self.pointer = pointer
+
+    def __repr__(self):
+        return f"ProgramResult(output={self.output!r}, pointer={self.pointer})"
+
+
+class Program:
+    def __init__(
+        self, source, *, name="main.nyan", modules=None, tape=None, optimize=False, backend="interpreter",
+        cache=False, channel_size=1, mode="text", encoding="utf-8", max_instructions=None, max_tape=None, timeout=None
+    ):
+        limits = {"max_instructions": max_instructions, "max_tape": max_tape, "timeout": timeout}
+        if isinstance(source, Path):
+            engine = NyanEngine(
+                source, tape=tape, optimize=optimize, backend=backend, cache=cache, channel_size=channel_size,
+                **limits
+            )
+        else:
+            path = Path(name).absolute()
+            if isinstance(source, (bytes, bytearray, memoryview)) and not Bundle.is_bundle(source):
+                source = bytes(source).decode("utf-8")
+            if isinstance(source, str) and path.suffix != ".nyan":
+                raise ValueError(f"Invalid file extension {path.suffix} - File extension must be .nyan")
+            if not isinstance(source, str) and path.suffix != ".nya":
+                path = path.with_suffix(".nya")
+            sources = {path.parent / module: data for module, data in (modules or {}).items()}
+            sources[path] = source
+            engine = NyanEngine(
+                path, tape=tape, optimize=optimize, backend=backend, cache=False, channel_size=channel_size,
+                sources=sources, **limits
+            )
+        object.__setattr__(self, "engine", engine)
+        object.__setattr__(self, "mode", mode)
+        object.__setattr__(self, "encoding", encoding)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Program is immutable")
+
+    def run(self, input=b"", snapshot=None):
+        if isinstance(input, str):
+            input = input.encode(self.encoding)
+        output = BytesIO()
+        engine = self.engine.clone(NyanIO(BytesIO(input), output, mode=self.mode, encoding=self.encoding))
+        if snapshot is not None:
+            engine.restore(snapshot)
+        engine.run()
+        return ProgramResult(output.getvalue(), engine.root.memory, engine.root.pointer.get())
+
+
+class BatchResult:
+    def __init__(self, input, output=None, seconds=0.0, error=None):
+        self.input = input
+        self.output = output
+        self.seconds = seconds
+        self.error = error
+
+    def record(self):
+        record = {"input": str(self.input), "ok": self.error is None, "seconds": self.seconds}
+        if self.error is None:
+            record["output"] = self.output.decode("utf-8", "surrogateescape")
+        else:
+            record["error"] = self.error
+        return record
+
+
+class NyanBatch:
+    program = None
+
+    def __init__(self, filename, *, workers=None, chunksize=16, **options):
+        self.filename = Path(filename).absolute()
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.options = options
+        # compiled once here, so workers load it from cache instead of parsing again
+        Program(self.filename, **{"cache": True, **options})
+
+    @classmethod
+    def init_worker(cls, filename, options):
+        cls.program = Program(filename, **{"cache": True, **options})
+
+    @classmethod
+    def execute(cls, input):
+        start = time.perf_counter()
+        try:
+            with open(input, "rb") as _f:
+                data = _f.read()
+            output = cls.program.run(data).output
+        except Exception as error:
+            return BatchResult(input, None, time.perf_counter() - start, f"{type(error).__name__}: {error}")
+        return BatchResult(input, output, time.perf_counter() - start)
+
+    def run(self, inputs):
+        if self.workers <= 1:
+            self.init_worker(self.filename, self.options)
+            yield from map(self.execute, inputs)
+            return
+        import multiprocessing
+
+        with multiprocessing.get_context().Pool(
+            self.workers, initializer=NyanBatch.init_worker, initargs=(self.filename, self.options)
+        ) as pool:
+            yield from pool.imap_unordered(NyanBatch.execute, inputs, self.chunksize)
+
+    def write(self, inputs, output, root=None):
+        import json
+
+        output = Path(output)
+        if output.suffix == ".jsonl":
+            with open(output, "w", encoding="utf-8") as _f:
+                for result in self.run(inputs):
+                    _f.write(json.dumps(result.record()) + "\n")
+                    yield result
+            return
+        inputs = list(inputs)
+        if root is None:
+            # deepest directory holding every input, so inputs named alike in other directories don't clash
+            root = os.path.commonpath([Path(input).absolute().parent for input in inputs]) if inputs else "."
+        root = Path(root).absolute()
+        output.mkdir(parents=True, exist_ok=True)
+        for result in self.run(inputs):
+            if result.error is None:
+                path = output / Path(result.input).absolute().relative_to(root)
+                path = path.with_name(path.name + ".out")
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "wb") as _f:
+                    _f.write(result.output)
+            yield result
@@ -1,40 +1,96 @@
+import codecs
 import collections
+import multiprocessing
+import multiprocessing.connection
+import queue
+import re
+import struct
+import threading
+import types
+import typing
+from array import array
 from pathlib import Path
 
+class NyanLogger:
+    """
+    Logger of engine, which doesn't import :mod:`logging`.\n
+    Messages are passed to logger `name` once something imported logging, as only that can show them.
+    ``NyanEngine(debug=True)`` imports and configures it to show debug messages.
+    """
+    name: str
+
+    def __init__(self, name):
+        """
+        :param str name: name of logger messages are passed to
+        """
+
+    def logger(self) -> typing.Any | None:
+        """
+        :return: :class:`logging.Logger` of `name`, None if logging isn't imported.
+        """
+
+    def enabled(self, level) -> bool:
+        """
+        :param str level: level name, e.g. ``"DEBUG"``
+        :return: True if messages of level would be handled.
+        """
+
+    def debug(self, message, *args):
+        """
+        Log with lazy %-style args, which are only formatted if message is shown.
+        """
+
+    def info(self, message, *args):
+        """
+        Log with lazy %-style args, which are only formatted if message is shown.
+        """
+
+
 class Communicator:
     """
     Communicator that allows communication between two :class:`NyanInterpreter` or :class:`NyanBinaryInterpreter`.\n
+    Each direction is a bounded FIFO channel of `capacity` values.
     Use **Communicator.send** to save data, **Communicator.receive** to take saved data.\n
     """
     nyan_a: NyanInterpreter | NyanBinaryInterpreter
     nyan_b: NyanInterpreter | NyanBinaryInterpreter
-    a_to_b_fill: bool
-    b_to_a_fill: bool
-    a_to_b: int | None
-    b_to_a: int | None
-    def __init__(self, nyan_a, nyan_b):
+    capacity: int
+    a_to_b: collections.deque[int]
+    b_to_a: collections.deque[int]
+    def __init__(self, nyan_a, nyan_b, capacity=1):
         """
         :param NyanInterpreter or NyanBinaryInterpreter nyan_a: binary/normal interpreter to communicate with
         :param NyanInterpreter or NyanBinaryInterpreter nyan_b: binary/normal interpreter to communicate with
+        :param int capacity: number of values each direction can hold
         :rtype: Communicator
+        :raise ValueError: when capacity is less than 1
         """
     def send(self, nyan, data):
         """
-        Saves data to a_to_b or b_to_a, make a_to_b_fill or b_to_a_fill to True \n
+        Appends data to a_to_b or b_to_a, dropping the oldest value if channel is full,
+        so capacity of 1 keeps only the last value.\n
         can be returned by **Communicator.receive**
         :param NyanInterpreter or NyanBinaryInterpreter nyan: binary/normal interpreter that sends data
         :param int data: will be saved to opposite interpreter's data container
-        :rtype: None
+        :return: True if channel is full, and receiver should run.
+        :rtype: bool
         :raise ValueError: when invalid interpreter given
         """
     def receive(self, nyan):
         """
-        Returns data from a_to_b or b_to_a, make a_to_b_fill or b_to_a_fill to False\n
+        Takes the oldest data from a_to_b or b_to_a\n
         :param NyanInterpreter or NyanBinaryInterpreter nyan: binary/normal interpreter that receives data
         :return: int if saved data from opposite interpreter, None if no data to receive
         :rtype: int or None
         :raise ValueError: when invalid interpreter given
         """
+    def pending(self, nyan):
+        """
+        :param NyanInterpreter or NyanBinaryInterpreter nyan: binary/normal interpreter that sends data
+        :return: number of values sent by nyan, which are not received yet.
+        :rtype: int
+        :raise ValueError: when invalid interpreter given
+        """
     def get_nyan(self, nyan):
         """
         Returns opposite binary/normal interpreter or base interpreter
@@ -62,6 +118,57 @@ class Signals:
     KEEP_GOING: int
 
 
+class Opcodes:
+    """
+    Set of CONSTANT opcodes of the compiled instruction list of :class:`NyanInterpreter`.\n
+    Each instruction is a tuple of ``(opcode, argument)``.
+
+    .. note::
+        - ADD = 0 (argument: value added to current cell)
+        - MOVE = 1 (argument: value added to pointer)
+        - JUMP_ZERO = 2 (argument: index right after matching JUMP_NONZERO)
+        - JUMP_NONZERO = 3 (argument: index right after matching JUMP_ZERO)
+        - OUTPUT = 4 (argument: repeat count)
+        - INPUT = 5 (argument: repeat count)
+        - PRINT = 6 (argument: repeat count)
+        - MODULE_MOVE = 7 (argument: value added to module pointer)
+        - TOGGLE = 8 (argument: keyword)
+        - READ = 9 (argument: keyword)
+        - WRITE = 10 (argument: keyword)
+        - CALL = 11 (argument: keyword)
+        - HALT = 12
+        - SET = 13 (argument: value of current cell)
+        - SCAN = 14 (argument: step of pointer until current cell is 0)
+        - MULTIPLY = 15 (argument: tuple of ``(offset, factor)``, added by current cell times factor if it's positive)
+    """
+    ADD: int
+    MOVE: int
+    JUMP_ZERO: int
+    JUMP_NONZERO: int
+    OUTPUT: int
+    INPUT: int
+    PRINT: int
+    MODULE_MOVE: int
+    TOGGLE: int
+    READ: int
+    WRITE: int
+    CALL: int
+    HALT: int
+    SET: int
+    SCAN: int
+    MULTIPLY: int
+
+
+def native(opcode: int, arg: int | None = None) -> collections.Callable[[collections.Callable], collections.Callable]:
+    """
+    Function decorator marking a keyword handler as built-in.\n
+    :class:`ProgramCompiler` compiles keywords with marked handlers into ``(opcode, arg)`` instructions
+    instead of calling the handler. Handlers without mark are compiled into :attr:`Opcodes.CALL`.
+    :param opcode: one of :class:`Opcodes`
+    :param arg: unit argument of instruction, summed up when runs of same keyword are folded
+    """
+
+
 class Pointer:
     """
     Pointer of interpreters like :class:`NyanInterpreter` or :class:`NyanBinaryInterpreter`.\n
@@ -100,376 +207,1874 @@ class Pointer:
         """
 
 
-class Memory:
+class NyanIO:
     """
-    Memory of interpreters like :class:`NyanInterpreter` or :class:`NyanBinaryInterpreter`.\n
-    Used to store/withdraw values from memory via :class:`Pointer`
+    Buffered I/O layer of interpreters.\n
+    Output is buffered and flushed when buffer is full, on newline if output is line buffered,
+    before reading input, and on exit. Input is read in bulk.\n
+    Streams may be binary or text streams, standard streams are used if None.
+     + ``"text"`` mode: cell is a character, written with ``chr`` and encoded with `encoding` for binary streams
+     + ``"bytes"`` mode: cell is a byte, written as it is and read one byte at a time
     """
-    memory: dict
-    def __init__(self, initial=None):
-        """
-        :param dict or None initial: initial dictionary of memory. Automatically set to 0 if nothing given.
+    modes: tuple[str, ...]
+    buffer_size: int
+    stdin: typing.BinaryIO | typing.TextIO | None
+    stdout: typing.BinaryIO | typing.TextIO | None
+    mode: str
+    encoding: str
+    errors: str
+    line_buffering: bool | None
+    output: list[str | bytes]
+    size: int
+    pending: str | bytes
+    position: int
+    decoder: codecs.IncrementalDecoder | None
+    def __init__(
+        self, stdin=None, stdout=None, *,
+        mode="text", encoding="utf-8", errors="strict", buffer_size=None, line_buffering=None
+    ):
+        """
+        :param stdin: input stream
+        :param stdout: output stream
+        :keyword str mode: one of `modes`
+        :keyword str encoding: encoding of binary streams in text mode
+        :keyword str errors: error handler of encoding
+        :keyword int | None buffer_size: size of output buffer and input chunk
+        :keyword bool | None line_buffering: flush on newline, True if output is a terminal when None.
+        :raises ValueError: if mode is unknown
+        """
+
+    def write(self, value, count=1):
+        """
+        Write cell value count times.
+        :param int value:
+        :param int count:
+        :raises ValueError: if value is not a valid character or byte
         """
 
-    def increase(self, pointer):
+    def write_text(self, text):
         """
-        Increase value in given pointer's address
-        :param Pointer pointer:
-        :return:
+        Write text, such as output of `뀨`.
+        :param str text:
         """
 
-    def decrease(self, pointer):
+    def write_chunk(self, data):
         """
-        Decrease value in given pointer's address
-        :param Pointer pointer:
+        Write data which is already in type of mode, str for text and bytes for bytes.
+        :param str | bytes data:
         """
 
-    def set(self, pointer: Pointer, value: int):
+    def line_buffered(self) -> bool:
         """
-        Set value in given pointer's address
-        :param Pointer pointer:
-        :param int value:
+        :return: True if output is flushed on newline.
         """
 
-    def get(self, pointer: Pointer):
+    def flush(self):
         """
-        Get value from given pointer's address
-        :param Pointer pointer:
-        :rtype: int
-        :return: :class:`int` if value set. if value is not even touched, returns **0**.
+        Write buffered output to output stream, and flush it.
         """
 
-
-class ProgramParser:
-    """
-    Parser for Nyanlang source code.\n
-    Accepting only text file (.nyan), not binary file (.nya).\n
-    Check if given path is not exists, if file suffix is not valid, and parse program.
-    """
-    filename: Path
-    program: str | None
-    def __init__(self, filename: Path):
+    def read(self, count=1) -> int:
         """
-        :param Path filename:
+        Read count characters or bytes.
+        :param int count:
+        :return: value of last one, 0 if input ended.
         """
 
-    def parse(self):
+    def fill(self) -> bool:
         """
-        Parse program with path exists check, suffix check.\n
-        Once it gets file data, it removes all comments, newline, spaces.\n
-        To make EOF signal, it automatically appends space at the end.
-        :rtype str:
-        :return: properly parsed program source
-        :raises FileNotFoundError: if file is not exists
-        :raises ValueError: if file extension is not valid
+        Flush output, and read next chunk of input.
+        :return: False if input ended.
         """
 
-
-class NyanInterpreter:
-    """
-    General interpreter for running one Nyanlang source code.\n
-    If mouse support is required, use :class:`NyanEngine` or :class:`NyanBinaryEngine`.\n
-    """
-    filename: Path
-    initialized: bool
-
-    program: str | None
-    debug: bool
-    sub: bool
-
-    cursor: int
-    memory: Memory
-    pointer: Pointer
-    module_pointer: Pointer
-    pointing_parents: bool
-    children: dict[int, Communicator]
-    parents: dict[int, Communicator]
-
-    jump_points: dict[int, int]
-    next_points: dict[int, int]
-
-    keywords: dict[str, collections.Callable[[NyanInterpreter], None | tuple[int, bool, int]]]
-
-    def __init__(self, filename, subprocess=False, debug=False):
+    def starved(self, count=1) -> bool:
         """
-        :param Path filename:
-        :param bool subprocess:
-        :param bool debug:
+        :return: True if `,` has to wait for input of count characters or bytes. Always False for blocking streams.
         """
 
-    def init(self):
+    def dump(self) -> tuple[str, str | bytes, str | bytes]:
         """
-        Initialize interpreter.\n
-        It will do:
-         + parse program
-         + parse loop points from parsed program
-         + set `self.initialized` to true
-         + return self
-        since it returns self, you can chain this function call with `self.run()`.\n
-        Example:
-          NyanInterpreter(Path(".").absolute()).init().run()
-
-        :rtype: NyanInterpreter
+        :return: mode, unread input and unflushed output. Streams themselves are not saved.
         """
 
-    def reset(self):
+    def load(self, state):
         """
-        Reset interpreter runtime attributes.\n
-        It will do:
-         + set `self.cursor` to 0
-         + set `self.memory` to new :class:`Memory` object.
-         + set `self.pointer` and `self.module_pointer` to new :class:`Pointer` object.
-         + set `self.pointing_parents` to False.
-        :return:
+        Replace buffered input and output with state made by **dump**.
+        :raises ValueError: if state is of another mode
         """
 
-    def add_keyword(self, keyword: str) -> collections.Callable[[collections.Callable[[NyanInterpreter], any]], None]:
+    async def drain(self):
         """
-        Function decorator for adding a keyword. \n
-        You can use this function after making an instance of :class:`NyanInterpreter`.\n
-        >>> nyan = NyanInterpreter(Path("."))
-        >>> @nyan.add_keyword("w")
-        ... def w_handler(o: NyanInterpreter):
-        ...     ...
-        :param keyword: a character that will be registered as keyword.
+        Flush output, and wait until output stream takes it.
         """
-        def wrapper(handler: collections.Callable[[NyanInterpreter], any]):
-            """
-            :param handler: A handler function that will take NyanInterpreter object, and handle keyword event.
-            """
 
-    def add_parent(self, parent, pos):
+    def read_chunk(self) -> str | bytes:
         """
-        Add :class:`Communicator` between parent and self.
-        :param Communicator parent:
-        :param int pos:
-        :raises ValueError: when same parent communicator already added
+        Take rest of current input chunk, reading next chunk if it's empty.
+        :return: empty if input ended.
         """
 
-    def add_child(self, child, pos):
+
+class AsyncNyanIO(NyanIO):
+    """
+    I/O layer for :meth:`NyanEngine.run_async`, reading from and writing to asyncio streams.\n
+    `,` never blocks. When buffered input is short, interpreter yields ``Signals.KEEP_GOING``, and engine awaits
+    **fill_async** before running it again.
+    """
+    reader: typing.Any
+    writer: typing.Any
+    eof: bool
+    wanted: int
+
+    def __init__(self, reader=None, writer=None, **options):
         """
-        Add :class:`Communicator` between child and self.
-        :param Communicator child:
-        :param int pos:
-        :raises ValueError: when same child communicator already added
+        :param reader: stream like :class:`asyncio.StreamReader` with ``async read(n)``, no input if None.
+        :param writer: stream like :class:`asyncio.StreamWriter` with ``write(data)`` and ``async drain()``,
+            standard output if None.
+        :param options: options of :class:`NyanIO`
         """
 
-    def parse_program(self):
+    def starved(self, count=1) -> bool:
         """
-        Parse program using :class:`ProgramParser` and set `self.program` from parse result.
+        :return: True if less than count characters or bytes are buffered and input didn't end.
+            Remembers count as `wanted`.
         """
 
-    def parse_loop_points(self):
+    def fill(self) -> bool:
         """
-        Parse loop points from parsed program (self.program).
+        Flush output. Input is read by **fill_async** only, so this is reached only when input ended.
+        :return: False
         """
-        def _find_match(start_pair):
-            """
-            Find matching loop ending keyword pair of loop starting keyword.
-            :param int start_pair: Index of starting pair
-            :raises SyntaxError: if there is no matching pair
-            """
 
-    def before_run(self):
-        ...
-
-    def after_run(self):
-        ...
+    async def fill_async(self):
+        """
+        Read until `wanted` characters or bytes are buffered, or input ends.
+        """
 
-    def start_of_loop(self):
-        ...
 
-    def end_of_loop(self):
-        ...
+class LimitExceeded(RuntimeError):
+    """
+    Raised when a program runs past a limit of :class:`NyanEngine`.
 
-    def module_read(self, keyword=":"):
+    >>> try:
+    ...     NyanEngine("main.nyan", max_instructions=10 ** 6).run()
+    ... except LimitExceeded as error:
+    ...     print(error.kind, error.filename, error.position)
+    instructions /home/main.nyan (3, 1)
+    """
+    kinds: tuple[str, ...]
+    kind: str
+    """Unit of limit, one of `kinds`: ``"instructions"``, ``"cells"`` of tape or ``"seconds"``."""
+    limit: int | float
+    filename: Path | None
+    """Cat which exceeded limit, None until located with **at**."""
+    index: int | None
+    """Cursor of cat, None if unknown."""
+    position: tuple[int, int] | None
+    """Line and column of cursor in source code, None if cat is not run from source code."""
+    def __init__(self, kind, limit, filename=None, index=None, position=None):
         """
-        Register handler for module reading keyword.
-        :param str keyword:
+        :param str kind:
+        :param int | float limit:
+        :param Path | None filename:
+        :param int | None index:
+        :param tuple[int, int] | None position:
         """
-        def wrapper(o) -> tuple[int, bool, int] | None:
-            """
-            Handler for module reading keyword.
-            :param NyanInterpreter o:
-            :raises ValueError: if parent cat or child cat does not exist
-            """
 
-    def module_write(self, keyword=";"):
+    def describe(self) -> str:
         """
-        Register handler for module writing keyword.
-        :param str keyword: 
+        :return: message of error, e.g. ``Limit of 1000 cells exceeded in main.nyan at line 1, column 3``
         """
-        def wrapper(o) -> tuple[int, bool, int]:
-            """
-            Handler for module writing keyword.
-            :param NyanInterpreter o:
-            :raises ValueError: if parent cat or child cat does not exist
-            """
 
-    def jumper_start(self, keyword="~"):
+    def at(self, nyan) -> LimitExceeded:
         """
-        Register handler for jumper start keyword.
-        :param str keyword:
+        Locate error at cursor of given cat, if not located yet.
+        :param NyanInterpreter nyan:
+        :return: self
         """
-        def wrapper(o):
-            """
-            Handler for jumper start keyword.
-            :param NyanInterpreter o:
-            :return:
-            """
 
-    def jumper_end(self, keyword="-"):
+
+class Memory:
+    """
+    Memory of interpreters like :class:`NyanInterpreter` or :class:`NyanBinaryInterpreter`.\n
+    Used to store/withdraw values from memory via :class:`Pointer`.\n
+    Stores unbounded integer cells in chunks of ``array('q')``, switching to python integers once a cell
+    outgrows 64 bits. Tape doubles as it grows: right by extending its last chunk, left by adding a chunk in front,
+    so cells already there are never moved.\n
+    Fast paths read and write `self.cells` directly: address ``a`` lives in ``cells[a + origin]``
+    once **Memory.reserve** is called with it, until another chunk is reserved.
+    """
+    cell_bits: int | None
+    mask: int
+    initial_size: int
+    initial_origin: int
+    """
+    Index of address 0 in cells of new memory, so a few cells left of it are there from the start, and tapes made
+    by :func:`fixed_tape` start with their lowest address.
+    """
+    limit: int | None
+    """
+    Cells tape may grow to, unlimited if None. Tape grows up to limit and raises :class:`LimitExceeded` past it.
+    First `initial_size` cells are always there. :class:`PagedMemory` grows a whole page at once, with pages
+    small enough to stop short of limit.
+    """
+    promoted: bool
+    cells: array | bytearray | list[int]
+    """Chunk holding the address last reserved."""
+    origin: int
+    chunks: list[array | bytearray | list[int]]
+    """Chunks of tape from left to right, with no gaps between them."""
+    starts: list[int]
+    """Address of first cell of each chunk."""
+    def __init__(self, initial=None):
         """
-        Register handler for jumper end keyword.
-        :param str keyword:
+        :param dict or None initial: initial values of memory by address. All cells are 0 if nothing given.
         """
-        def wrapper(o):
-            """
-            Handler for jumper end keyword.
-            :param NyanInterpreter o:
-            :return:
-            """
 
-    def module_control(self, keyword="'"):
+    @property
+    def memory(self) -> dict[int, int]:
         """
-        Register handler for module control keyword.
-        :param str keyword:
+        :return: dictionary of non-zero cells by address
         """
-        def wrapper(o):
-            """
-            Handler for module control keyword.
-            :param NyanInterpreter o:
-            """
 
-    def run(self) -> tuple[int, bool, int]:
+    def size(self) -> int:
         """
-        Run interpreter's program with current runtime variables.
-        :raises SyntaxError: when invalid character(keyword) detected
+        :return: cells of all chunks
         """
 
-
-class NyanBinaryInterpreter(NyanInterpreter):
-    """
-    NyanInterpreter, but handles binary code.
-    """
-    program: bytes | None
-    constant_program: bytes | None
-    keywords: dict[bytes, collections.Callable[[NyanBinaryInterpreter], None | tuple[int, bool, int]]]
-    def __init__(self, filename, subprocess=False, debug=False):
+    def allocate(self, size):
         """
-        :param Path filename:
-        :param bool subprocess:
-        :param bool debug:
+        :param int size:
+        :return: zero-filled cell storage of given size
         """
 
-    def add_binary_keyword(self, keyword: bytes):
+    def promote(self):
         """
-        Function decorator for adding a keyword. \n
-        You can use this function after making an instance of :class:`NyanBinaryInterpreter`.\n
-        >>> nyan = NyanBinaryInterpreter(Path("."))
-        >>> @nyan.add_keyword("w")
-        ... def w_handler(o: NyanBinaryInterpreter):
-        ...     ...
-        :param keyword: a character that will be registered as keyword.
+        Switch cell storage to python integers. Called when a cell overflows ``array('q')``.
         """
-        def wrapper(handler: collections.Callable[[NyanBinaryInterpreter], any]):
-            """
-            :param handler: A handler function that will take NyanBinaryInterpreter object, and handle keyword event.
-            """
 
-    def parse_program(self):
+    def reserve(self, address):
         """
-        Parse program with path exists check, suffix check.\n
-        Once it gets file data, it removes all comments, newline, spaces.
-        :raises FileNotFoundError: if file is not exists
-        :raises ValueError: if file extension is not valid
+        Make `self.cells` hold given address, growing tape if needed.
+        :param int address:
+        :raises LimitExceeded: if tape would grow past `limit`
         """
 
-    def parse_loop_points(self):
+    def bound(self, grow, need):
         """
-        Parse loop points from parsed program (self.program).
+        :param int grow: cells to grow by
+        :param int need: cells needed for address
+        :return: cells to grow by, cut down to `limit`
+        :raises LimitExceeded: if needed cells are past `limit`
         """
-        def _find_match(start_pair):
-            """
-            Find matching loop ending keyword pair of loop starting keyword.
-            :param int start_pair: Index of starting pair
-            :raises SyntaxError: if there is no matching pair
-            """
 
-    def run(self) -> tuple[int, bool, int]:
+    def chunk(self, address) -> tuple[array | bytearray | list[int], int] | None:
         """
-        Run interpreter's program with current runtime variables.
+        :param int address:
+        :return: chunk holding address and address of its first cell, None if tape never grew to address.
         """
 
-
-class NyanEngine:
-    """
-    Engine for managing tree of interpreters, helping communications between interpreters.
-    """
-    debug: bool
-    root: NyanInterpreter | NyanBinaryInterpreter
-    nodetree: list[NyanInterpreter | NyanBinaryInterpreter]
-    references: dict[Path, NyanInterpreter | NyanBinaryInterpreter]
-    nyans: list[NyanInterpreter | NyanBinaryInterpreter]
-    def __init__(self, root_name, *, debug=False):
+    def read(self, address):
         """
-        :param Path root_name: path of root interpreter's source code
-        :keyword debug:
+        :param int address:
+        :rtype: int
+        :return: value of given address, **0** if never touched.
         """
 
-    def read_mouse(self, path: str | Path) -> collections.Generator[tuple[int, int, str], None, None]:
+    def write(self, address, value):
         """
-        Read mouse information from given path
-        :param path:
-        :raises SyntaxError: when invalid mouse info detected
+        :param int address:
+        :param int value: stored with cell width of memory
         """
 
-    def mouse_exists(self, nyan: NyanInterpreter | None = None) -> str:
+    def scan(self, address, step):
         """
-        :param nyan:
-        :return: mouse path if path exist, blank string ("") if not exist.
+        Move address by step until it meets a zero cell.
+        :param int address:
+        :param int step:
+        :return: address of zero cell
+        :rtype: int
         """
 
-    def find_mouse_info(self, nyan: NyanInterpreter | None = None) -> None:
+    def multiply(self, address, pairs):
         """
-        Create/Register all child/parent interpreter relationsheep with communicator
-        :param nyan:
+        Add value of given address times factor to each offset, then set given address to 0.
+        Does nothing unless value is positive, as the loop it replaces would never end.
+        :param int address:
+        :param tuple[tuple[int, int], ...] pairs: ``(offset, factor)`` pairs
         """
 
-    def read_binary_mouse(self, data) -> collections.Generator[tuple[int, int, str], None, None]:
+    def pack(self, cells) -> bytes | list[int]:
         """
-        Read binary mouse information from given data
-        :param bytes data:
+        :param cells: cell storage of this memory
+        :return: cells as little-endian bytes, or list if promoted
         """
 
-    def binary_mouse_exists(self, data) -> bool:
+    def unpack(self, data) -> array | bytearray | list[int]:
         """
-        :param bytes data:
-        :return: True if mouse data exist, False if not exist.
+        :param bytes | list[int] data: cells packed by **pack**
+        :return: cell storage of this memory
         """
 
-    def find_binary_mouse_info(self, nyan: NyanInterpreter | NyanBinaryInterpreter | None = None) -> None:
+    def dump(self) -> tuple:
         """
-        Create/Register all child/parent interpreter relationsheep with communicator
-        :param nyan:
+        :return: origin, promoted and packed cells of all chunks joined, which can be dumped with marshal.
         """
 
-    def run(self):
+    def load(self, state):
         """
-        Run root interpreter, and follow signals.
-        :return:
+        Replace cells with state made by **dump** of same memory class.
         """
 
-
+    def increase(self, pointer):
+        """
+        Increase value in given pointer's address
+        :param Pointer pointer:
+        :return:
+        """
+
+    def decrease(self, pointer):
+        """
+        Decrease value in given pointer's address
+        :param Pointer pointer:
+        """
+
+    def set(self, pointer: Pointer, value: int):
+        """
+        Set value in given pointer's address
+        :param Pointer pointer:
+        :param int value:
+        """
+
+    def get(self, pointer: Pointer):
+        """
+        Get value from given pointer's address
+        :param Pointer pointer:
+        :rtype: int
+        :return: :class:`int` if value set. if value is not even touched, returns **0**.
+        """
+
+
+class ByteMemory(Memory):
+    """
+    :class:`Memory` with 8-bit cells in a contiguous ``bytearray``, wrapping around on overflow.
+    """
+
+
+class PagedMemory(Memory):
+    """
+    :class:`Memory` storing unbounded integer cells in pages of ``2 ** page_bits`` cells, allocated on first touch.\n
+    `self.cells` is the page holding last reserved address, so programs wandering far in both directions
+    only pay for pages they touch.
+    """
+    page_bits: int
+    """Bits of page size, cut down while `limit` is set so a page is at most a 16th of it."""
+    pages: dict[int, array | list[int]]
+    cell_limit: int | None
+    """Value of `limit`, which pages cells again in pages of new size when set."""
+
+    def repage(self, bits):
+        """
+        Move cells into pages of ``2 ** bits`` cells.
+        """
+
+    def dump(self) -> tuple:
+        """
+        :return: origin, promoted, page bits and packed cells of every page
+        """
+
+    def load(self, state):
+        """
+        Replace pages with state made by **dump**.
+        """
+
+
+TAPES: dict[str, type[Memory]]
+"""
+Tape names accepted by ``tape`` option of :class:`NyanInterpreter` and :class:`NyanEngine`.
+
+.. note::
+    - int: :class:`Memory`
+    - byte: :class:`ByteMemory`
+    - paged: :class:`PagedMemory`
+"""
+
+
+def tape_type(tape: str | type[Memory] | None) -> type[Memory]:
+    """
+    :param tape: name in :data:`TAPES`, :class:`Memory` subclass, or None for :class:`Memory`
+    :raises ValueError: if tape name is not valid
+    """
+
+
+FIXED_TAPES: dict[tuple[type[Memory], int, int], type[Memory]]
+"""Tapes made by :func:`fixed_tape`, by tape and bounds."""
+
+
+def fixed_tape(tape, low, high) -> type[Memory]:
+    """
+    Subclass of tape allocating cells from low to high at once, so tape never grows while program stays within
+    them. Addresses past them still grow tape as usual.
+    :param type[Memory] tape: flat tape, :class:`Memory` or :class:`ByteMemory`
+    :param int low: lowest address
+    :param int high: highest address
+    """
+
+
+class SourceMap:
+    """
+    Maps index of parsed program back to position of source code.\n
+    Stores only start of each contiguous segment, since parsed program is source code without
+    comments, newlines and spaces.
+    """
+    indexes: array
+    offsets: array
+    line_starts: array
+    def __init__(self):
+        ...
+
+    def add(self, index, offset):
+        """
+        Register that program index starts at source offset, if it does not continue the last segment.
+        :param int index: index of parsed program
+        :param int offset: character offset of source code
+        """
+
+    def offset(self, index):
+        """
+        :param int index: index of parsed program
+        :return: character offset of source code
+        :rtype: int
+        """
+
+    def locate(self, index):
+        """
+        :param int index: index of parsed program
+        :return: 1-based line and column of source code
+        :rtype: tuple[int, int]
+        """
+
+
+class ProgramParser:
+    """
+    Parser for Nyanlang source code.\n
+    Accepting only text file (.nyan), not binary file (.nya).\n
+    Check if given path is not exists, if file suffix is not valid, and parse program.
+    """
+    chunk_size: int
+    tokens: re.Pattern
+    filename: Path
+    text: str | None
+    program: str | None
+    source_map: SourceMap | None
+    def __init__(self, filename: Path, text: str | None = None):
+        """
+        :param Path filename:
+        :param text: source code in memory, which is parsed instead of file if given.
+        """
+
+    def parse(self):
+        """
+        Parse program with path exists check, suffix check.\n
+        Reads file once by chunks, removing all comments, newline, spaces and building :class:`SourceMap` on the way.\n
+        Comment ends at next ``"``, except ``\\"`` right after a commented character.
+        Unterminated comment is kept as program.\n
+        To make EOF signal, it automatically appends space at the end.
+        :rtype str:
+        :return: properly parsed program source
+        :raises FileNotFoundError: if file is not exists
+        :raises ValueError: if file extension is not valid
+        """
+
+
+class ProgramCompiler:
+    """
+    Compiler turning parsed program (result of :class:`ProgramParser`) into instruction list.\n
+    Runs of same foldable keyword are folded into one instruction with count,
+    and loop instructions carry resolved jump targets.
+    """
+    foldable: tuple[int, ...]
+    forwarded: tuple[int, ...]
+    program: str
+    keywords: dict[str, collections.Callable]
+    code: list[tuple[int, int | str | None]] | None
+    origins: list[int] | None
+    def __init__(self, program, keywords):
+        """
+        :param str program: parsed program
+        :param dict keywords: keyword handlers of interpreter
+        """
+
+    def compile(self):
+        """
+        Compile program into instruction list, and save program index of each instruction to `self.origins`.
+        :rtype: list[tuple[int, int | str | None]]
+        :return: compiled instructions, always ending with :attr:`Opcodes.HALT`
+        :raises SyntaxError: if loop keywords are not matching
+        """
+
+
+class BinaryProgramCompiler(ProgramCompiler):
+    """
+    :class:`ProgramCompiler` of version 1 builds, where a compressed keyword is followed by 3 bytes of its count.
+    Compressed runs are folded into one instruction like runs of text, and origins are byte offsets.
+    """
+    program: memoryview | bytes
+    table: list[tuple[int | None, int | bytes | None, int]]
+    def __init__(self, program, table):
+        """
+        :param memoryview | bytes program: program bytes, without header
+        :param list table: :meth:`NyanBinaryInterpreter.instructions` of interpreter
+        """
+
+
+class ProgramOptimizer:
+    """
+    Optimizer of instruction list compiled by :class:`ProgramCompiler`.\n
+    Merges neighbouring add/move instructions, cancelling out ones that sum to zero,
+    and replaces loops of known shape with one instruction:
+     + ``~냐-``, ``~냥-``: :attr:`Opcodes.SET`
+     + ``~?-``, ``~!-`` and other pure moves: :attr:`Opcodes.SCAN`
+     + balanced add/move loops decreasing current cell by 1: :attr:`Opcodes.MULTIPLY`
+
+    .. note::
+        Replaced loops must end the same way they did. That holds for every cell of a wrapping tape like
+        :class:`ByteMemory`, but on unbounded cells ``~냐-`` and multiply loops over a negative value never end.
+        Unless `wraps`, they become :attr:`Opcodes.MULTIPLY` (``~냐-`` with no pairs), which only takes positive
+        cells, followed by the loop itself, which runs on for any other value. ``~냥-`` is kept as it is.
+    """
+    mergeable: tuple[int, ...]
+    code: list[tuple[int, int | str | tuple | None]]
+    origins: list[int]
+    wraps: bool
+    """Cells wrap around, so :attr:`Opcodes.SET` and :attr:`Opcodes.MULTIPLY` replace loops on their own."""
+    rewrites: list[tuple[int, str]]
+    def __init__(self, code, origins, wraps=False):
+        """
+        :param list code: compiled instructions
+        :param list[int] origins: program index of each instruction
+        :param bool wraps: whether code runs on a tape with fixed cell width
+        """
+
+    def optimize(self):
+        """
+        Optimize instructions, updating `self.origins` and recording replaced loops
+        to `self.rewrites` as ``(program index, kind)``.
+        :return: optimized instructions with jump targets resolved again
+        :rtype: list
+        """
+
+    def recognize(self, body):
+        """
+        :param list body: instructions between loop keywords
+        :return: ``(kind, instruction)`` if body is a known loop shape, None if not.
+        :rtype: tuple[str, tuple] or None
+        """
+
+
+class ProgramAnalysis:
+    """
+    What :class:`ProgramAnalyzer` proved of a program. Unknown bounds are None.
+    """
+    max_size: int
+    """Cells of largest tape allocated at once, larger ones grow as they are reached."""
+    input_range: tuple[int, int]
+    """Values `,` may read, any character of text mode."""
+    low: int | None
+    high: int | None
+    """Lowest and highest address pointer may reach, relative to where it starts."""
+    balanced: bool
+    """True if every loop leaves pointer where it found it."""
+    reads_input: bool
+    modules: bool
+    """True if program talks to other cats, with `;`, `:`, `'`, `먕` or `먀`."""
+    calls: bool
+    """True if program runs custom keywords, which make pointer bounds unknown."""
+    values: tuple[int | None, int | None]
+    """Lowest and highest value of cells, before they wrap on tapes with `cell_bits`."""
+    def __init__(
+        self, low=None, high=None, balanced=False, reads_input=False, modules=False, calls=False, values=(None, None)
+    ): ...
+
+    @property
+    def bounded(self) -> bool:
+        """
+        :return: True if both pointer bounds are known.
+        """
+
+    @property
+    def size(self) -> int | None:
+        """
+        :return: cells between pointer bounds, None if they are unknown.
+        """
+
+    def dump(self) -> tuple:
+        """
+        :return: analysis as a tuple, stored in :class:`ProgramCache`.
+        """
+
+    @classmethod
+    def load(cls, state) -> ProgramAnalysis:
+        """
+        :param tuple state: analysis made by **dump**
+        """
+
+    def tape(self, tape, limit=None) -> type[Memory]:
+        """
+        Cheapest tape able to run program, which is :func:`fixed_tape` of tape if bounds are known.
+        :param type[Memory] tape: tape chosen by user
+        :param int | None limit: :attr:`Memory.limit` of tape, bounds larger than it aren't allocated at once
+        :return: tape itself if bounds are unknown, too large, or tape is :class:`PagedMemory` or other tape.
+        """
+
+    def report(self, filename, tape=Memory, limit=None) -> list[str]:
+        """
+        :param filename: name of program in report
+        :param type[Memory] tape: tape chosen by user
+        :param int | None limit: limit of tape
+        :return: lines of pointer bounds, chosen tape, loops, values and what program uses
+        """
+
+
+class ProgramAnalyzer:
+    """
+    Static analysis of instructions of :class:`ProgramCompiler` or :class:`ProgramOptimizer`.\n
+    Pointer is followed through straight code and balanced loops, which reach same addresses on every pass.
+    Loops moving pointer, `SCAN` and custom keywords leave pointer bounds unknown.
+    Cell values are bounded while nothing adds to them in loops.
+    """
+    code: collections.Iterable[tuple[int, int | str | tuple | None]]
+    def __init__(self, code):
+        """
+        :param code: compiled instructions, with loop instructions in pairs
+        """
+
+    def analyze(self) -> ProgramAnalysis:
+        """
+        Analyze instructions in one pass.
+        """
+
+
+class ProgramCache:
+    """
+    On-disk cache of parsed, loop-resolved and compiled programs.\n
+    Entries are stored in ``__nyancache__`` next to source file, or in `directory` if given,
+    and keyed by content hash of source file, `version`, Python version, optimization level and keyword set.
+    Invalid or stale entries are regenerated by :meth:`NyanInterpreter.init`.
+    """
+    version: int
+    directory_name: str
+    magic: bytes
+    directory: Path | None
+    def __init__(self, directory=None):
+        """
+        :param str | Path | None directory: directory of every cache entry, ``__nyancache__`` next to source if None.
+        """
+
+    def path(self, filename, tag) -> Path:
+        """
+        :param Path filename: source file
+        :param str tag: kind of interpreter and optimization level
+        :return: path of cache entry
+        """
+
+    def key(self, filename, tag, signature="") -> bytes | None:
+        """
+        :param Path filename: source file
+        :param str tag: kind of interpreter and optimization level
+        :param str signature: keyword set of interpreter
+        :return: key of cache entry, None if source file cannot be read.
+        """
+
+    def load(self, filename, tag, key) -> dict | None:
+        """
+        :return: cache entry, None if entry doesn't exist, is invalid or stale.
+        """
+
+    def store(self, filename, tag, key, entry) -> None:
+        """
+        Write cache entry with marshal. Errors are ignored, program runs without cache.
+        """
+
+
+class Bundle:
+    """
+    ``.nya`` version 2 file, which holds every module linked by mouse info.\n
+    Layout, in little endian:
+     + header: magic ``\\x02NYA``, version (uint32), module count, link count, root module index
+     + module table: offset and length of name, instruction words and constant words of each module
+     + link table: ``(parent, pos, child, tpos)`` of each mouse link
+     + sections, each aligned to 8 bytes
+
+    Each instruction is one 64-bit word, ``opcode | argument << 8``.
+    Jump arguments are resolved instruction indexes, and :attr:`Opcodes.MULTIPLY` arguments are
+    offsets of ``count, offset, factor, ...`` in constant words.\n
+    File is read at once, and instruction words are read from its buffer without copying.
+    """
+    magic: bytes
+    version: int
+    header: struct.Struct
+    module_entry: struct.Struct
+    link_entry: struct.Struct
+    data: bytes
+    filename: Path | None
+    root: int
+    modules: list[tuple[int, int, int, int, int, int]]
+    links: list[tuple[int, int, int, int]]
+    def __init__(self, data, filename=None):
+        """
+        :param data: buffer of bundle
+        :param Path | None filename:
+        :raises SyntaxError: if magic bytes are invalid
+        :raises ValueError: if version is not supported
+        """
+
+    @classmethod
+    def open(cls, filename) -> Bundle:
+        """
+        Read bundle file.
+        :param Path filename:
+        """
+
+    @classmethod
+    def is_bundle(cls, data) -> bool:
+        """
+        :param bytes data: start of file
+        """
+
+    def words(self, offset, length) -> memoryview | array:
+        """
+        :param int offset: byte offset of words
+        :param int length: count of words
+        :return: view of words, or copy of them on big endian machine.
+        """
+
+    def name(self, index) -> str:
+        """
+        :param int index: index of module
+        :return: path of module relative to root program
+        """
+
+    def code(self, index) -> memoryview | array:
+        """
+        :param int index: index of module
+        :return: instruction words of module
+        """
+
+    def constants(self, index) -> memoryview | array:
+        """
+        :param int index: index of module
+        :return: constant words of module
+        """
+
+    @classmethod
+    def write(cls, filename, modules, links, root=0) -> None:
+        """
+        :param Path filename:
+        :param list modules: ``(name, instruction words, constant words)`` of each module
+        :param list links: ``(parent, pos, child, tpos)`` of each link, by module index
+        :param int root: index of root module
+        """
+
+
+class Snapshot:
+    """
+    Binary snapshot of running program, made by :meth:`NyanEngine.snapshot`.\n
+    Starts with a :attr:`header` of magic bytes and version, followed by state compressed with zlib,
+    which is made of tuples, integers and bytes dumped with marshal, so loading it never runs code.
+    """
+    magic: bytes
+    version: int
+    header: struct.Struct
+    state: tuple
+    def __init__(self, data):
+        """
+        :param bytes data:
+        :raises SyntaxError: if data doesn't start with magic bytes
+        :raises ValueError: if snapshot version is not supported
+        """
+
+    @classmethod
+    def encode(cls, state) -> bytes:
+        """
+        :param tuple state:
+        :return: snapshot of state
+        """
+
+
+class PythonGenerator:
+    """
+    Generator of Python source code from instruction list compiled by :class:`ProgramCompiler`.\n
+    Generated module defines ``run(o)``, a generator function which takes
+    :class:`NyanPythonInterpreter` and yields signal of :class:`Signals` on ``;``, ``:`` and custom keywords,
+    so that :class:`NyanEngine` can switch modules.\n
+    Loops nested deeper than `max_depth` are moved to separate functions.\n
+    With `fuel`, each loop iteration spends fuel of interpreter by length of loop, and yields
+    ``Signals.KEEP_GOING`` when it runs out. Cursor is then kept where tape may grow, so limits are located.
+
+    .. note::
+        Cells are written to ``array('q')`` of tape in place. A write which overflows it promotes tape,
+        see :meth:`Memory.promote`, and is done again on python integers.
+    """
+    indent: str
+    max_depth: int
+    tiered: tuple[int, ...]
+    """Instructions **generate_loop** compiles. Loops with others stay interpreted."""
+    header: str
+    footer: str
+    code: list[tuple[int, int | str | tuple | None]]
+    origins: list[int] | None
+    source_map: SourceMap | None
+    name: str
+    fuel: bool
+    def __init__(self, code, origins=None, source_map=None, name="<nyan>", fuel=False):
+        """
+        :param list code: compiled instructions
+        :param list[int] origins: program index of each instruction, used for line:col comments
+        :param SourceMap source_map:
+        :param str name: name of source file
+        :param bool fuel: generate loops spending :attr:`NyanInterpreter.fuel`
+        """
+
+    @staticmethod
+    def signed(arg) -> str:
+        """
+        :param int arg:
+        :return: ``"+ arg"`` or ``"- -arg"``
+        """
+
+    def generate(self) -> str:
+        """
+        :return: source code of Python module
+        """
+
+    @staticmethod
+    def store(target, value) -> list[str]:
+        """
+        Lines writing value to cell, promoting tape if it overflows.
+        :param str target: index of cell in `cells`
+        :param str value: expression of value
+        """
+
+    def generate_loop(self, start) -> str | None:
+        """
+        Source code of module defining ``loop_<start>(o, memory, mask, cells, origin, size, i, fuel)``,
+        which runs loop of :class:`NyanInterpreter` until it ends, fuel runs out, or `,` has to wait for input.
+        It returns cursor to go on from, and the state it was given.
+        :param int start: index of `JUMP_ZERO` of loop
+        :return: None if loop has instructions other than `tiered`, or is nested deeper than `max_depth`.
+        """
+
+    def comment(self, pc) -> str:
+        """
+        :param int pc: index of instruction
+        :return: ``line:col`` of instruction in source file, blank string if unknown.
+        """
+
+    def statements(self, frame, op, arg, pc) -> list[str]:
+        """
+        :return: lines of Python code for one instruction, without indentation.
+        """
+
+
+def read_module(o) -> tuple[int, bool, int] | None:
+    """
+    Handler of ``:``, reading value from cat of module pointer into current cell.
+    :param NyanInterpreter o:
+    :return: pause signal if nothing was sent yet, so sender runs first.
+    :raises ValueError: if parent cat or child cat does not exist
+    """
+
+
+def write_module(o) -> tuple[int, bool, int] | None:
+    """
+    Handler of ``;``, sending current cell to cat of module pointer.
+    :param NyanInterpreter o:
+    :return: pause signal if channel is full, see :meth:`NyanInterpreter.send`.
+    :raises ValueError: if parent cat or child cat does not exist
+    """
+
+
+def jump_zero(o):
+    """
+    Handler of ``~``, jumping past loop end if current cell is 0.
+    :param NyanInterpreter o:
+    """
+
+
+def jump_nonzero(o):
+    """
+    Handler of ``-``, jumping back to loop start if current cell is not 0.
+    :param NyanInterpreter o:
+    """
+
+
+def toggle_module(o):
+    """
+    Handler of ``'``, toggling module pointer between parents and children.
+    :param NyanInterpreter o:
+    """
+
+
+class NyanInterpreter:
+    """
+    General interpreter for running one Nyanlang source code.\n
+    If mouse support is required, use :class:`NyanEngine` or :class:`NyanBinaryEngine`.\n
+    State is kept in ``__slots__``, and keyword handlers in a table shared by every cat,
+    so cats are cheap to make. Subclasses adding attributes should declare their own slots.
+    """
+    cache_tag: str
+    keyword_table: types.MappingProxyType[str, collections.Callable[[NyanInterpreter], None | tuple[int, bool, int]]]
+    """Handlers every cat starts with. **add_keyword** copies them, so other cats keep them."""
+    compiled: dict[tuple, dict]
+    """
+    :meth:`cache_entry` of every program initialized in this process, so cats loading same file share program.
+    Oldest one is dropped past `compiled_size`.
+    """
+    compiled_size: int
+    hot_threshold: int
+    """Times a loop goes round before **hot_loop** compiles it."""
+    loops_size: int
+    """Compiled loops kept for each program. Oldest one is dropped past it, and compiled again once it's hot."""
+    filename: Path
+    initialized: bool
+    cache: ProgramCache | None
+    io: NyanIO
+
+    program: str | None
+    text: str | None
+    """Source code in memory, parsed instead of `filename` if set before **init**."""
+    debug: bool
+    sub: bool
+    tape: type[Memory]
+    optimize: bool
+    rewrites: list[tuple[int, str]]
+
+    cursor: int
+    memory: Memory
+    pointer: Pointer
+    module_pointer: Pointer
+    pointing_parents: bool
+    children: dict[int, Communicator]
+    parents: dict[int, Communicator]
+    waiting: collections.deque[tuple[bool, int]]
+    unlimited: int
+    """Fuel of interpreter without `fuel`, which never runs out."""
+    fuel: int | None
+    """
+    Instructions to run before giving way with ``Signals.KEEP_GOING``, unlimited if None.
+    Fuel is spent only at loop back-edges, by length of loop, so it's counted without slowing down instructions.
+    Set by :meth:`NyanEngine.run_async` and by limits of :class:`NyanEngine`.
+    """
+    fuel_left: int | None
+    """
+    Fuel left when **run** returned, which next run goes on with. **0** when fuel ran out, then next run gets
+    `fuel` again.
+    """
+    tape_limit: int | None
+    """:attr:`Memory.limit` of memory made on **init** and **reset**."""
+
+    jump_points: dict[int, int]
+    next_points: dict[int, int]
+    source_map: SourceMap | None
+
+    code: list[tuple[int, int | str | None]] | None
+    origins: list[int] | None
+    heat: list[int] | None
+    """Times left before each loop is hot, by index of its first instruction. Negative for loops never compiled."""
+    loops: dict[int, collections.Callable]
+    """
+    Hot loops compiled by **hot_loop**, by index of their `JUMP_ZERO`. Dropped when `code` changes.
+    Shared by cats sharing program through `compiled`, and by clones.
+    """
+    analysis: ProgramAnalysis | None
+    """Analysis of `code`, which picks tape of memory made by **init** and **reset**. None if there is no code."""
+
+    keywords: collections.Mapping[str, collections.Callable[[NyanInterpreter], None | tuple[int, bool, int]]]
+    """`keyword_table`, or its copy once a keyword is added."""
+
+    def __init__(self, filename, subprocess=False, debug=False, tape=None, optimize=False, cache=None, io=None):
+        """
+        :param Path filename:
+        :param bool subprocess:
+        :param bool debug:
+        :param tape: tape of memory, see :func:`tape_type`
+        :param bool optimize: optimize compiled instructions with :class:`ProgramOptimizer`
+        :param ProgramCache | None cache: cache of parsed and compiled program
+        :param NyanIO | None io: I/O layer of `.`, `,` and `뀨`, :class:`NyanIO` of standard streams if None.
+        """
+
+    def init(self, compiled=None):
+        """
+        Initialize interpreter.\n
+        It will do:
+         + share program of `compiled`, or of given memo, if same file was initialized before, or
+         + restore program from `self.cache` if there is a valid entry, or
+         + parse program
+         + parse loop points from parsed program
+         + compile parsed program into instructions
+         + store them to `self.cache`
+         + make memory of tape picked by `self.analysis`
+         + set `self.initialized` to true
+         + return self
+        since it returns self, you can chain this function call with `self.run()`.\n
+        Example:
+          NyanInterpreter(Path(".").absolute()).init().run()
+
+        :param dict | None compiled: memo of programs used instead of `compiled`, which isn't bounded by
+            `compiled_size`, as its owner drops programs itself.
+        :rtype: NyanInterpreter
+        """
+
+    def shared_key(self, tag, key=None) -> tuple | None:
+        """
+        :param str tag: cache tag of program
+        :param bytes | None key: :meth:`ProgramCache.key` of file, hashing its contents
+        :return: key of program in `compiled`, made of `text` or `key`, None if file doesn't exist.
+        """
+
+    def new_memory(self) -> Memory:
+        """
+        :return: empty memory of `self.tape`, or of :func:`fixed_tape` if `self.analysis` proved pointer bounds.
+        """
+
+    def reset(self):
+        """
+        Reset interpreter runtime attributes.\n
+        It will do:
+         + set `self.cursor` to 0
+         + set `self.memory` to **new_memory**.
+         + set `self.pointer` and `self.module_pointer` to new :class:`Pointer` object.
+         + set `self.pointing_parents` to False.
+        :return:
+        """
+
+    def clone(self, io=None) -> NyanInterpreter:
+        """
+        Copy interpreter for another run, sharing parsed and compiled program.
+        Clone has new runtime attributes like **reset**, and no parents or children.
+        :param NyanIO | None io: I/O layer of clone, same as this interpreter if None.
+        """
+
+    def add_keyword(self, keyword: str) -> collections.Callable[[collections.Callable[[NyanInterpreter], any]], None]:
+        """
+        Function decorator for adding a keyword. \n
+        You can use this function after making an instance of :class:`NyanInterpreter`.\n
+        Adding a keyword drops compiled instructions, so program is compiled again on next run.\n
+        >>> nyan = NyanInterpreter(Path("."))
+        >>> @nyan.add_keyword("w")
+        ... def w_handler(o: NyanInterpreter):
+        ...     ...
+        :param keyword: a character that will be registered as keyword.
+        """
+        def wrapper(handler: collections.Callable[[NyanInterpreter], any]):
+            """
+            :param handler: A handler function that will take NyanInterpreter object, and handle keyword event.
+            """
+
+    def signature(self) -> str:
+        """
+        :return: keyword set and native instruction of each keyword, as part of cache key.
+        """
+
+    def fingerprint(self) -> bytes:
+        """
+        :return: hash of compiled program, so state is only loaded to program compiled the same way.
+        """
+
+    def dump_state(self) -> tuple:
+        """
+        :return: cursor, pointers, memory and channels waiting for receiver, which can be dumped with marshal.
+        """
+
+    def load_state(self, state):
+        """
+        Replace runtime attributes with state made by **dump_state**, so next **run** resumes from it.
+        :raises ValueError: if state is of another tape
+        """
+
+    def cache_entry(self) -> dict:
+        """
+        :return: parsed and compiled program, which can be dumped with marshal.
+        """
+
+    def restore(self, entry):
+        """
+        Restore parsed and compiled program from cache entry of :meth:`cache_entry`.
+        :param dict entry:
+        """
+
+    def add_parent(self, parent, pos):
+        """
+        Add :class:`Communicator` between parent and self.
+        :param Communicator parent:
+        :param int pos:
+        :raises ValueError: when same parent communicator already added
+        """
+
+    def add_child(self, child, pos):
+        """
+        Add :class:`Communicator` between child and self.
+        :param Communicator child:
+        :param int pos:
+        :raises ValueError: when same child communicator already added
+        """
+
+    def parse_program(self):
+        """
+        Parse program using :class:`ProgramParser` and set `self.program`, `self.source_map` from parse result.
+        """
+
+    def compiler(self) -> ProgramCompiler:
+        """
+        :return: compiler of parsed program
+        """
+
+    def compile_program(self):
+        """
+        Compile parsed program using :meth:`compiler` and set `self.code`, `self.origins` from result.\n
+        If `self.optimize` is set, instructions are optimized with :class:`ProgramOptimizer`.
+        Then they are analyzed by :class:`ProgramAnalyzer`.
+        """
+
+    def optimization_report(self) -> list[str]:
+        """
+        :return: ``filename:line:column: kind loop`` line for each loop replaced by optimizer
+        """
+
+    def analysis_report(self) -> list[str]:
+        """
+        :return: report of `self.analysis`, see :meth:`ProgramAnalysis.report`
+        """
+
+    def locate(self, index):
+        """
+        :param int index: index of parsed program
+        :return: 1-based line and column of source code, None if program is not parsed from source
+        :rtype: tuple[int, int] or None
+        """
+
+    def position(self, cursor=None):
+        """
+        :param int | None cursor: index of instruction, `self.cursor` if None.
+        :return: 1-based line and column of instruction in source code, None if unknown.
+        :rtype: tuple[int, int] or None
+        """
+
+    def parse_loop_points(self):
+        """
+        Parse loop points from parsed program (self.program) with a stack of loop starting keywords.
+        :raises SyntaxError: if there is no matching pair, with line and column of unmatched keyword
+        """
+
+    def loop_error(self, message, index) -> SyntaxError:
+        """
+        :param str message:
+        :param int index: index of parsed program
+        :return: SyntaxError pointing source position of given index
+        """
+
+    def before_run(self):
+        ...
+
+    def after_run(self):
+        ...
+
+    def start_of_loop(self):
+        ...
+
+    def end_of_loop(self):
+        ...
+
+    def module_read(self, keyword=":"):
+        """
+        Register :func:`read_module` for keyword.
+        :param str keyword:
+        """
+
+    def module_write(self, keyword=";"):
+        """
+        Register :func:`write_module` for keyword.
+        :param str keyword:
+        """
+
+    def jumper_start(self, keyword="~"):
+        """
+        Register :func:`jump_zero` for keyword.
+        :param str keyword:
+        """
+
+    def jumper_end(self, keyword="-"):
+        """
+        Register :func:`jump_nonzero` for keyword.
+        :param str keyword:
+        """
+
+    def module_control(self, keyword="'"):
+        """
+        Register :func:`toggle_module` for keyword.
+        :param str keyword:
+        """
+
+    def send(self, value) -> bool:
+        """
+        Send value to the cat of `self.module_pointer`, used by `;`.\n
+        If channel is not full, receiver is recorded to `self.waiting` and runs later.
+        :param int value:
+        :return: True if channel is full, and interpreter should pause for receiver.
+        :raises ValueError: if cat does not exist
+        """
+
+    def drain(self) -> tuple[int, bool, int] | None:
+        """
+        Called before halting.
+        :return: pause signal to the first waiting cat with values it has not received, None if there is none.
+        """
+
+    def hooked(self) -> bool:
+        """
+        :return: True if `start_of_loop` or `end_of_loop` is overridden by subclass.
+        """
+
+    def hot_loop(self, start) -> collections.Callable | None:
+        """
+        Compiled function of a hot loop, see :meth:`PythonGenerator.generate_loop`.
+        :param int start: index of `JUMP_ZERO` of loop
+        :return: None if loop can't be compiled, which then is never tried again.
+        """
+
+    def step(self) -> tuple[int, bool, int] | None:
+        """
+        Run one instruction at `self.cursor` and move cursor.
+        :return: signal tuple if instruction stops interpreter, None if not.
+        :raises SyntaxError: when invalid character(keyword) detected
+        """
+
+    def execute(self, op, arg) -> tuple[int, bool, int] | None:
+        """
+        Run one decoded instruction at `self.cursor` and move cursor.
+        :param int op: opcode, see :class:`Opcodes`
+        :param arg: argument of instruction
+        :return: signal tuple if instruction stops interpreter, None if not.
+        :raises SyntaxError: when invalid character(keyword) detected
+        """
+
+    def run(self) -> tuple[int, bool, int]:
+        """
+        Run interpreter's compiled program with current runtime variables.\n
+        `self.cursor` is index of compiled instruction, not index of program.\n
+        If `start_of_loop` or `end_of_loop` is overridden, runs one instruction at a time with **step**.
+        Otherwise, loops going round `hot_threshold` times run through **hot_loop**, which spends fuel the same way.
+        :raises SyntaxError: when invalid character(keyword) detected
+        """
+
+
+class NyanBinaryInterpreter(NyanInterpreter):
+    """
+    NyanInterpreter, but handles binary code.\n
+    Version 1 builds are compiled by :class:`BinaryProgramCompiler`, and words of bundle modules are decoded on load,
+    so both run by :meth:`NyanInterpreter.run` with its hot loops.
+    """
+    program: memoryview | bytes | None
+    constant_program: bytes | None
+    bundle: Bundle | None
+    module: int | None
+    constants: memoryview | array | None
+    multipliers: dict[int, tuple[tuple[int, int], ...]]
+    table: list[tuple[int | None, int | bytes | None, int]] | None
+    """:meth:`instructions`, made once for keywords of this interpreter."""
+    binary_keyword_table: types.MappingProxyType[bytes, collections.Callable] | None
+    """Handlers by byte of :attr:`NyanBuilder.keywords`, made when first binary interpreter is."""
+    keywords: collections.Mapping[bytes, collections.Callable[[NyanBinaryInterpreter], None | tuple[int, bool, int]]]
+    def __init__(self, filename, subprocess=False, debug=False, tape=None, optimize=False, cache=None, io=None):
+        """
+        :param Path filename:
+        :param bool subprocess:
+        :param bool debug:
+        :param tape: tape of memory, see :func:`tape_type`
+        :param bool optimize: optimize compiled instructions with :class:`ProgramOptimizer`
+        :param ProgramCache | None cache: cache of parsed and compiled program
+        :param NyanIO | None io: I/O layer of `.`, `,` and `뀨`, :class:`NyanIO` of standard streams if None.
+        """
+
+    def init(self, compiled=None):
+        """
+        Load root module of file if it is a :class:`Bundle`, or initialize like :meth:`NyanInterpreter.init`.
+        :rtype: NyanBinaryInterpreter
+        """
+
+    def load(self, bundle, module):
+        """
+        Load instruction words of module from bundle, decode them into `self.code`, and analyze them.
+        :param Bundle bundle:
+        :param int module: index of module
+        :rtype: NyanBinaryInterpreter
+        """
+
+    def compiler(self) -> BinaryProgramCompiler:
+        """
+        :return: compiler of version 1 program
+        """
+
+    def compile_program(self):
+        """
+        Compile version 1 program like :meth:`NyanInterpreter.compile_program`.
+        Modules of bundles are already decoded by :meth:`load`.
+        """
+
+    def execute(self, op, arg):
+        """
+        Execute instruction like :meth:`NyanInterpreter.execute`,
+        except version 1 programs end without the blank lines written after text programs.
+        """
+
+    def argument(self, op, arg):
+        """
+        Decode argument of instruction word.
+        :param int op:
+        :param int arg:
+        :return: keyword for forwarded instructions, pairs for :attr:`Opcodes.MULTIPLY`, else arg itself.
+        """
+
+    def add_binary_keyword(self, keyword: bytes):
+        """
+        Function decorator for adding a keyword. \n
+        You can use this function after making an instance of :class:`NyanBinaryInterpreter`.\n
+        >>> nyan = NyanBinaryInterpreter(Path("."))
+        >>> @nyan.add_keyword("w")
+        ... def w_handler(o: NyanBinaryInterpreter):
+        ...     ...
+        :param keyword: a character that will be registered as keyword.
+        """
+        def wrapper(handler: collections.Callable[[NyanBinaryInterpreter], any]):
+            """
+            :param handler: A handler function that will take NyanBinaryInterpreter object, and handle keyword event.
+            """
+
+    def parse_program(self):
+        """
+        Parse program with path exists check, suffix check.\n
+        Once it gets file data, it removes all comments, newline, spaces.
+        :raises FileNotFoundError: if file is not exists
+        :raises ValueError: if file extension is not valid
+        """
+
+    def parse_loop_points(self):
+        """
+        Parse loop points from parsed program (self.program) with a stack of loop starting keywords.
+        :raises SyntaxError: if there is no matching pair, with byte index of unmatched keyword
+        """
+
+    def instructions(self) -> list[tuple[int | None, int | bytes | None, int]]:
+        """
+        Made once, and again after :meth:`add_binary_keyword`.
+        :return: ``(opcode, argument, width)`` of each byte, opcode is None if keyword has no native instruction.
+        """
+
+
+class NyanPythonInterpreter(NyanInterpreter):
+    """
+    NyanInterpreter, but runs Python code generated by :class:`PythonGenerator`.\n
+    Also runs ``.py`` file compiled by ``nyan compile --py``.
+    """
+    source: str | None
+    bytecode: types.CodeType | None
+    function: collections.Callable[[NyanPythonInterpreter], collections.Generator] | None
+    fueled: collections.Callable[[NyanPythonInterpreter], collections.Generator] | None
+    generator: collections.Generator | None
+
+    def parse_program(self):
+        """
+        Parse program like :meth:`NyanInterpreter.parse_program`, or read compiled source code if file is ``.py``.
+        """
+
+    def compile_program(self):
+        """
+        Compile program to instructions, generate Python source code and load it.
+        """
+
+    def load_source(self):
+        """
+        Compile `self.source` to `self.bytecode`, and load it.
+        """
+
+    def load_bytecode(self):
+        """
+        Execute `self.bytecode` and take its ``run`` function.
+        """
+
+    def fueled_function(self) -> collections.Callable[[NyanPythonInterpreter], collections.Generator]:
+        """
+        :return: ``run`` function generated with fuel, used while `fuel` is set. Same as `function`
+            for ``.py`` files, which have no instructions to generate it from, so instruction and time limits
+            don't stop them.
+        """
+
+    def dump_state(self) -> tuple:
+        """
+        :raises ValueError: if generated code is running, as its place can't be saved.
+        """
+
+    def load_state(self, state):
+        """
+        :raises ValueError: if state is not at start of program, as generated code can't start from a cursor.
+        """
+
+    def export(self, output=None) -> Path:
+        """
+        Write generated source code to file.
+        :param str | None output: output path, ``<stem>.py`` of current directory if None.
+        :raises ValueError: if file extension is not ``.py``
+        :return: output path
+        """
+
+    def run(self) -> tuple[int, bool, int]:
+        """
+        Resume generated code until it yields signal.
+        """
+
+
+class Mailbox:
+    """
+    Pipe many processes write to, read in the order messages were written.\n
+    :class:`multiprocessing.Queue` writes from a thread of its own, so a message could overtake one another process
+    wrote before it, and output of cats could be reordered.
+    """
+    reader: multiprocessing.connection.Connection
+    writer: multiprocessing.connection.Connection
+    lock: multiprocessing.Lock
+
+    def __init__(self, context):
+        """
+        :param context: multiprocessing context
+        """
+
+    def put(self, message):
+        """
+        Write message, waiting for other writers.
+        """
+
+    def get(self, timeout=None):
+        """
+        Read next message, waiting up to timeout seconds, or forever if None.
+        :raises queue.Empty: if no message came in time
+        """
+
+
+class ParallelChannel:
+    """
+    One side of :class:`Communicator` link between cats of different :class:`NyanWorker` threads.\n
+    Values go straight to worker of receiver, and engine process only counts them. `;` blocks once it sent
+    `channel_size` values since receiver last gave way, until receiver gives way again: ends its run, waits to read,
+    or fills a channel itself. `:` blocks until a value arrives.
+    """
+    worker: NyanWorker
+    cat: int
+    link: int
+    target: int
+    received: int
+    credits: int
+
+    def __init__(self, worker, cat, link, target):
+        """
+        :param NyanWorker worker:
+        :param int cat: index of cat owning this side
+        :param int link: index of link in :attr:`NyanEngine.links`
+        :param int target: index of cat on other side
+        """
+
+    def send(self, nyan, data) -> bool:
+        """
+        Flush output of nyan, and send data to other side, waiting for it to give way if channel is full.
+        :return: always False, as a full channel is waited for here.
+        """
+
+    def receive(self, nyan) -> int:
+        """
+        Receive data from other side, giving way and waiting for it if there is none.
+        """
+
+    def pending(self, nyan) -> int:
+        """
+        For root cat, give way and wait until every other cat is idle or waiting for input of `:`.
+        :return: always 0
+        """
+
+
+class ChannelIO(NyanIO):
+    """
+    I/O layer of cat in :class:`NyanWorker`, which writes and reads through the engine process.
+    """
+    worker: NyanWorker
+    cat: int
+
+    def __init__(self, worker, cat, **options):
+        """
+        :param NyanWorker worker:
+        :param int cat:
+        :param options: options of :class:`NyanIO`
+        """
+
+
+class NyanWorker:
+    """
+    Worker process of :meth:`NyanEngine.run_parallel`, running each of its cats in their own thread.\n
+    Cats are created again in worker from recipes, with programs compiled by engine,
+    so keywords added to interpreters of engine are not seen.
+    """
+    index: int
+    owners: list[int]
+    cats: list[int]
+    recipes: list[tuple[type, Path, bool, bytes]]
+    links: list[tuple[int, int, int, int]]
+    options: dict
+    mailboxes: list[Mailbox]
+    events: Mailbox
+    nyans: dict[int, NyanInterpreter | NyanBinaryInterpreter]
+    inbound: dict[tuple[int, int], queue.Queue]
+    credits: dict[tuple[int, int], queue.Queue]
+    inputs: dict[int, queue.Queue]
+    quiet: dict[int, queue.Queue]
+    starts: dict[int, queue.Queue]
+    received: dict[int, int]
+    delivered: dict[int, int]
+    held: dict[int, int]
+    given: dict[int, int | str | None]
+    waiters: dict[int, list[tuple[int, int]]]
+    lock: threading.Lock | None
+    posting: threading.Lock | None
+
+    def __init__(self, index, owners, recipes, links, options, mailboxes, events):
+        """
+        :param int index:
+        :param list[int] owners: index of worker running every cat
+        :param recipes: interpreter class, path, subprocess and marshalled :meth:`NyanInterpreter.cache_entry`
+            of every cat
+        :param links: parent, pos, child, tpos of every link as cat indexes
+        :param dict options: options of engine
+        :param list[Mailbox] mailboxes: commands and values to every worker
+        :param Mailbox events: events to engine
+        """
+
+    def create_nyan(self, cat) -> NyanInterpreter | NyanBinaryInterpreter:
+        """
+        Create interpreter of cat from its recipe, restoring its compiled program.
+        :param int cat:
+        """
+
+    def give_way(self, cat, given, check=None) -> list[tuple[int, int]] | None:
+        """
+        Mark cat as not running, like :meth:`NyanEngine.run` switching away from it.
+        :param int cat:
+        :param given: link cat waits to read, or ``"idle"``, ``"sending"``, ``"quiet"`` or ``"halted"``
+        :param check: called under lock, cat keeps running if it returns False
+        :return: senders and links waiting on cat, which may go on now, or None if check failed
+        """
+
+    def post(self, message, cat=None):
+        """
+        Send message to engine, or to worker of cat. Worker stops between messages, so it never leaves
+        a lock of :class:`Mailbox` held.
+        """
+
+    def grant(self, waiters):
+        """
+        Let senders waiting on a cat go on.
+        :param waiters: senders and links, as returned by :meth:`give_way`
+        """
+
+    def credit(self, cat, link):
+        """
+        Let cat go on sending to link.
+        """
+
+    def start(self, cat):
+        """
+        Start a run of sub cat.
+        """
+
+    def run(self):
+        """
+        Start every cat, and follow commands of engine and values of other workers until engine stops.
+        Starts of engine wait for values it counted before them, which come from other workers.
+        """
+
+    def serve(self, cat):
+        """
+        Run cat. Sub cats run whenever engine starts them, and reset after each run.
+        Fuel spent by cat and limits it exceeds are sent to engine as events.
+        :param int cat:
+        """
+
+
+class NyanEngine:
+    """
+    Engine for managing tree of interpreters, helping communications between interpreters.
+    """
+    backends: tuple[str, ...]
+    debug: bool
+    tape: type[Memory]
+    optimize: bool
+    backend: str
+    cache: ProgramCache | None
+    io: NyanIO
+    channel_size: int
+    workers: int | None
+    sources: dict[Path, str | bytes]
+    limit_fuel: int
+    """Fuel of interpreters while limits are set, so limits are checked once in this many instructions."""
+    max_instructions: int | None
+    max_tape: int | None
+    timeout: float | None
+    spent: int
+    """Instructions counted against `max_instructions` in last run, counted whenever fuel runs out."""
+    deadline: float | None
+    """``time.monotonic()`` when `timeout` of current run expires."""
+    compiled: dict[tuple, dict] | None
+    links: list[tuple[NyanInterpreter, int, NyanInterpreter, int]]
+    root: NyanInterpreter | NyanBinaryInterpreter
+    nodetree: list[NyanInterpreter | NyanBinaryInterpreter]
+    references: dict[Path, NyanInterpreter | NyanBinaryInterpreter]
+    nyans: list[NyanInterpreter | NyanBinaryInterpreter]
+    def __init__(
+        self, root_name, *, debug=False, tape=None, optimize=False, backend="interpreter", cache=True, io=None,
+        channel_size=1, workers=None, sources=None, max_instructions=None, max_tape=None, timeout=None, compiled=None
+    ):
+        """
+        :param Path root_name: path of root interpreter's source code
+        :keyword debug:
+        :keyword tape: tape of every interpreter's memory, which decides cell width and wrap semantics.
+            see :func:`tape_type`
+        :keyword optimize: optimize every interpreter's instructions, see :class:`ProgramOptimizer`
+        :keyword backend: one of `backends`. ``"python"`` runs source code with :class:`NyanPythonInterpreter`
+        :keyword cache: True to cache programs next to source files, directory of cache, or False to disable.
+            see :class:`ProgramCache`
+        :keyword io: I/O layer shared by every interpreter, :class:`NyanIO` of standard streams if None.
+        :keyword channel_size: capacity of every :class:`Communicator`.
+            With 1, cat switches to receiver on every `;`. With more, sender keeps running until channel is full,
+            it reads with `:`, or it halts, so output of cats may be ordered differently.
+        :keyword workers: number of worker processes to run cats in parallel, see :meth:`run_parallel`.
+            Runs every cat in this process if None or 0.
+        :keyword sources: source code (str) or bundle (bytes) of paths, used instead of files.
+            Mouse info of module in sources is looked up in sources only.
+        :keyword max_instructions: instructions every cat may run in total, unlimited if None.
+            Counted at loop back-edges by length of loop, so it's close to, not exactly, instructions run.
+        :keyword max_tape: cells tape of each cat may grow to, unlimited if None. see :attr:`Memory.limit`
+        :keyword timeout: seconds program may run, unlimited if None. Waiting for standard input is not stopped.
+        :keyword compiled: memo of programs shared by interpreters, :attr:`NyanInterpreter.compiled` if None.
+            see :meth:`NyanInterpreter.init`
+        :raises ValueError: if backend is unknown, or a limit is not positive
+        """
+
+    def interpreter(self, path) -> type:
+        """
+        :param Path path:
+        :return: interpreter class for path, :class:`NyanPythonInterpreter` for python backend.
+        """
+
+    def create_nyan(self, path, subprocess=False, lazy=False) -> NyanInterpreter | NyanBinaryInterpreter:
+        """
+        Create and initialize interpreter for given path with options of engine.
+        Interpreter of path in `sources` is never cached.
+        :param Path path:
+        :param bool subprocess:
+        :param bool lazy: leave source uninitialized until :meth:`load`. Binaries are always initialized,
+            as their mouse info is in them.
+        :raises FileNotFoundError: if lazy and path doesn't exist, so missing modules are still found up front.
+        """
+
+    def load(self, nyan) -> NyanInterpreter | NyanBinaryInterpreter:
+        """
+        Initialize interpreter created lazily, which is done when engine first switches to it.
+        :return: nyan
+        """
+
+    def load_modules(self):
+        """
+        :meth:`load` every interpreter, for uses which need every program, e.g. building or cloning.
+        """
+
+    def clone(self, io=None) -> NyanEngine:
+        """
+        Copy engine for another run, cloning every interpreter and linking them with new communicators.
+        Modules are loaded first, so clones share their programs.
+        :param NyanIO | None io: I/O layer of clone, same as this engine if None.
+        """
+
+    def optimization_report(self) -> list[str]:
+        """
+        :return: optimization report of every interpreter, see :meth:`NyanInterpreter.optimization_report`
+        """
+
+    def analysis_report(self) -> list[str]:
+        """
+        :return: analysis report of every interpreter, printed by ``nyan build --analyze``
+        """
+
+    def read_mouse(self, path: str | Path) -> collections.Generator[tuple[int, int, str], None, None]:
+        """
+        Read mouse information from given path
+        :param path:
+        :raises SyntaxError: when invalid mouse info detected
+        """
+
+    def mouse_exists(self, nyan: NyanInterpreter | None = None) -> str:
+        """
+        :param nyan:
+        :return: mouse path if path exist, blank string ("") if not exist.
+        """
+
+    def find_mouse_info(self, nyan: NyanInterpreter | None = None) -> None:
+        """
+        Create/Register all child/parent interpreter relationsheep with communicator\n
+        Only mouse info is read, and modules are parsed when first switched to.
+        Modules linked again are linked without walking their mouse info again.
+        :param nyan:
+        :raises FileNotFoundError: if a module doesn't exist
+        """
+
+    def read_binary_mouse(self, data) -> collections.Generator[tuple[int, int, str], None, None]:
+        """
+        Read binary mouse information from given data, as written by :meth:`NyanBuilder.header`
+        :param bytes data:
+        """
+
+    def binary_mouse_exists(self, data) -> bool:
+        """
+        :param bytes data:
+        :return: True if mouse data exist, False if not exist.
+        """
+
+    def find_binary_mouse_info(self, nyan: NyanInterpreter | NyanBinaryInterpreter | None = None) -> None:
+        """
+        Create/Register all child/parent interpreter relationsheep with communicator
+        :param nyan:
+        """
+
+    def find_bundle_info(self, nyan: NyanBinaryInterpreter) -> None:
+        """
+        Create interpreter of every module in bundle of nyan, and register relationsheep of link table.
+        :param nyan: interpreter loaded from bundle
+        """
+
+    def run_parallel(self):
+        """
+        Run every cat at the same time, spread over `workers` processes.\n
+        A sub cat starts when it's sent a value or another cat waits to read from it, and it runs again while
+        values sent during its run are left unread. `;` waits for receiver to give way once it filled a channel of
+        `channel_size`, and `:` waits for a value, so with channels of 1 cats take turns like in :meth:`run` and
+        output is the same. Larger channels let cats run at the same time, and output of cats may interleave
+        otherwise. Program ends when root halts and every other cat is idle or waiting to read, so a cat which never
+        stops keeps program running.\n
+        Output of a cat is flushed before each `;` and `:`, so it is ordered only with output of cats it talks to.
+        Values go straight between workers, and this process only counts them, starts cats and writes output. Still
+        every message takes a hop between processes, so this only pays off when cats compute a lot between messages.
+        Cats passing a value back and forth, like ``benchmarks/pingpong``, run many times slower than in one process;
+        ``nyan bench`` reports such workloads.\n
+        Modules are loaded here, and workers run the programs compiled here, so sources given in memory are run,
+        and files changed since engine was made are not.
+
+        Workers report fuel spent by their cats, so cats may run up to `limit_fuel` instructions past
+        `max_instructions`. Timeout is checked here, and error tells which cat was running but not where.
+        :raises RuntimeError: if any cat raises an error
+        :raises LimitExceeded: if a limit is exceeded
+        """
+
+    def limited(self) -> bool:
+        """
+        :return: True if any limit is set
+        """
+
+    def limit(self, fuel=None):
+        """
+        Start limits of a run, giving fuel to every cat and setting limit of their tapes.
+
+        Limits are checked in **spend** only when fuel of a cat runs out, every `limit_fuel` instructions,
+        and on tape growth, so instructions run as fast as without limits.
+        :param int | None fuel: fuel of every cat, `limit_fuel` if None and limits are set.
+        """
+
+    def unlimit(self):
+        """
+        Take fuel of every cat back after a run.
+        """
+
+    def spend(self, nyan):
+        """
+        Count fuel spent by nyan which gave way with ``Signals.KEEP_GOING``, and check limits.
+        :param NyanInterpreter nyan:
+        :raises LimitExceeded: if instructions or time are over limit
+        """
+
+    def follow(self, nyan, signal, parent_mode, mouse_pointer) -> bool:
+        """
+        Switch interpreters for signal returned by nyan.
+        :return: True if program ended.
+        """
+
+    def snapshot(self) -> bytes:
+        """
+        Save state of every cat, `nodetree`, values left in communicators and buffered I/O, see :class:`Snapshot`.\n
+        Take it while engine is not running, e.g. after :meth:`run_for`. Engine restoring it resumes exactly,
+        and many engines can restore one snapshot to fork runs from it.\n
+        >>> engine = NyanEngine("main.nyan")
+        >>> engine.run_for(10 ** 6)
+        >>> data = engine.snapshot()
+        >>> Program(Path("main.nyan")).run(b"input", snapshot=data)
+        :raises ValueError: if a cat runs with python backend, see :meth:`NyanPythonInterpreter.dump_state`
+        """
+
+    def restore(self, data):
+        """
+        Load snapshot made by engine of same program, compiled with same options.
+        Modules which were never loaded when snapshot was taken are not compared, as they are in their first state.
+        :param bytes data:
+        :raises ValueError: if snapshot is of another program
+        """
+
+    def run(self):
+        """
+        Run root interpreter, and follow signals. Runs :meth:`run_parallel` if `workers` is set.
+        :raises LimitExceeded: if a limit is exceeded, located at cat and position which exceeded it
+        :return:
+        """
+
+    def run_for(self, instructions=None) -> bool:
+        """
+        Run like **run**, pausing once about given instructions are run. Calling it or **run** again resumes.
+        :param int | None instructions: instructions to run, counted like `max_instructions`. Unlimited if None.
+        :return: True if program ended, False if paused.
+        """
+
+    async def run_async(self, fuel=1 << 16):
+        """
+        Run like **run** without blocking event loop.
+        Gives way to other tasks every fuel instructions, on every module switch, and while waiting for input
+        of :class:`AsyncNyanIO`.\n
+        >>> engine = NyanEngine("main.nyan", io=AsyncNyanIO(reader, writer))
+        >>> await engine.run_async()
+        :param int fuel: instructions run at once, see :attr:`NyanInterpreter.fuel`
+        :raises LimitExceeded: if a limit is exceeded
+        """
+
+
 class NyanBuilder(NyanEngine):
+    """
+    Engine which builds root program and every linked module into one ``.nya`` file.\n
+    Version 2 writes a :class:`Bundle`, version 1 writes legacy format of root program only.
+    """
     keywords: dict[str, bytes]
     compress_target: bytes
     program: list[bytes]
+    version: int
 
-    def __init__(self, root_name, *, debug=False):
+    def __init__(self, root_name, *, debug=False, optimize=False, version=Bundle.version):
         """
         :param str root_name:
         :keyword bool debug:
+        :keyword bool optimize: optimize instructions before building, see :class:`ProgramOptimizer`
+        :keyword int version: format version, 1 or 2
+        :raises ValueError: if version is not supported
         """
 
     @staticmethod
@@ -481,14 +2086,394 @@ class NyanBuilder(NyanEngine):
         :return:
         """
 
-    def find_mouse_info(self, nyan: NyanInterpreter | None = None) -> None:
+    def module_name(self, nyan) -> str:
         """
-        Parse mouse info, add infos into program.
-        :param nyan:
+        :param NyanInterpreter nyan:
+        :return: path of module relative to root program
+        """
+
+    def header(self) -> list[bytes]:
+        """
+        Mouse info of root program in version 1 format: for each link ``pos``, 4 bytes and module name.\n
+        Earlier builds repeated ``pos`` there, which reads as target position ``pos >> 8``. Links with another target
+        position write ``1`` and the position instead, so builds of other programs stay the same.
+        """
+
+    def encode(self, nyan) -> tuple[array, array]:
+        """
+        Encode compiled instructions of module into instruction words and constants of :class:`Bundle`.
+        :param NyanInterpreter nyan:
+        :raises SyntaxError: when keyword cannot be built
+        :raises ValueError: when module is binary
+        """
+
+    def build(self, output: str | None = None) -> Path:
+        """
+        Build a binary file of `self.version`.
+        :param output: output path, ``<stem>.nya`` of current directory if None.
+        :raises ValueError: if output directory doesn't exist or file extension is not ``.nya``
+        :return: output path
+        """
+
+    def build_v1(self, out) -> Path:
+        """
+        Build root program based on keyword-bytes dictionary.
+        :param Path out:
+        """
+
+
+class ProgramResult:
+    """
+    Result of :meth:`Program.run`.
+    """
+    output: bytes
+    memory: Memory
+    pointer: int
+
+    def __init__(self, output, memory, pointer):
+        """
+        :param bytes output: everything written to output, encoded in text mode.
+        :param Memory memory: memory of root cat when it ended
+        :param int pointer: pointer of root cat when it ended
+        """
+
+
+class Program:
+    """
+    Program compiled once with its modules, which can be run many times without files or standard streams.\n
+    Every run clones interpreters of `engine`, so only memory and cursors are made for each run.\n
+    >>> program = Program('냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥냥.')
+    >>> program.run().output
+    b'1\n\n'
+    """
+    engine: NyanEngine
+    mode: str
+    encoding: str
+
+    def __init__(
+        self, source, *, name="main.nyan", modules=None, tape=None, optimize=False, backend="interpreter",
+        cache=False, channel_size=1, mode="text", encoding="utf-8", max_instructions=None, max_tape=None, timeout=None
+    ):
+        """
+        :param str | bytes | Path source: path of program, source code, or bundle built by :class:`NyanBuilder`.
+            Bytes which are not a bundle are decoded as UTF-8 source code.
+        :keyword str name: file name of source code in memory, which locates its modules.
+        :keyword dict[str, str | bytes] modules: source code of modules and mouse info, by path relative to name.
+            e.g. ``{"main.mouse": "0 -> 0: child.nyan", "child.nyan": "..."}``
+        :keyword tape: see :class:`NyanEngine`
+        :keyword optimize: see :class:`NyanEngine`
+        :keyword backend: see :class:`NyanEngine`
+        :keyword cache: see :class:`NyanEngine`, only used for program read from path.
+        :keyword channel_size: see :class:`NyanEngine`
+        :keyword mode: mode of :class:`NyanIO` of each run
+        :keyword encoding: encoding of input and output in text mode
+        :keyword max_instructions: see :class:`NyanEngine`, limits each run
+        :keyword max_tape: see :class:`NyanEngine`
+        :keyword timeout: see :class:`NyanEngine`, limits each run
+        :raises ValueError: if name of source code is not ``.nyan``
+        """
+
+    def __setattr__(self, name, value):
+        """
+        :raises AttributeError: always, as program is immutable.
+        """
+
+    def run(self, input=b"", snapshot=None) -> ProgramResult:
+        """
+        Run program with given input.
+        :param bytes | str input: input of `,`, encoded with `encoding` if str.
+        :param bytes | None snapshot: snapshot to resume from, see :meth:`NyanEngine.snapshot`
+        """
+
+
+class BatchResult:
+    """
+    Result of running :class:`NyanBatch` program on one input file.
+    """
+    input: Path
+    output: bytes | None
+    seconds: float
+    error: str | None
+
+    def __init__(self, input, output=None, seconds=0.0, error=None):
+        """
+        :param Path input: path of input file
+        :param bytes | None output: output of program, None if it failed.
+        :param float seconds: time taken to read input and run program
+        :param str | None error: error which made it fail
+        """
+
+    def record(self) -> dict:
+        """
+        :return: result as JSON object. Output is decoded as UTF-8 with ``surrogateescape``,
+            so undecodable bytes are kept.
+        """
+
+
+class NyanBatch:
+    """
+    Runs one program over many input files with a pool of worker processes.\n
+    Program is compiled once and cached, and each worker loads it once as :class:`Program`,
+    so every input costs only a run.\n
+    >>> for result in NyanBatch("main.nyan", workers=4).run(Path("inputs").iterdir()):
+    ...     print(result.input, result.seconds, result.error)
+    """
+    program: Program | None
+    """Program of current worker process."""
+    filename: Path
+    workers: int
+    chunksize: int
+    options: dict
+
+    def __init__(self, filename, *, workers=None, chunksize=16, **options):
+        """
+        :param str | Path filename: path of program
+        :keyword workers: number of worker processes, CPU count if None. Runs in this process if 1 or less.
+        :keyword chunksize: inputs sent to a worker at once
+        :param options: options of :class:`Program`
+        """
+
+    @classmethod
+    def init_worker(cls, filename, options):
+        """
+        Load program in worker process.
+        """
+
+    @classmethod
+    def execute(cls, input) -> BatchResult:
+        """
+        Run program of worker process with content of input file.
+        :param Path input:
+        """
+
+    def run(self, inputs) -> collections.Generator[BatchResult, None, None]:
+        """
+        Run program over inputs, yielding results as soon as they are done, not in order of inputs.
+        :param collections.Iterable[Path] inputs: paths of input files
+        """
+
+    def write(self, inputs, output, root=None) -> collections.Generator[BatchResult, None, None]:
+        """
+        Run program over inputs like **run**, and write results while yielding them.\n
+        If output ends with ``.jsonl``, each result is written as a line of :meth:`BatchResult.record`.
+        Otherwise, output of each input is written to ``<input name>.out`` in output directory, under the
+        directories of input below `root`.
+        :param collections.Iterable[Path] inputs: paths of input files
+        :param str | Path output: JSONL file or directory
+        :param str | Path | None root: directory holding inputs, deepest directory holding all of them if None
+        """
+
+
+class Profile:
+    """
+    Execution counts and time of one cat, recorded by :class:`NyanProfiler`.\n
+    Counts are kept per instruction for text programs and bundles, and per byte for version 1 binary files.
+    """
+    nyan: NyanInterpreter | NyanBinaryInterpreter
+    counts: list[int]
+    seconds: float
+
+    def __init__(self, nyan):
+        """
+        :param nyan: initialized interpreter
+        """
+
+    def instructions(self) -> collections.Generator[tuple[int, int, int | None], None, None]:
+        """
+        :return: index, opcode and index of matching loop end for loop starts, for every executed instruction
+            and every loop start.
+        """
+
+    def position(self, index) -> tuple[int, int] | None:
+        """
+        :return: line and column in source code of instruction, None for binary programs.
+        """
+
+    def where(self, index) -> str:
+        """
+        :return: ``line:col`` of instruction, or ``@index`` for binary programs.
+        """
+
+    def data(self) -> dict:
+        """
+        :return: counts per opcode, per position and per loop, sorted from the hottest, and time of cat.
+            Loop iterations are counts of its `-`.
+        """
+
+
+class ProfiledInterpreter:
+    """
+    Mixin of interpreter classes of :class:`NyanProfiler`.\n
+    Overriding `start_of_loop` makes interpreter run instruction by instruction through hooks,
+    so plain interpreters keep their fast loops and pay nothing for profiling.
+    """
+    profile: Profile | None
+
+    def start_of_loop(self):
+        """
+        Count instruction at cursor.
+        """
+
+    def run(self) -> tuple[int, bool, int]:
+        """
+        Run like interpreter, adding time taken to profile.
+        """
+
+
+class NyanProfiler(NyanEngine):
+    """
+    Engine which records :class:`Profile` of every cat it runs.\n
+    Always uses interpreter backend, as generated Python code has no hooks.\n
+    >>> profiler = NyanProfiler("main.nyan")
+    >>> profiler.run()
+    >>> print("\\n".join(profiler.report()))
+    """
+    classes: dict[type, type]
+    """Profiled subclass of each interpreter class."""
+
+    def __init__(self, root_name, **options):
+        """
+        :param root_name: see :class:`NyanEngine`
+        :param options: options of :class:`NyanEngine`, except backend and workers.
+        """
+
+    def interpreter(self, path) -> type:
+        """
+        :return: profiled subclass of interpreter class of :class:`NyanEngine`.
+        """
+
+    def profiles(self) -> list[Profile]:
+        """
+        :return: profile of every cat which ran.
+        """
+
+    def data(self) -> dict:
+        """
+        :return: JSON object of :meth:`Profile.data` of every cat.
+        """
+
+    def report(self, top=10) -> list[str]:
+        """
+        :param int top: number of hottest positions and loops to show for each cat
+        :return: report lines, cats sorted by time.
+        """
+
+
+class DebuggedInterpreter:
+    """
+    Mixin of interpreter classes of :class:`NyanDebugger`.\n
+    Like :class:`ProfiledInterpreter`, it runs instruction by instruction through hooks,
+    so only debugged runs pay for checking breakpoints and watchpoints.
+    """
+    debugger: NyanDebugger | None
+    breakpoints: set[int]
+    """Cursors to stop at."""
+    watchpoints: dict[int, int]
+    """Last seen value of each watched cell."""
+
+    def start_of_loop(self):
+        """
+        Let debugger check instruction at cursor, if anything can stop there.
+        """
+
+
+class NyanDebugger(NyanEngine):
+    """
+    Engine which stops at breakpoints, watchpoints and steps, and reads commands at each stop.\n
+    Stops before the first instruction, unless `stepping` is set to None before running.
+    Stepping follows module switches, so it crosses module boundaries.\n
+    >>> debugger = NyanDebugger("main.nyan", commands=["b 3:1", "c", "p", "c"])
+    >>> debugger.run()
+    """
+    classes: dict[type, type]
+    """Debugged subclass of each interpreter class."""
+    usage: tuple[str, ...]
+    """Help lines of commands."""
+    commands: collections.Iterator[str] | None
+    output: typing.TextIO | None
+    stepping: bool | NyanInterpreter | None
+    """True to stop at next instruction of any cat, a cat to stop at its next instruction, None to not step."""
+
+    def __init__(self, root_name, *, commands=None, output=None, **options):
+        """
+        :param root_name: see :class:`NyanEngine`
+        :param collections.Iterable[str] | None commands: commands to run at stops, read from standard input if None.
+            When commands run out, program runs to its end.
+        :param typing.TextIO | None output: stream of stops and command results, standard error if None.
+        :param options: options of :class:`NyanEngine`, except backend and workers.
+        """
+
+    def interpreter(self, path) -> type:
+        """
+        :return: debugged subclass of interpreter class of :class:`NyanEngine`.
+        """
+
+    def resolve(self, spec, nyan=None) -> tuple[NyanInterpreter, int]:
+        """
+        Find instruction of location.\n
+        Location is ``[file:]line:col``, resolved to first instruction at or after it,
+        or ``[file]@index``, for binaries which have no source map.
+        :param str spec: location
+        :param NyanInterpreter | None nyan: cat of location without file, root if None.
+        :return: cat and cursor
+        :raise ValueError: if location is invalid, or has no instruction.
+        """
+
+    def add_breakpoint(self, spec, nyan=None) -> tuple[NyanInterpreter, int]:
+        """
+        :return: cat and cursor of breakpoint, see :meth:`resolve`.
+        """
+
+    def remove_breakpoint(self, spec, nyan=None) -> tuple[NyanInterpreter, int]:
+        """
+        :return: cat and cursor of removed breakpoint, see :meth:`resolve`.
+        """
+
+    def watch(self, address, nyan=None):
+        """
+        Stop when cell at address changes.
+        :param int address:
+        :param NyanInterpreter | None nyan: cat of cell, root if None.
+        """
+
+    def unwatch(self, address, nyan=None):
+        """
+        :param int address:
+        :param NyanInterpreter | None nyan: cat of cell, root if None.
+        """
+
+    def where(self, nyan, cursor=None) -> str:
+        """
+        :return: file, position, cursor and instruction, of current cursor if None.
+        """
+
+    def check(self, nyan):
+        """
+        Stop if stepping, at breakpoint, or a watched cell has changed.
+        """
+
+    def stop(self, nyan, reason):
+        """
+        Flush output of program, show location and read commands until program should go on.
+        """
+
+    def cells(self, nyan, start=None, end=None) -> str:
+        """
+        :return: cells from start to end, 8 cells around pointer by default, pointer marked with ``*``.
+        """
+
+    def info(self, nyan) -> list[str]:
+        """
+        :return: pointers, cats being switched through, channels to linked cats, breakpoints and watchpoints.
+        """
+
+    def source(self, nyan) -> list[str]:
+        """
+        :return: source lines around cursor with column marked, empty if cat has no source.
         """
 
-    def build(self, output: str | None = None) -> None:
+    def prompt(self, nyan):
         """
-        Build a binary file based on keyword-bytes dictionary.
-        :param output:
+        Read and run commands until one of step, next or continue.
+        :raise SystemExit: on quit.
         """
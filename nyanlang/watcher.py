@@ -0,0 +1,142 @@
+import hashlib
+import os
+from pathlib import Path
+import sys
+import time
+
+from .nyan import NyanEngine
+
+
+class FileWatcher:
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    mask = 0x3CE
+
+    def __init__(self, interval=0.5, settle=0.05):
+        self.interval = interval
+        self.settle = settle
+        self.libc = None
+
+    @staticmethod
+    def stamp(path):
+        # a file rewritten at the same size within one tick of mtime is told apart by its content
+        try:
+            stat = os.stat(path)
+            with open(path, "rb") as _f:
+                digest = hashlib.blake2b(_f.read(), digest_size=8).digest()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, digest
+
+    def stamps(self, paths):
+        return {path: self.stamp(path) for path in paths}
+
+    def changed(self, stamps):
+        return {path for path, stamp in stamps.items() if self.stamp(path) != stamp}
+
+    def open(self, paths):
+        # directories are watched instead of files, as editors often replace files on save
+        if self.libc is None:
+            import ctypes
+
+            try:
+                self.libc = ctypes.CDLL(None, use_errno=True)
+                self.libc.inotify_init1
+            except (OSError, TypeError, AttributeError):
+                self.libc = False
+        if not self.libc:
+            return None, False
+        fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None, False
+        complete = True
+        for directory in {Path(path).parent for path in paths}:
+            if self.libc.inotify_add_watch(fd, os.fsencode(directory), self.mask) < 0:
+                complete = False
+        return fd, complete
+
+    def wait(self, stamps):
+        import select
+
+        fd, complete = self.open(stamps)
+        try:
+            while not (changed := self.changed(stamps)):
+                if fd is None:
+                    time.sleep(self.interval)
+                    continue
+                # files of directories which can't be watched are polled
+                if select.select([fd], [], [], None if complete else self.interval)[0]:
+                    try:
+                        while os.read(fd, 65536):
+                            pass
+                    except BlockingIOError:
+                        pass
+        finally:
+            if fd is not None:
+                os.close(fd)
+        # editors write in bursts, which are run once
+        time.sleep(self.settle)
+        return changed | self.changed(stamps)
+
+
+class NyanWatcher:
+    def __init__(self, root_name, *, interval=0.5, output=None, report=False, **options):
+        self.root_name = Path(root_name).absolute()
+        self.options = options
+        self.files = FileWatcher(interval)
+        self.output = output if output is not None else sys.stderr
+        self.report = report
+        self.paths = {self.root_name, self.root_name.with_suffix(".mouse")}
+        self.runs = 0
+        self.compiled = {}
+
+    def write(self, line):
+        print(f"[watch] {line}", file=self.output, flush=True)
+
+    def graph(self, engine):
+        # mouse files are watched even if missing, so linking a module is noticed
+        paths = set()
+        for nyan in engine.nyans:
+            paths.add(nyan.filename)
+            if nyan.filename.suffix != ".nya":
+                paths.add(nyan.filename.with_suffix(".mouse"))
+        return paths
+
+    def forget(self, paths):
+        # programs are kept while their file's mtime and size are, which may outlive a change of it
+        paths = set(paths)
+        for key in [key for key in self.compiled if key[2] in paths]:
+            del self.compiled[key]
+
+    def run_once(self):
+        start = time.perf_counter()
+        self.runs += 1
+        try:
+            engine = NyanEngine(self.root_name, compiled=self.compiled, **self.options)
+        except Exception as error:
+            # broken file is watched with the rest of last graph, until it's fixed
+            self.write(f"{type(error).__name__}: {error}")
+            return self.files.stamps(self.paths)
+        self.paths = self.graph(engine)
+        self.forget(path for path in {key[2] for key in self.compiled} if path not in self.paths)
+        stamps = self.files.stamps(self.paths)
+        try:
+            if self.report:
+                for line in engine.optimization_report():
+                    self.write(line)
+            engine.run()
+        except Exception as error:
+            self.write(f"{type(error).__name__}: {error}")
+        finally:
+            engine.io.flush()
+        self.write(f"run {self.runs} took {time.perf_counter() - start:.3f}s, watching {len(self.paths)} files")
+        return stamps
+
+    def run(self, runs=None):
+        while True:
+            stamps = self.run_once()
+            if runs is not None and self.runs >= runs:
+                return
+            changed = self.files.wait(stamps)
+            self.forget(changed)
+            names = sorted(os.path.relpath(path, self.root_name.parent) for path in changed)
+            self.write(f"changed {', '.join(names)}")
@@ -0,0 +1,123 @@
+import collections
+from pathlib import Path
+import typing
+
+from .nyan import NyanEngine
+
+
+class FileWatcher:
+    """
+    Waits for files to change, which is checked by modification time, size and content.\n
+    On Linux, directories of files are watched with inotify, so waiting takes no time until something is written.
+    Elsewhere, and for directories which can't be watched, files are polled every `interval` seconds.
+    """
+    mask: int
+    """inotify events of files being written, replaced, created or deleted."""
+    interval: float
+    settle: float
+    """Seconds to wait after a change, so files saved together are seen at once."""
+    libc: typing.Any
+    """C library with inotify, False if there is none, None before it's looked for."""
+
+    def __init__(self, interval=0.5, settle=0.05):
+        """
+        :param float interval: seconds between polls
+        :param float settle: seconds to wait after a change
+        """
+
+    @staticmethod
+    def stamp(path) -> tuple[int, int, bytes] | None:
+        """
+        :return: modification time in nanoseconds, size and digest of file, None if it doesn't exist.
+            Digest tells apart a file rewritten at the same size within one tick of modification time.
+        """
+
+    def stamps(self, paths) -> dict[Path, tuple[int, int, bytes] | None]:
+        """
+        :param collections.Iterable[Path] paths:
+        :return: :meth:`stamp` of each file
+        """
+
+    def changed(self, stamps) -> set[Path]:
+        """
+        :param dict stamps: stamps made by :meth:`stamps`
+        :return: files whose stamp isn't the same anymore
+        """
+
+    def open(self, paths) -> tuple[int | None, bool]:
+        """
+        Watch directories of paths with inotify.
+        :return: inotify file descriptor, None if inotify isn't available, and True if every directory is watched.
+        """
+
+    def wait(self, stamps) -> set[Path]:
+        """
+        Block until any file of stamps changes. Files changed since stamps were made return at once.
+        :param dict stamps: stamps made by :meth:`stamps`
+        :return: changed files
+        """
+
+
+class NyanWatcher:
+    """
+    ``nyan run --watch``. Runs program, and runs it again whenever a ``.nyan``, ``.nya`` or ``.mouse`` file of
+    its modules changes, until interrupted.\n
+    Each run makes a new :class:`NyanEngine`, which links modules again from mouse files. Programs of unchanged
+    files are shared from `compiled` of watcher, so only changed files are parsed again.\n
+    Errors of a run are written to `output`, and files are watched until they are fixed.
+    """
+    root_name: Path
+    options: dict
+    """Options of :class:`NyanEngine`. `io` of them is used by every run."""
+    files: FileWatcher
+    output: typing.TextIO
+    report: bool
+    """Write optimization report before each run."""
+    paths: set[Path]
+    """Files of last linked modules, with their mouse files even if missing."""
+    runs: int
+    compiled: dict[tuple, dict]
+    """
+    Programs of linked modules, given to every engine instead of :attr:`NyanInterpreter.compiled`,
+    so programs of a graph of any size are kept. Programs of changed files and unlinked modules are dropped.
+    """
+
+    def __init__(self, root_name, *, interval=0.5, output=None, report=False, **options):
+        """
+        :param str | Path root_name: root program
+        :param float interval: seconds between polls of :class:`FileWatcher`
+        :param typing.TextIO | None output: stream of status lines, standard error if None.
+        :param bool report: write optimization report before each run
+        :keyword options: options of :class:`NyanEngine`
+        """
+
+    def write(self, line):
+        """
+        Write status line, prefixed by ``[watch]``.
+        :param str line:
+        """
+
+    def graph(self, engine) -> set[Path]:
+        """
+        :param NyanEngine engine:
+        :return: program and mouse file of every module of engine
+        """
+
+    def forget(self, paths):
+        """
+        Drop programs of paths from `compiled`. Programs are keyed by modification time and size of file,
+        which a change may keep.
+        :param collections.Iterable[Path] paths:
+        """
+
+    def run_once(self) -> dict[Path, tuple[int, int, bytes] | None]:
+        """
+        Link modules, and run program once.
+        :return: stamps of files, made before program ran
+        """
+
+    def run(self, runs=None):
+        """
+        Run program, and run it again on every change.
+        :param int | None runs: runs to stop after, never stops if None.
+        """
@@ -0,0 +1,29 @@
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from nyanlang.nyan import NyanEngine, NyanIO
+
+ROOT = Path(__file__).absolute().parent.parent
+
+
+@pytest.fixture
+def examples():
+    return ROOT / "examples"
+
+
+@pytest.fixture
+def benchmarks():
+    return ROOT / "benchmarks"
+
+
+@pytest.fixture
+def run():
+    # output of a whole run of file, which is never cached
+    def run(filename, input=b"", **options):
+        output = BytesIO()
+        NyanEngine(filename, cache=False, io=NyanIO(BytesIO(input), output, mode="bytes"), **options).run()
+        return output.getvalue()
+
+    return run
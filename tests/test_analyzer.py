@@ -0,0 +1,105 @@
+import sys
+from io import BytesIO
+
+import pytest
+
+from nyanlang import main
+from nyanlang.nyan import ByteMemory, Memory, NyanEngine, NyanIO, PagedMemory, ProgramAnalysis
+
+
+def engine(tmp_path, source, **options):
+    path = tmp_path / "main.nyan"
+    path.write_text(source, encoding="utf-8")
+    return NyanEngine(path, cache=False, compiled={}, io=NyanIO(BytesIO(), BytesIO(), mode="bytes"), **options)
+
+
+def analyze(tmp_path, source, **options):
+    return engine(tmp_path, source, **options).root.analysis
+
+
+@pytest.mark.parametrize("source, low, high", [
+    ("", 0, 0),
+    ("??냥!냥.", 0, 2),
+    ("!!냥?냥?????.", -2, 4),
+    # balanced loops move pointer back where they started
+    ("냥냥~?냥냥!냐-?.", 0, 1),
+])
+def test_bounds(tmp_path, source, low, high):
+    analysis = analyze(tmp_path, source)
+    assert (analysis.low, analysis.high, analysis.balanced) == (low, high, True)
+    assert analysis.size == high - low + 1
+
+
+@pytest.mark.parametrize("source, options", [
+    # loops moving pointer reach cells only known when running
+    ("냥~?냥-", {}),
+    ("냥?냥?냥~!-", {"optimize": True}),
+])
+def test_unbounded(tmp_path, source, options):
+    analysis = analyze(tmp_path, source, **options)
+    assert not analysis.bounded and not analysis.balanced
+    assert analysis.tape(Memory) is Memory
+
+
+def test_uses(tmp_path):
+    analysis = analyze(tmp_path, "냥.")
+    assert (analysis.reads_input, analysis.modules, analysis.calls) == (False, False, False)
+    assert analysis.values == (0, 1)
+    analysis = analyze(tmp_path, ",.")
+    assert analysis.reads_input and analysis.values == ProgramAnalysis.input_range
+    assert analyze(tmp_path, "냥;").modules
+    # values added in loops aren't bounded
+    assert analyze(tmp_path, "냥~냥-").values == (0, None)
+
+
+@pytest.mark.parametrize("tape, base", [("int", Memory), ("byte", ByteMemory)])
+def test_fixed_tape(tmp_path, run, tape, base):
+    nyan = engine(tmp_path, "!!냥?냥?????냥.", tape=tape)
+    memory = nyan.root.memory
+    assert isinstance(memory, base) and type(memory) is not base
+    assert len(memory.cells) == 7
+    nyan.run()
+    assert nyan.io.stdout.getvalue() == run(tmp_path / "main.nyan", tape=tape) == b"\x01\n\n"
+    # snapshots name tape chosen, not tape made for its bounds
+    assert nyan.root.dump_state()[4] == base.__name__
+
+
+@pytest.mark.parametrize("source, options, tape", [
+    # unbounded, beyond limit of tape, and paged tapes keep tape chosen
+    ("냥~?냥-", {}, Memory),
+    ("?" * 20 + "냥.", {"max_tape": 10}, Memory),
+    ("??냥.", {"tape": "paged"}, PagedMemory),
+])
+def test_general_tape(tmp_path, source, options, tape):
+    assert type(engine(tmp_path, source, **options).root.memory) is tape
+
+
+def test_too_large(tmp_path):
+    source = "?" * ProgramAnalysis.max_size + "냥."
+    assert type(engine(tmp_path, source, optimize=True).root.memory) is Memory
+
+
+def test_cache(tmp_path):
+    path = tmp_path / "main.nyan"
+    path.write_text("??냥.", encoding="utf-8")
+    for _ in range(2):
+        # second engine loads analysis from disk cache
+        nyan = NyanEngine(path, cache=tmp_path / "cache", compiled={})
+        assert (nyan.root.analysis.low, nyan.root.analysis.high) == (0, 2)
+        assert len(nyan.root.memory.cells) == 3
+
+
+def test_report(tmp_path):
+    assert engine(tmp_path, "??,.").analysis_report() == [
+        f"{tmp_path / 'main.nyan'}: tape 0..2 (3 cells), FixedMemory tape",
+        f"{tmp_path / 'main.nyan'}: loops balanced, values 0..1114111, uses input",
+    ]
+
+
+def test_cli(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "main.nyan"
+    path.write_text("냥;", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["nyan", "build", str(path), "-a", "-o", str(tmp_path / "main.nya")])
+    main()
+    assert capsys.readouterr().err.splitlines()[1].endswith("values 0..1, uses modules")
+    assert (tmp_path / "main.nya").exists()
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from nyanlang.nyan import AsyncNyanIO, NyanEngine
+
+BACKENDS = [{}, {"optimize": True}, {"backend": "python"}]
+
+
+class Writer:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def engine(filename, reader, writer, mode="bytes", **options):
+    return NyanEngine(filename, cache=False, io=AsyncNyanIO(reader, writer, mode=mode), **options)
+
+
+def reader(*chunks):
+    stream = asyncio.StreamReader()
+    for chunk in chunks:
+        stream.feed_data(chunk)
+    stream.feed_eof()
+    return stream
+
+
+@pytest.mark.parametrize("options", BACKENDS)
+def test_output(run, examples, options):
+    path = examples / "hello name" / "main.nyan"
+
+    async def main():
+        writer = Writer()
+        await engine(path, reader(b"abc\n"), writer, **options).run_async()
+        return bytes(writer.data)
+
+    assert asyncio.run(main()) == run(path, b"abc\n", **options)
+
+
+def test_waits_for_input(examples):
+    async def main():
+        stream = asyncio.StreamReader()
+        writer = Writer()
+        task = asyncio.create_task(engine(examples / "hello name" / "main.nyan", stream, writer).run_async())
+        for _ in range(20):
+            await asyncio.sleep(0)
+        # program waits for input without blocking loop, with output before it written
+        assert not task.done()
+        assert writer.data == b"hello,"
+        stream.feed_data(b"abc\n")
+        stream.feed_eof()
+        await task
+        return bytes(writer.data)
+
+    assert asyncio.run(main()) == b"hello,abc\n\x00\n\n"
+
+
+def test_shared_loop(run, tmp_path):
+    # cells counted down 100 times 100
+    path = tmp_path / "count.nyan"
+    path.write_text("냥" * 100 + "~?" + "냥" * 100 + "~냐-!냐-?뀨", encoding="utf-8")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    async def program():
+        writer = Writer()
+        await engine(path, None, writer).run_async(fuel=100)
+        return bytes(writer.data)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        outputs = await asyncio.gather(program(), program())
+        task.cancel()
+        return outputs
+
+    # programs give way to each other and to other tasks while running
+    assert asyncio.run(main()) == [run(path)] * 2
+    assert ticks > 10
+
+
+def test_decode(tmp_path):
+    path = tmp_path / "echo.nyan"
+    path.write_text(",.,.", encoding="utf-8")
+
+    async def main():
+        writer = Writer()
+        data = "냥냐".encode("utf-8")
+        # characters split between chunks of stream are decoded whole
+        await engine(path, reader(data[:2], data[2:4], data[4:]), writer, mode="text").run_async()
+        return bytes(writer.data)
+
+    assert asyncio.run(main()) == "냥냐\n\n".encode("utf-8")
@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from nyanlang.nyan import NyanBatch
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / "inputs" / f"{name}.txt"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(f"{name * 3}\n".encode())
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch(examples, tmp_path, inputs, workers):
+    batch = NyanBatch(examples / "hello name" / "main.nyan", workers=workers, cache=tmp_path / "cache")
+    results = {Path(result.input).name: result for result in batch.run(inputs)}
+    assert {name: result.output for name, result in results.items()} == {
+        "a.txt": b"hello,aaa\n\x00\n\n", "b.txt": b"hello,bbb\n\x00\n\n", "c.txt": b"hello,ccc\n\x00\n\n"
+    }
+    assert all(result.error is None for result in results.values())
+
+
+def test_batch_write(examples, tmp_path, inputs):
+    batch = NyanBatch(examples / "hello world.nyan", workers=1, cache=tmp_path / "cache")
+    missing = tmp_path / "inputs" / "missing.txt"
+    results = list(batch.write([*inputs, missing], tmp_path / "results.jsonl"))
+    assert len(results) == 4
+    with open(tmp_path / "results.jsonl", encoding="utf-8") as _f:
+        records = [json.loads(line) for line in _f]
+    assert [record["ok"] for record in records] == [True, True, True, False]
+    assert records[0]["output"] == "Hello World!\n\n\n"
+    assert records[3]["error"].startswith("FileNotFoundError")
+    list(batch.write(inputs, tmp_path / "out"))
+    assert (tmp_path / "out" / "a.txt.out").read_bytes() == b"Hello World!\n\n\n"
+
+
+def test_batch_write_tree(examples, tmp_path):
+    # inputs named alike in sibling directories keep their own outputs
+    for name in ("a", "b"):
+        (tmp_path / "inputs" / name).mkdir(parents=True)
+        (tmp_path / "inputs" / name / "main.nyan").write_bytes(f"{name}\n".encode())
+    inputs = sorted((tmp_path / "inputs").rglob("*.nyan"))
+    batch = NyanBatch(examples / "hello name" / "main.nyan", workers=1, cache=tmp_path / "cache")
+    list(batch.write(inputs, tmp_path / "out"))
+    assert (tmp_path / "out" / "a" / "main.nyan.out").read_bytes() == b"hello,a\n\x00\n\n"
+    assert (tmp_path / "out" / "b" / "main.nyan.out").read_bytes() == b"hello,b\n\x00\n\n"
+    list(batch.write(inputs[:1], tmp_path / "rooted", root=tmp_path))
+    assert (tmp_path / "rooted" / "inputs" / "a" / "main.nyan.out").exists()
@@ -0,0 +1,80 @@
+import hashlib
+import json
+
+import pytest
+
+from nyanlang.benchmark import BenchmarkRunner, Workload, main
+
+
+@pytest.fixture
+def workloads(tmp_path):
+    # a single cat with input, and a linked one whose module isn't a workload of its own
+    (tmp_path / "echo.nyan").write_text(",.,.", encoding="utf-8")
+    (tmp_path / "echo.in").write_bytes(b"ab")
+    (tmp_path / "linked").mkdir()
+    (tmp_path / "linked" / "main.nyan").write_text("냥;:.", encoding="utf-8")
+    (tmp_path / "linked" / "sub.nyan").write_text("':냥;", encoding="utf-8")
+    (tmp_path / "linked" / "main.mouse").write_text("0 -> 0: sub.nyan", encoding="utf-8")
+    return tmp_path
+
+
+def test_discover(workloads):
+    echo, linked = Workload.discover([workloads])
+    assert (echo.name, echo.input, echo.linked) == (f"{workloads.name}/echo", b"ab", False)
+    assert (linked.name, linked.input, linked.linked) == (f"{workloads.name}/linked/main", b"", True)
+
+
+def test_run(workloads):
+    paths = ("text", "text-O", "python", "bundle", "v1", "workers")
+    results = list(BenchmarkRunner(Workload.discover([workloads]), paths=paths, repeat=1).run())
+    # version 1 binaries have no links, and workers need links
+    assert [(result["workload"].split("/", 1)[1], result["path"]) for result in results] == [
+        ("echo", path) for path in paths if path != "workers"
+    ] + [("linked/main", path) for path in paths if path != "v1"]
+    for result in results:
+        assert result["instructions"] == (5 if result["workload"].endswith("echo") else 9)
+        assert result["seconds"] > 0 and result["startup"] > 0 and result["peak_memory"] > 0
+        assert result["ips"] == result["instructions"] / result["seconds"]
+    # every path gives same output, and outputs compare without trailing blank lines
+    assert BenchmarkRunner.mismatches(results) == []
+    assert results[-1]["output"] == hashlib.sha256(b"\x02").hexdigest()
+    assert BenchmarkRunner.format(results[0]).startswith(results[0]["workload"])
+
+
+def test_cli_path(workloads):
+    (result,) = BenchmarkRunner(Workload.discover([workloads])[:1], paths=["cli"], repeat=1).run()
+    assert result["peak_memory"] is None
+    (text,) = BenchmarkRunner(Workload.discover([workloads])[:1], paths=["text"], repeat=1).run()
+    assert result["output"] == text["output"]
+
+
+def test_compare():
+    def report(seconds, output="a"):
+        return {"results": [{"workload": "w", "path": "text", "seconds": seconds, "output": output}]}
+
+    assert BenchmarkRunner.compare(report(1.0), report(1.05)) == [f"{'w':<28} {'text':<10}{1.05:>8.2f}x time"]
+    assert BenchmarkRunner.compare(report(1.0), report(1.5))[0].endswith("REGRESSION")
+    assert BenchmarkRunner.compare(report(1.0), report(0.5))[0].endswith("improved")
+    assert BenchmarkRunner.compare(report(1.0), report(1.0, "b"))[0].endswith("OUTPUT CHANGED")
+    # workloads missing from baseline aren't compared
+    assert BenchmarkRunner.compare({"results": []}, report(1.0)) == []
+
+
+def test_contention():
+    results = [
+        {"workload": "a", "path": "text", "seconds": 1.0}, {"workload": "a", "path": "workers", "seconds": 3.0},
+        {"workload": "b", "path": "text", "seconds": 1.0}, {"workload": "b", "path": "workers", "seconds": 0.5},
+    ]
+    assert BenchmarkRunner.contention(results) == [("a", 3.0)]
+
+
+def test_main(workloads, tmp_path, capsys):
+    out = tmp_path / "results.json"
+    report = main([str(workloads / "linked"), "--paths", "text,python", "-r", "1", "-o", str(out)])
+    assert json.loads(out.read_text(encoding="utf-8")) == report
+    assert set(report["environment"]) == {"nyanlang", "python", "implementation", "machine", "system", "cpus"}
+    assert [result["path"] for result in report["results"]] == ["text", "python"]
+    main([str(workloads / "linked"), "--paths", "text", "-r", "1", "--compare", str(out)])
+    assert capsys.readouterr().out.splitlines()[-1].startswith("linked/main")
+    with pytest.raises(IndexError):
+        main(["--paths"])
@@ -0,0 +1,91 @@
+import shutil
+
+import pytest
+
+from nyanlang.nyan import Bundle, NyanBinaryInterpreter, NyanBuilder, NyanEngine, Program
+
+
+@pytest.fixture
+def sources(tmp_path, examples):
+    # builds cache programs next to sources, so they're built from a copy
+    shutil.copytree(examples, tmp_path / "examples")
+    return tmp_path / "examples"
+
+
+@pytest.mark.parametrize("name", ["9x9.nyan", "hello world.nyan", "hello name/main.nyan"])
+@pytest.mark.parametrize("optimize", [False, True])
+def test_round_trip(run, sources, tmp_path, name, optimize):
+    out = NyanBuilder(sources / name, optimize=optimize).build(output=tmp_path / "out.nya")
+    data = out.read_bytes()
+    assert Bundle.is_bundle(data)
+    bundle = Bundle(data, out)
+    assert bundle.name(bundle.root) == (sources / name).name
+    assert run(out, b"abc\n") == run(sources / name, b"abc\n")
+    assert Program(data).run(b"abc\n").output == run(sources / name, b"abc\n")
+
+
+def test_bundle_modules(sources, tmp_path):
+    builder = NyanBuilder(sources / "hello name" / "main.nyan")
+    out = builder.build(output=tmp_path / "out.nya")
+    bundle = Bundle.open(out)
+    names = sorted(bundle.name(index) for index in range(len(builder.nyans)))
+    assert names == ["main.nyan", "modules/name print.nyan", "modules/special character print.nyan"]
+    # keywords are decoded to their bytes, so only opcodes are the same
+    nyan = NyanBinaryInterpreter(out).init()
+    assert [op for op, _ in nyan.code] == [op for op, _ in builder.root.code]
+
+
+def test_rewritten(run, sources, tmp_path):
+    # bundle is read at once, so its file can be rebuilt while a program loaded from it is kept
+    out = NyanBuilder(sources / "hello name" / "main.nyan").build(output=tmp_path / "out.nya")
+    program = Program(out)
+    out.write_bytes(b"")
+    assert program.run(b"abc\n").output == run(sources / "hello name" / "main.nyan", b"abc\n")
+    assert isinstance(Bundle.open(NyanBuilder(sources / "9x9.nyan").build(output=out)).data, bytes)
+
+
+def test_build_v1(tmp_path):
+    source = tmp_path / "small.nyan"
+    source.write_text('냥냥냥?"c"냥.~냐-뀨,,', encoding="utf-8")
+    out = NyanBuilder(source, version=1).build(output=tmp_path / "small.nya")
+    assert out.read_bytes() == (
+        b"\x01\x02\x00\x00\x03\x00\x00\x00\x01\x02\x00\x00\x01\x08\x00\x00\x01\x0b\x03\x00\x00\x01\x0c\r\t\x00\x00\x02"
+    )
+
+
+def test_build_v1_modules(run, sources, tmp_path):
+    out = NyanBuilder(sources / "hello name" / "main.nyan", version=1).build(output=tmp_path / "main.nya")
+    assert out.read_bytes() == (
+        b"\x00\x00\x02"
+        b"\x00\x00\x00\x00\x00\x00modules/name print.nyan\n"
+        b"\x00\x01\x00\x00\x01\x00modules/special character print.nyan\n"
+        b"\x02\x00\x00\n\x0b\x00\x00\x00\x01\x02\x00\x00\n\x01\x00\x00\x01\x03\x00\x00\x01\x0c\x00\x00\x00\x01"
+        b"\x02\x00\x00\x04\x08\x00\x00\x01\x03\x00\x00\x03\x08\x00\x00\x01\x02\x00\x00\x07\x08\x00\x00\x02"
+        b"\x02\x00\x00\x03\x08\x00\x00\x01\x04\x00\x00\x01\x06\x05\x00\x00\x01\x06"
+    )
+    # modules of version 1 builds are found next to the build
+    shutil.copytree(sources / "hello name" / "modules", tmp_path / "modules")
+    assert run(out, b"abc\n") == b"hello,abc\n\x00"
+
+
+def test_build_v1_target_position(tmp_path):
+    (tmp_path / "main.nyan").write_text("냥.", encoding="utf-8")
+    (tmp_path / "main.mouse").write_text("0->3: a.nyan\n300->1: b.nyan\n", encoding="utf-8")
+    for name in ("a.nyan", "b.nyan"):
+        (tmp_path / name).write_text("냥", encoding="utf-8")
+    out = NyanBuilder(tmp_path / "main.nyan", version=1).build(output=tmp_path / "main.nya")
+    # 300 -> 1 reads the same in the layout of earlier builds, so only 0 -> 3 is flagged
+    assert out.read_bytes().startswith(b"\x00\x00\x02\x00\x00\x01\x00\x03\x00a.nyan\n\x01\x2c\x00\x01\x2c\x00b.nyan\n")
+    links = []
+    for filename in (tmp_path / "main.nyan", out):
+        engine = NyanEngine(filename, cache=False)
+        engine.load_modules()
+        links.append([(pos, child.filename.name, tpos) for _, pos, child, tpos in engine.links])
+    assert links[0] == links[1] == [(0, "a.nyan", 3), (300, "b.nyan", 1)]
+
+
+def test_build_errors(sources, tmp_path):
+    with pytest.raises(ValueError):
+        NyanBuilder(sources / "9x9.nyan").build(output=tmp_path / "out.txt")
+    with pytest.raises(ValueError):
+        NyanBuilder(sources / "9x9.nyan", version=3)
@@ -0,0 +1,81 @@
+from io import BytesIO
+
+import pytest
+
+from nyanlang.nyan import NyanEngine, NyanInterpreter, NyanIO, ProgramCache
+
+
+@pytest.fixture
+def program(tmp_path):
+    path = tmp_path / "main.nyan"
+    path.write_text("냥냥냥.", encoding="utf-8")
+    return path
+
+
+def run(path, **options):
+    # engines are given a memo of their own, so programs come from the disk cache and not from memory
+    output = BytesIO()
+    NyanEngine(path, compiled={}, io=NyanIO(BytesIO(), output, mode="bytes"), **options).run()
+    return output.getvalue()
+
+
+@pytest.fixture
+def unparsed(monkeypatch):
+    def parse_program(self):
+        raise AssertionError(f"{self.filename} parsed again")
+
+    monkeypatch.setattr(NyanInterpreter, "parse_program", parse_program)
+
+
+def test_store_load(program, tmp_path):
+    cache = ProgramCache(tmp_path / "cache")
+    key = cache.key(program, "text-O0")
+    assert cache.load(program, "text-O0", key) is None
+    cache.store(program, "text-O0", key, {"program": "냥"})
+    assert cache.load(program, "text-O0", key) == {"program": "냥"}
+    # other tags, signatures and contents have other keys
+    assert key != cache.key(program, "text-O1") != cache.key(program, "text-O0", "signature")
+    assert cache.key(tmp_path / "missing.nyan", "text-O0") is None
+
+
+def test_default_directory(program):
+    assert run(program, cache=True) == b"\x03\n\n"
+    assert (program.parent / "__nyancache__" / "main.nyan.text-O0.nyc").exists()
+
+
+def test_hit(program, tmp_path, request):
+    assert run(program, cache=tmp_path / "cache") == b"\x03\n\n"
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+    request.getfixturevalue("unparsed")
+    assert run(program, cache=tmp_path / "cache") == b"\x03\n\n"
+
+
+def test_options(program, tmp_path):
+    run(program, cache=tmp_path / "cache")
+    run(program, cache=tmp_path / "cache", optimize=True)
+    run(program, cache=tmp_path / "cache", backend="python")
+    # every compiled form has an entry of its own
+    assert len(list((tmp_path / "cache").iterdir())) == 3
+
+
+def test_stale(program, tmp_path):
+    assert run(program, cache=tmp_path / "cache") == b"\x03\n\n"
+    program.write_text("냥냥.", encoding="utf-8")
+    # changed file is parsed again, and its entry replaced
+    assert run(program, cache=tmp_path / "cache") == b"\x02\n\n"
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+@pytest.mark.parametrize("data", [b"", b"garbage", ProgramCache.magic, ProgramCache.magic + b"\xff\x00"])
+def test_corrupt(program, tmp_path, data):
+    run(program, cache=tmp_path / "cache")
+    (entry,) = (tmp_path / "cache").iterdir()
+    entry.write_bytes(data)
+    assert run(program, cache=tmp_path / "cache") == b"\x03\n\n"
+    # invalid entry is written again
+    assert entry.read_bytes().startswith(ProgramCache.magic) and len(entry.read_bytes()) > len(data)
+
+
+def test_unwritable(program, tmp_path):
+    (tmp_path / "cache").write_text("not a directory", encoding="utf-8")
+    assert run(program, cache=tmp_path / "cache") == b"\x03\n\n"
@@ -0,0 +1,47 @@
+import pytest
+
+from nyanlang.nyan import Communicator
+
+
+def test_capacity():
+    communicator = Communicator("a", "b", capacity=3)
+    # send tells whether channel became full, so sender gives way to receiver
+    assert [communicator.send("a", value) for value in (1, 2, 3)] == [False, False, True]
+    assert communicator.pending("a") == 3
+    assert communicator.pending("b") == 0
+    assert [communicator.receive("b") for _ in range(4)] == [1, 2, 3, None]
+    assert communicator.receive("a") is None
+
+
+def test_full_channel_keeps_latest():
+    communicator = Communicator("a", "b")
+    assert communicator.send("b", 1)
+    assert communicator.send("b", 2)
+    assert communicator.pending("b") == 1
+    assert communicator.receive("a") == 2
+
+
+def test_directions():
+    communicator = Communicator("a", "b", capacity=2)
+    communicator.send("a", 1)
+    communicator.send("b", 2)
+    assert (communicator.receive("a"), communicator.receive("b")) == (2, 1)
+    assert communicator.get_nyan("a") == "b"
+    assert communicator.get_nyan("b") == "a"
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        Communicator("a", "b", capacity=0)
+    communicator = Communicator("a", "b")
+    for method in (communicator.receive, communicator.pending, communicator.get_nyan):
+        with pytest.raises(ValueError):
+            method("c")
+    with pytest.raises(ValueError):
+        communicator.send("c", 1)
+
+
+@pytest.mark.parametrize("channel_size", [1, 2, 16])
+def test_engine(run, examples, channel_size):
+    filename = examples / "hello name" / "main.nyan"
+    assert run(filename, b"abc\n", channel_size=channel_size) == run(filename, b"abc\n")
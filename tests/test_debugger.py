@@ -0,0 +1,65 @@
+from io import BytesIO, StringIO
+
+import pytest
+
+from nyanlang.nyan import NyanDebugger, NyanIO
+
+
+def debug(filename, commands, input=b"abc\n"):
+    # lines written by debugger, and output of program
+    lines = StringIO()
+    output = BytesIO()
+    debugger = NyanDebugger(
+        filename, cache=False, commands=commands, output=lines, io=NyanIO(BytesIO(input), output, mode="bytes")
+    )
+    debugger.run()
+    return lines.getvalue().splitlines(), output.getvalue()
+
+
+@pytest.fixture
+def hello_name(examples):
+    return examples / "hello name" / "main.nyan"
+
+
+def test_breakpoint(run, hello_name):
+    # file names may have spaces in them
+    lines, output = debug(hello_name, ["b name print.nyan:1:3", "c", "p 0 3"])
+    assert "breakpoint name print.nyan:1:3 @2 JUMP_ZERO 6" in lines
+    assert "name print.nyan:1:3 @2 JUMP_ZERO 6  (breakpoint)" in lines
+    assert lines[-1] == "*0:111 1:0 2:0"
+    assert output == run(hello_name, b"abc\n")
+
+
+def test_delete(hello_name):
+    lines, _ = debug(hello_name, ["b name print.nyan@2", "d name print@2", "b", "c"])
+    assert "deleted name print.nyan:1:3 @2 JUMP_ZERO 6" in lines
+    assert not any(line.endswith("(breakpoint)") for line in lines)
+
+
+def test_watch(hello_name):
+    lines, _ = debug(hello_name, ["b name print.nyan:1:3", "c", "w 0", "c", "c"])
+    assert lines[-3:] == [
+        "name print.nyan:1:5 @4 OUTPUT 1  (watch [0] 111 -> 97)",
+        "(nyan) c",
+        "name print.nyan:1:5 @4 OUTPUT 1  (watch [0] 97 -> 98)",
+    ]
+
+
+def test_locations(hello_name):
+    debugger = NyanDebugger(hello_name, cache=False, commands=[])
+    root = debugger.root
+    assert debugger.resolve("1:1") == (root, 0)
+    assert debugger.resolve("@3") == (root, 3)
+    nyan, cursor = debugger.resolve("name print.nyan:1:3")
+    assert (nyan.filename.name, cursor) == ("name print.nyan", 2)
+    for spec in ("1", "x:1:2:3", "9:1"):
+        with pytest.raises(ValueError):
+            debugger.resolve(spec)
+
+
+def test_errors(hello_name):
+    # bad commands are reported, and debugging goes on
+    lines, _ = debug(hello_name, ["b nowhere.nyan:1:1", "d", "w x", "x"])
+    assert "ValueError: No cat named nowhere.nyan" in lines
+    assert lines.count("ValueError: Invalid location  - Location must be [file:]line:col or [file]@index") == 1
+    assert any(line.startswith("s(tep)") for line in lines)
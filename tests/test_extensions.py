@@ -0,0 +1,106 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from nyanlang import main
+from nyanlang.extensions import ExtensionRegistry
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    # directory on path, as packages are installed in
+    directory = tmp_path / "site"
+    directory.mkdir()
+    monkeypatch.syspath_prepend(str(directory))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return directory
+
+
+def module(site, name, message):
+    (site / f"{name}.py").write_text(f"def run():\n    print({message!r})\n\n\nmain = run\n", encoding="utf-8")
+
+
+def test_legacy_module(site, capsys):
+    module(site, "nyan_ext_hi", "hi")
+    registry = ExtensionRegistry()
+    assert registry.path == site.parent / "cache" / "nyanlang" / "extensions.json"
+    registry.resolve("hi")()
+    assert capsys.readouterr().out == "hi\n"
+    assert json.loads(registry.path.read_text(encoding="utf-8"))["commands"]["hi"] == "nyan_ext_hi:run"
+    assert registry.resolve("missing") is None
+
+
+def test_entry_point(site, capsys):
+    module(site, "greeting", "greetings")
+    dist = site / "greeting-1.0.dist-info"
+    dist.mkdir()
+    (dist / "METADATA").write_text("Metadata-Version: 2.1\nName: greeting\nVersion: 1.0\n", encoding="utf-8")
+    (dist / "entry_points.txt").write_text("[nyanlang.commands]\ngreet = greeting:main\n", encoding="utf-8")
+    ExtensionRegistry().resolve("greet")()
+    assert capsys.readouterr().out == "greetings\n"
+
+
+def test_index(site, monkeypatch):
+    module(site, "nyan_ext_indexed", "indexed")
+    ExtensionRegistry().find("indexed")
+
+    def scan(self):
+        raise AssertionError("path scanned again")
+
+    # later invocations read index, without searching path
+    with monkeypatch.context() as patch:
+        patch.setattr(ExtensionRegistry, "scan", scan)
+        assert ExtensionRegistry().find("indexed") == "nyan_ext_indexed:run"
+
+
+def test_stale(site):
+    ExtensionRegistry().find("installed")
+    module(site, "nyan_ext_installed", "installed")
+    # package installed since index was written changes its directory
+    assert ExtensionRegistry().find("installed") == "nyan_ext_installed:run"
+
+
+def test_removed(site):
+    registry = ExtensionRegistry()
+    registry.store({"gone": "nyan_ext_gone:run"})
+    assert ExtensionRegistry().find("gone") == "nyan_ext_gone:run"
+    # module removed without path changing is found missing on import, and index written again
+    assert ExtensionRegistry().resolve("gone") is None
+    assert "gone" not in json.loads(registry.path.read_text(encoding="utf-8"))["commands"]
+
+
+@pytest.mark.parametrize("data", ["", "[]", '{"version": 0, "commands": {}}'])
+def test_invalid_index(site, data):
+    module(site, "nyan_ext_valid", "valid")
+    registry = ExtensionRegistry()
+    registry.path.parent.mkdir(parents=True)
+    registry.path.write_text(data, encoding="utf-8")
+    assert registry.load() is None
+    assert registry.find("valid") == "nyan_ext_valid:run"
+
+
+def test_unwritable(site, tmp_path):
+    module(site, "nyan_ext_unwritable", "unwritable")
+    (tmp_path / "file").write_text("not a directory", encoding="utf-8")
+    assert ExtensionRegistry(tmp_path / "file" / "extensions.json").find("unwritable") == "nyan_ext_unwritable:run"
+
+
+def test_cli(site, monkeypatch, capsys):
+    module(site, "nyan_ext_cli", "from cli")
+    monkeypatch.setattr(sys, "argv", ["nyan", "cli"])
+    main()
+    assert capsys.readouterr().out == "from cli\n"
+    monkeypatch.setattr(sys, "argv", ["nyan", "unknown"])
+    with pytest.raises(SystemExit):
+        main()
+    assert capsys.readouterr().out == 'Invalid command "unknown"\n'
+
+
+def test_lazy_imports():
+    # commands not running programs don't import engine, or logging
+    code = "import sys, nyanlang; print(sorted({'nyanlang.nyan', 'logging', 'asyncio'} & set(sys.modules)))"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout == "[]\n"
+    code = "import sys, nyanlang; nyanlang.NyanEngine; print('nyanlang.nyan' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout == "True\n"
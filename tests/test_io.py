@@ -0,0 +1,104 @@
+from io import BytesIO, StringIO, TextIOWrapper
+
+import pytest
+
+from nyanlang.nyan import NyanIO
+
+
+def test_buffered():
+    stdout = BytesIO()
+    io = NyanIO(stdout=stdout, mode="bytes", buffer_size=4, line_buffering=False)
+    io.write(65, 3)
+    assert stdout.getvalue() == b""
+    # flushed once buffer is full
+    io.write(66)
+    assert stdout.getvalue() == b"AAAB"
+    io.write(10)
+    assert stdout.getvalue() == b"AAAB"
+    io.flush()
+    assert stdout.getvalue() == b"AAAB\n"
+
+
+def test_line_buffering():
+    stdout = BytesIO()
+    io = NyanIO(stdout=stdout, mode="bytes", line_buffering=True)
+    io.write(65)
+    assert stdout.getvalue() == b""
+    io.write(10)
+    assert stdout.getvalue() == b"A\n"
+    io.write_text("{1}\n")
+    assert stdout.getvalue() == b"A\n{1}\n"
+
+
+@pytest.mark.parametrize("mode, expected", [("text", "냥\n".encode("utf-8")), ("bytes", b"\x00\n")])
+def test_modes(mode, expected):
+    stdout = BytesIO()
+    io = NyanIO(stdout=stdout, mode=mode)
+    io.write(ord("냥") if mode == "text" else 0)
+    io.write(10)
+    io.flush()
+    assert stdout.getvalue() == expected
+
+
+def test_text_streams():
+    text = StringIO()
+    io = NyanIO(stdout=text)
+    io.write(ord("냥"))
+    io.flush()
+    assert text.getvalue() == "냥"
+    # bytes written to a text stream go to its buffer, after text written before
+    raw = BytesIO()
+    wrapper = TextIOWrapper(raw, encoding="utf-8")
+    wrapper.write("a")
+    io = NyanIO(stdout=wrapper, mode="bytes")
+    io.write(255)
+    io.flush()
+    assert raw.getvalue() == b"a\xff"
+
+
+def test_read():
+    io = NyanIO(BytesIO(b"ab"), mode="bytes")
+    assert [io.read(), io.read(), io.read()] == [97, 98, 0]
+    io = NyanIO(BytesIO(b"abc"), mode="bytes")
+    # last of skipped characters is read
+    assert io.read(2) == 98
+
+
+def test_decode_chunks():
+    # characters split between chunks are decoded whole
+    io = NyanIO(BytesIO("냥냐".encode("utf-8")), buffer_size=1)
+    assert [io.read(), io.read(), io.read()] == [ord("냥"), ord("냐"), 0]
+    assert NyanIO(StringIO("냥")).read() == ord("냥")
+
+
+def test_prompt():
+    stdout = BytesIO()
+
+    class Stdin(BytesIO):
+        def read(self, size=-1):
+            # output written before input is shown before reading
+            assert stdout.getvalue() == b"?"
+            return super().read(size)
+
+    io = NyanIO(Stdin(b"a"), stdout, mode="bytes", line_buffering=False)
+    io.write(63)
+    assert io.read() == 97
+
+
+def test_dump():
+    io = NyanIO(BytesIO(b"abc"), BytesIO(), mode="bytes")
+    io.read()
+    io.write(65)
+    state = io.dump()
+    other = NyanIO(BytesIO(), BytesIO(), mode="bytes")
+    other.load(state)
+    assert [other.read(), other.read()] == [98, 99]
+    other.flush()
+    assert other.stdout.getvalue() == b"A"
+    with pytest.raises(ValueError):
+        NyanIO().load(state)
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        NyanIO(mode="binary")
@@ -0,0 +1,81 @@
+from io import BytesIO
+
+import pytest
+
+from nyanlang.nyan import NyanEngine, NyanInterpreter, NyanIO
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    # names of files parsed, in order
+    names = []
+    parse_program = NyanInterpreter.parse_program
+
+    def record(self):
+        names.append(self.filename.name)
+        return parse_program(self)
+
+    monkeypatch.setattr(NyanInterpreter, "parse_program", record)
+    return names
+
+
+@pytest.fixture
+def program(tmp_path):
+    # main talks to sub only, and never to optional
+    (tmp_path / "main.nyan").write_text("냥;:.", encoding="utf-8")
+    (tmp_path / "sub.nyan").write_text("':냥;", encoding="utf-8")
+    (tmp_path / "optional.nyan").write_text("냥.", encoding="utf-8")
+    (tmp_path / "main.mouse").write_text("0 -> 0: sub.nyan\n1 -> 0: optional.nyan", encoding="utf-8")
+    return tmp_path / "main.nyan"
+
+
+def engine(path, **options):
+    # engines are given a memo of their own, so programs parsed by other tests aren't reused
+    return NyanEngine(path, cache=False, compiled={}, io=NyanIO(BytesIO(), BytesIO(), mode="bytes"), **options)
+
+
+def test_first_switch(program, parsed):
+    nyan = engine(program)
+    assert parsed == ["main.nyan"]
+    assert [cat.initialized for cat in nyan.nyans] == [True, False, False]
+    nyan.run()
+    assert nyan.io.stdout.getvalue() == b"\x02\n\n"
+    assert parsed == ["main.nyan", "sub.nyan"]
+    assert [cat.initialized for cat in nyan.nyans] == [True, True, False]
+
+
+def test_load_modules(program, parsed):
+    # reports and clones need every module
+    engine(program).optimization_report()
+    assert sorted(parsed) == ["main.nyan", "optional.nyan", "sub.nyan"]
+
+
+def test_missing(program):
+    (program.parent / "optional.nyan").unlink()
+    # links are checked before anything runs
+    with pytest.raises(FileNotFoundError):
+        engine(program)
+
+
+def test_diamond(tmp_path, parsed):
+    # both children link shared, which is walked once and parsed once
+    (tmp_path / "main.nyan").write_text("", encoding="utf-8")
+    (tmp_path / "main.mouse").write_text("0 -> 0: left.nyan\n1 -> 0: right.nyan", encoding="utf-8")
+    for side, pos in (("left", 0), ("right", 1)):
+        (tmp_path / f"{side}.nyan").write_text("", encoding="utf-8")
+        (tmp_path / f"{side}.mouse").write_text(f"{pos} -> {pos}: shared.nyan", encoding="utf-8")
+    (tmp_path / "shared.nyan").write_text("", encoding="utf-8")
+    nyan = engine(tmp_path / "main.nyan")
+    assert [cat.filename.name for cat in nyan.nyans] == ["main.nyan", "left.nyan", "shared.nyan", "right.nyan"]
+    assert len(nyan.links) == 4
+    nyan.load_modules()
+    assert sorted(parsed) == ["left.nyan", "main.nyan", "right.nyan", "shared.nyan"]
+
+
+def test_snapshot(program):
+    # modules which never ran load in their first state
+    nyan = engine(program)
+    nyan.run()
+    other = engine(program)
+    other.restore(nyan.snapshot())
+    assert [cat.initialized for cat in other.nyans] == [True, True, False]
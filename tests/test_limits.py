@@ -0,0 +1,76 @@
+import pytest
+
+from nyanlang.nyan import LimitExceeded, NyanBuilder, Program
+
+BACKENDS = [
+    {},
+    {"optimize": True},
+    {"backend": "python"},
+    {"backend": "python", "optimize": True},
+]
+
+
+@pytest.fixture
+def forever(tmp_path):
+    path = tmp_path / "forever.nyan"
+    path.write_text("냥\n~\n-", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def endless_tape(tmp_path):
+    path = tmp_path / "tape.nyan"
+    path.write_text("냥~?냥-", encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("options", BACKENDS)
+def test_instructions(run, forever, options):
+    with pytest.raises(LimitExceeded) as error:
+        run(forever, max_instructions=100000, **options)
+    assert error.value.kind == "instructions"
+    assert error.value.limit == 100000
+    assert error.value.filename == forever
+
+
+@pytest.mark.parametrize("options", BACKENDS)
+def test_seconds(run, forever, options):
+    with pytest.raises(LimitExceeded) as error:
+        run(forever, timeout=0.1, **options)
+    assert error.value.kind == "seconds"
+    assert "seconds exceeded" in str(error.value)
+
+
+@pytest.mark.parametrize("options", BACKENDS)
+@pytest.mark.parametrize("tape", ["int", "byte", "paged"])
+def test_cells(run, endless_tape, options, tape):
+    with pytest.raises(LimitExceeded) as error:
+        run(endless_tape, max_tape=1000, tape=tape, **options)
+    assert error.value.kind == "cells"
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_builds(run, forever, endless_tape, tmp_path, version):
+    out = NyanBuilder(forever, version=version).build(output=tmp_path / "forever.nya")
+    with pytest.raises(LimitExceeded, match="instructions"):
+        run(out, max_instructions=100000)
+    with pytest.raises(LimitExceeded, match="seconds"):
+        run(out, timeout=0.1)
+    out = NyanBuilder(endless_tape, version=version).build(output=tmp_path / "tape.nya")
+    with pytest.raises(LimitExceeded, match="cells"):
+        run(out, max_tape=1000)
+
+
+def test_program():
+    program = Program("냥~-", max_instructions=10000)
+    # every run counts from 0
+    for _ in range(2):
+        with pytest.raises(LimitExceeded, match="instructions"):
+            program.run()
+    assert Program("냥냥냥.", max_instructions=10).run().output == b"\x03\n\n"
+
+
+def test_invalid(forever):
+    for name in ("max_instructions", "max_tape", "timeout"):
+        with pytest.raises(ValueError):
+            Program(forever, **{name: 0})
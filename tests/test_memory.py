@@ -0,0 +1,156 @@
+import random
+
+import pytest
+
+from nyanlang.nyan import ByteMemory, LimitExceeded, Memory, PagedMemory
+
+TAPES = [Memory, ByteMemory, PagedMemory]
+
+
+@pytest.mark.parametrize("tape", TAPES)
+def test_growth(tape):
+    memory = tape()
+    # far enough both ways to add chunks in front and extend the last one several times
+    addresses = [0, 1, -1, 200, -17, -300, 5000, -5000, 63, 64, -16]
+    for value, address in enumerate(addresses, 1):
+        memory.write(address, value)
+    for value, address in enumerate(addresses, 1):
+        assert memory.read(address) == value
+    assert memory.memory == {address: value for value, address in enumerate(addresses, 1)}
+    assert memory.read(100000) == memory.read(-100000) == 0
+
+
+def test_left_growth_keeps_chunks():
+    memory = Memory()
+    memory.write(0, 1)
+    cells = memory.cells
+    for address in range(-1, -2000, -1):
+        memory.write(address, 2)
+    # cells right of the first chunk are never copied
+    assert memory.chunks[-1] is cells
+    assert memory.read(0) == 1 and memory.read(-1999) == 2
+
+
+@pytest.mark.parametrize("tape", [Memory, PagedMemory])
+def test_promotion(tape):
+    memory = tape()
+    memory.write(-100, 1)
+    memory.write(3, 1 << 70)
+    memory.write(-1000, -(1 << 80))
+    assert memory.promoted
+    assert memory.read(3) == 1 << 70
+    assert memory.read(-1000) == -(1 << 80)
+    assert memory.read(-100) == 1
+    memory.write(10000, 1 << 65)
+    assert memory.read(10000) == 1 << 65
+
+
+def test_wraparound():
+    memory = ByteMemory()
+    memory.write(0, 256)
+    memory.write(1, -1)
+    memory.write(-50, 1 << 70)
+    assert (memory.read(0), memory.read(1), memory.read(-50)) == (0, 255, 0)
+    assert not memory.promoted
+
+
+@pytest.mark.parametrize("tape", TAPES)
+def test_scan(tape):
+    memory = tape()
+    for address in range(-40, 40):
+        if address not in (-35, 30):
+            memory.write(address, 1)
+    assert memory.scan(0, 1) == 30
+    assert memory.scan(0, -1) == -35
+    assert memory.scan(1, 2) == 41
+    memory.write(-2000, 1)
+    assert memory.scan(-2000, -1) == -2001
+    assert memory.scan(-2000, 1) == -1999
+
+
+@pytest.mark.parametrize("tape", TAPES)
+def test_multiply(tape):
+    memory = tape()
+    memory.write(0, 3)
+    memory.write(-300, 1)
+    memory.multiply(0, ((1, 2), (-300, 4)))
+    assert (memory.read(0), memory.read(1), memory.read(-300)) == (0, 6, 13)
+
+
+def test_multiply_negative():
+    memory = Memory()
+    memory.write(0, -3)
+    memory.multiply(0, ((1, 2),))
+    # loop never ends on negative cells, so multiply leaves them to it
+    assert (memory.read(0), memory.read(1)) == (-3, 0)
+
+
+@pytest.mark.parametrize("tape", TAPES)
+def test_model(tape):
+    # random operations compared with a dict of cells
+    for seed in range(8):
+        generator = random.Random(seed)
+        memory = tape()
+        model = {}
+        for _ in range(300):
+            address = generator.randint(-600, 600) if generator.random() < 0.5 else generator.randint(-20, 20)
+            choice = generator.random()
+            if choice < 0.5:
+                value = generator.choice([0, generator.randint(-5, 5), generator.randint(-(1 << 70), 1 << 70)])
+                memory.write(address, value)
+                model[address] = value & tape.mask
+            elif choice < 0.7:
+                assert memory.read(address) == model.get(address, 0)
+            elif choice < 0.9:
+                step = generator.choice([1, -1, 2, -3])
+                expected = address
+                while model.get(expected, 0):
+                    expected += step
+                assert memory.scan(address, step) == expected
+            else:
+                state = memory.dump()
+                memory = tape()
+                memory.load(state)
+            assert memory.memory == {address: value for address, value in model.items() if value}
+
+
+@pytest.mark.parametrize("tape", TAPES)
+def test_limit(tape):
+    memory = tape()
+    memory.limit = 1 << 13
+    memory.write(100, 1)
+    with pytest.raises(LimitExceeded) as error:
+        for address in range(0, 1 << 20, 1000):
+            memory.write(address, 1)
+            memory.write(-address, 1)
+    assert error.value.kind == "cells"
+
+
+@pytest.mark.parametrize("tape", TAPES)
+@pytest.mark.parametrize("limit", [1, 10, 1000, 5000])
+def test_limit_cells(tape, limit):
+    # tape never holds more cells than limit, and stops less than a page short of it
+    memory = tape()
+    memory.limit = limit
+    written = 0
+    with pytest.raises(LimitExceeded):
+        for address in range(1 << 20):
+            memory.write(address, 1)
+            written += 1
+    assert limit - limit // 16 <= written <= max(limit, memory.initial_size)
+
+
+def test_repage():
+    memory = PagedMemory()
+    for address in (-5000, -1, 0, 7, 4096):
+        memory.write(address, address or 1)
+    memory.limit = 1 << 20
+    assert memory.page_bits == 12
+    memory.limit = 1000
+    assert memory.page_bits == 5
+    assert memory.memory == {-5000: -5000, -1: -1, 0: 1, 7: 7, 4096: 4096}
+    state = memory.dump()
+    memory = PagedMemory()
+    memory.load(state)
+    # no limit on this tape, so its cells go back to whole pages
+    assert memory.page_bits == 12 and memory.memory[4096] == 4096
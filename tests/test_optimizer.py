@@ -0,0 +1,82 @@
+import pytest
+
+from nyanlang.nyan import LimitExceeded, NyanInterpreter, Opcodes, Program, ProgramCompiler, ProgramOptimizer
+
+
+def optimize(program, wraps=False):
+    compiler = ProgramCompiler(program + "    ", NyanInterpreter.keyword_table)
+    compiler.compile()
+    optimizer = ProgramOptimizer(compiler.code, compiler.origins, wraps)
+    return optimizer.optimize(), optimizer.rewrites
+
+
+def test_merge():
+    code, rewrites = optimize("냥냥냐??!.")
+    assert code == [(Opcodes.ADD, 1), (Opcodes.MOVE, 1), (Opcodes.OUTPUT, 1), (Opcodes.HALT, None)]
+    assert rewrites == []
+
+
+def test_clear_on_wrapping_tape():
+    code, rewrites = optimize("냥냥~냐-.", wraps=True)
+    # value added right before being set is dropped
+    assert code == [(Opcodes.SET, 0), (Opcodes.OUTPUT, 1), (Opcodes.HALT, None)]
+    assert rewrites == [(2, "set")]
+    code, _ = optimize("~냥-냥", wraps=True)
+    assert code == [(Opcodes.SET, 1), (Opcodes.HALT, None)]
+
+
+def test_clear_on_unbounded_tape():
+    code, rewrites = optimize("냥냥~냐-.")
+    # loop stays after multiply, for negative cells it never ends on
+    assert code[:3] == [(Opcodes.ADD, 2), (Opcodes.MULTIPLY, ()), (Opcodes.JUMP_ZERO, 5)]
+    assert rewrites == [(2, "set")]
+    code, rewrites = optimize("~냥-")
+    assert Opcodes.MULTIPLY not in [op for op, _ in code]
+    assert rewrites == []
+
+
+def test_multiply():
+    code, rewrites = optimize("냥~냐?냥냥!-?.", wraps=True)
+    assert code == [
+        (Opcodes.ADD, 1), (Opcodes.MULTIPLY, ((1, 2),)), (Opcodes.MOVE, 1), (Opcodes.OUTPUT, 1), (Opcodes.HALT, None)
+    ]
+    assert rewrites == [(1, "multiply")]
+    code, _ = optimize("냥~냐?냥냥!-?.")
+    assert code[1] == (Opcodes.MULTIPLY, ((1, 2),))
+    assert (Opcodes.JUMP_NONZERO, 3) in code
+
+
+def test_scan():
+    code, rewrites = optimize("~?-.")
+    assert code == [(Opcodes.SCAN, 1), (Opcodes.OUTPUT, 1), (Opcodes.HALT, None)]
+    assert rewrites == [(0, "scan")]
+
+
+def test_jumps_are_relinked():
+    code, _ = optimize("냥~?냥냥~냐-!냐-")
+    for pc, (op, arg) in enumerate(code):
+        if op == Opcodes.JUMP_ZERO:
+            assert code[arg - 1] == (Opcodes.JUMP_NONZERO, pc + 1)
+
+
+@pytest.mark.parametrize("name", ["9x9.nyan", "hello world.nyan", "hello name/main.nyan"])
+@pytest.mark.parametrize("tape", ["int", "byte", "paged"])
+def test_examples(run, examples, name, tape):
+    assert run(examples / name, b"abc\n", tape=tape, optimize=True) == run(examples / name, b"abc\n", tape=tape)
+
+
+@pytest.mark.parametrize("name", ["loops.nyan", "numbers.nyan", "pingpong/main.nyan"])
+@pytest.mark.parametrize("backend", ["interpreter", "python"])
+def test_benchmarks(run, benchmarks, name, backend):
+    plain = run(benchmarks / name, backend=backend)
+    assert run(benchmarks / name, backend=backend, optimize=True) == plain
+
+
+@pytest.mark.parametrize("source", ["냐~냐-냥.", "냐~냐?냥!-?."])
+def test_negative_cells(source):
+    # loops decreasing negative cells never end on unbounded tapes, with or without rewrites
+    for optimize in (False, True):
+        with pytest.raises(LimitExceeded):
+            Program(source, optimize=optimize, max_instructions=1 << 16).run()
+        plain = Program(source, tape="byte").run()
+        assert Program(source, tape="byte", optimize=optimize).run().output == plain.output
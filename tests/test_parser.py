@@ -0,0 +1,53 @@
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from nyanlang.nyan import ProgramParser
+
+
+def regex_parse(source):
+    # parser of earlier versions, which read whole file and stripped comments with a regex
+    return re.sub(r'"(.?(\\")?)*?"', "", source.replace("\n", "").replace(" ", "")) + "    "
+
+
+def sources(count, seed=0):
+    generator = random.Random(seed)
+    alphabet = ["냥", "?", '"', "\\", " ", "\n", "~", "-", "a"]
+    for _ in range(count):
+        yield "".join(generator.choice(alphabet) for _ in range(generator.randint(0, 40)))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1 << 16])
+def test_parse_matches_regex(chunk_size):
+    for source in sources(500, chunk_size):
+        parser = ProgramParser(Path("test.nyan"), source)
+        parser.chunk_size = chunk_size
+        assert parser.parse() == regex_parse(source), source
+
+
+def test_parse_file(tmp_path):
+    path = tmp_path / "test.nyan"
+    path.write_text('냥냥 "comment \\" still" ?\n.', encoding="utf-8")
+    assert ProgramParser(path).parse() == regex_parse(path.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 16])
+def test_source_map(chunk_size):
+    for source in sources(300, chunk_size):
+        parser = ProgramParser(Path("test.nyan"), source)
+        parser.chunk_size = chunk_size
+        program = parser.parse().rstrip(" ")
+        lines = source.split("\n")
+        for index, char in enumerate(program):
+            assert source[parser.source_map.offset(index)] == char
+            line, column = parser.source_map.locate(index)
+            assert lines[line - 1][column - 1] == char
+
+
+def test_errors(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ProgramParser(tmp_path / "missing.nyan").parse()
+    with pytest.raises(ValueError):
+        ProgramParser(Path("test.txt"), "냥").parse()
@@ -0,0 +1,69 @@
+import json
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from nyanlang import main
+from nyanlang.nyan import NyanEngine, NyanIO, NyanProfiler
+
+
+@pytest.fixture
+def program(tmp_path):
+    path = tmp_path / "main.nyan"
+    path.write_text("냥냥냥\n~냐-\n.", encoding="utf-8")
+    return path
+
+
+def profile(filename, input=b"", **options):
+    output = BytesIO()
+    profiler = NyanProfiler(filename, cache=False, io=NyanIO(BytesIO(input), output, mode="bytes"), **options)
+    profiler.run()
+    return profiler, output.getvalue()
+
+
+def test_counts(program):
+    profiler, output = profile(program)
+    assert output == b"\x00\n\n"
+    (data,) = profiler.data()["cats"]
+    assert data["file"] == str(program)
+    assert data["instructions"] == 10
+    assert data["opcodes"] == {"ADD": 4, "JUMP_NONZERO": 3, "JUMP_ZERO": 1, "OUTPUT": 1, "HALT": 1}
+    # positions are lines and columns of source, hottest first
+    assert [(item["at"], item["op"], item["count"]) for item in data["positions"][:2]] == [
+        ("2:2", "ADD", 3), ("2:3", "JUMP_NONZERO", 3)
+    ]
+    assert data["loops"] == [{"index": 1, "at": "2:1", "end": "2:3", "entries": 1, "iterations": 3}]
+
+
+def test_modules(run, examples):
+    path = examples / "hello name" / "main.nyan"
+    profiler, output = profile(path, b"abc\n")
+    assert output == run(path, b"abc\n")
+    # every cat which ran has a profile of its own
+    assert {Path(data["file"]).name for data in profiler.data()["cats"]} == {
+        "main.nyan", "name print.nyan", "special character print.nyan"
+    }
+
+
+def test_off(program):
+    # interpreters of engines which don't profile have no hooks to call
+    assert not NyanEngine(program, cache=False).root.hooked()
+    assert NyanProfiler(program, cache=False).root.hooked()
+
+
+def test_report(program):
+    profiler, _ = profile(program)
+    lines = profiler.report(top=1)
+    assert lines[0].startswith(f"{program}: 10 instructions in ")
+    assert lines[lines.index("  hot positions:") + 1].split() == ["2:2", "3", "ADD"]
+    assert lines[lines.index("  hot positions:") + 2] == "  hot loops:"
+    assert lines[-1].split() == ["2:1-2:3", "3", "entered", "1"]
+
+
+def test_cli(program, tmp_path, monkeypatch):
+    out = tmp_path / "profile.json"
+    monkeypatch.setattr(sys, "argv", ["nyan", "profile", str(program), "--json", str(out)])
+    main()
+    assert json.loads(out.read_text(encoding="utf-8"))["cats"][0]["instructions"] == 10
@@ -0,0 +1,48 @@
+import pytest
+
+from nyanlang.nyan import Program
+
+TABLE = "".join(f"{a} x {b}\n" for a in range(1, 10) for b in range(1, 10))
+OUTPUTS = {
+    "9x9.nyan": (b"", TABLE.encode() + b"\n\n"),
+    "hello world.nyan": (b"", b"Hello World!\n\n\n"),
+    "hello name/main.nyan": (b"abc\n", b"hello,abc\n\x00\n\n"),
+}
+
+
+@pytest.mark.parametrize("name", OUTPUTS)
+@pytest.mark.parametrize("options", [{}, {"optimize": True}, {"backend": "python"}, {"tape": "byte"}])
+def test_examples(examples, name, options):
+    input, output = OUTPUTS[name]
+    program = Program(examples / name, **options)
+    # every run starts again, with its own input
+    assert program.run(input).output == output
+    assert program.run(input).output == output
+
+
+def test_sources(examples):
+    root = examples / "hello name"
+    modules = {
+        path.relative_to(root).as_posix(): path.read_text(encoding="utf-8")
+        for path in root.rglob("*") if path.suffix in (".nyan", ".mouse") and path.name != "main.nyan"
+    }
+    program = Program((root / "main.nyan").read_text(encoding="utf-8"), modules=modules)
+    assert program.run("abc\n").output == OUTPUTS["hello name/main.nyan"][1]
+    assert program.run(b"xyz\n").output == b"hello,xyz\n\x00\n\n"
+
+
+def test_result():
+    result = Program("냥냥?냥.").run()
+    assert result.pointer == 1
+    assert result.memory.memory == {0: 2, 1: 1}
+
+
+def test_immutable():
+    program = Program("냥.")
+    with pytest.raises(AttributeError):
+        program.engine = None
+
+
+def test_extension():
+    with pytest.raises(ValueError):
+        Program("냥.", name="main.txt")
@@ -0,0 +1,33 @@
+import os
+
+from nyanlang.nyan import NyanEngine, NyanInterpreter
+
+
+def test_shared(examples):
+    first = NyanEngine(examples / "hello name" / "main.nyan", cache=False)
+    second = NyanEngine(examples / "hello name" / "main.nyan", cache=False)
+    # cats of the same file share compiled program, and only have their own memory
+    assert second.root.code is first.root.code
+    assert second.root.memory is not first.root.memory
+    assert not hasattr(first.root, "__dict__")
+
+
+def test_changed_contents(run, tmp_path):
+    path = tmp_path / "main.nyan"
+    path.write_text("냥냥.", encoding="utf-8")
+    stat = os.stat(path)
+    assert run(path) == b"\x02\n\n"
+    # same size and modification time, other contents
+    path.write_text("냥냐.", encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert run(path) == b"\x00\n\n"
+
+
+def test_memo(tmp_path):
+    path = tmp_path / "main.nyan"
+    path.write_text("냥.", encoding="utf-8")
+    compiled = {}
+    NyanEngine(path, cache=False, compiled=compiled)
+    # programs of engines given their own memo are kept there only
+    assert [key[2] for key in compiled] == [path]
+    assert all(key[2] != path for key in NyanInterpreter.compiled)
@@ -0,0 +1,54 @@
+from io import BytesIO
+import shutil
+
+import pytest
+
+from nyanlang.nyan import NyanBuilder, NyanEngine, NyanIO, Program
+
+
+def chopped(filename, input=b"", step=1000, **options):
+    # runs step instructions at a time, resuming each time in a new engine from snapshot
+    output = BytesIO()
+    io = NyanIO(BytesIO(input), output, mode="bytes")
+    engine = NyanEngine(filename, cache=False, io=io, **options)
+    pauses = 0
+    while not engine.run_for(step):
+        data = engine.snapshot()
+        engine = NyanEngine(filename, cache=False, io=io, **options)
+        engine.restore(data)
+        pauses += 1
+    return output.getvalue(), pauses
+
+
+@pytest.mark.parametrize("name, step", [
+    ("examples/9x9.nyan", 300),
+    ("examples/hello name/main.nyan", 1),
+    ("benchmarks/pingpong/main.nyan", 50000),
+])
+@pytest.mark.parametrize("options", [{}, {"optimize": True}, {"tape": "byte"}, {"tape": "paged"}])
+def test_resume(run, examples, name, step, options):
+    filename = examples.parent / name
+    output, pauses = chopped(filename, b"abc\n", step, **options)
+    assert output == run(filename, b"abc\n", **options)
+    assert pauses > 0
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_resume_build(run, examples, tmp_path, version):
+    shutil.copy(examples / "9x9.nyan", tmp_path)
+    out = NyanBuilder(tmp_path / "9x9.nyan", version=version).build(output=tmp_path / "9x9.nya")
+    output, pauses = chopped(out, step=300)
+    assert output == run(out)
+    assert pauses > 0
+
+
+def test_program_snapshot(examples):
+    engine = NyanEngine(examples / "hello name" / "main.nyan", cache=False, io=NyanIO(BytesIO(), BytesIO()))
+    program = Program(examples / "hello name" / "main.nyan")
+    assert program.run(b"abc\n", snapshot=engine.snapshot()).output == program.run(b"abc\n").output
+
+
+def test_other_program(examples):
+    engine = NyanEngine(examples / "hello name" / "main.nyan", cache=False, io=NyanIO(BytesIO(), BytesIO()))
+    with pytest.raises(ValueError):
+        NyanEngine(examples / "9x9.nyan", cache=False).restore(engine.snapshot())
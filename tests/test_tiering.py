@@ -0,0 +1,68 @@
+from array import array
+from io import BytesIO
+
+import pytest
+
+from nyanlang.nyan import NyanEngine, NyanInterpreter, NyanIO, Program
+
+BF = {">": "?", "<": "!", "+": "냥", "-": "냐", "[": "~", "]": "-", ".": ".", "#": "뀨"}
+
+
+def nyan(source):
+    return "".join(BF[char] for char in source)
+
+
+@pytest.fixture
+def hot(monkeypatch):
+    monkeypatch.setattr(NyanInterpreter, "hot_threshold", 4)
+
+
+def engine(filename, output=None, **options):
+    output = BytesIO() if output is None else output
+    return NyanEngine(filename, cache=False, io=NyanIO(BytesIO(), output, mode="bytes"), **options)
+
+
+@pytest.mark.parametrize("name", ["9x9.nyan", "hello world.nyan"])
+@pytest.mark.parametrize("options", [{}, {"optimize": True}, {"tape": "byte"}, {"tape": "paged"}])
+def test_examples(run, examples, hot, name, options):
+    output = run(examples / name, **options)
+    assert output == Program(examples / name, **options).run().output
+
+
+def test_array_kept(hot, tmp_path):
+    path = tmp_path / "main.nyan"
+    path.write_text(nyan("+" * 100 + "[->+++<]>#"), encoding="utf-8")
+    cat = engine(path)
+    cat.run()
+    assert cat.root.loops
+    assert isinstance(cat.root.memory.cells, array) and not cat.root.memory.promoted
+
+
+@pytest.mark.parametrize("options", [{"optimize": True}, {"backend": "python", "optimize": True}])
+def test_overflow(hot, options):
+    # cell doubles 70 times, outgrowing array of tape in a compiled loop
+    program = Program(nyan("+" * 70 + ">+<[->[->++<]>[-<+>]<<]>#"), **options)
+    assert program.run().output == b"{%d}\n\n" % (1 << 70)
+
+
+def test_shared(hot, tmp_path):
+    path = tmp_path / "main.nyan"
+    path.write_text(nyan("+" * 50 + "[->++<]"), encoding="utf-8")
+    first = engine(path)
+    first.run()
+    second = engine(path)
+    # loops compiled by one cat are used by every cat of the same program
+    assert second.root.loops is first.root.loops
+    assert list(first.root.loops) == [1]
+
+
+def test_eviction(hot, monkeypatch, tmp_path):
+    monkeypatch.setattr(NyanInterpreter, "loops_size", 1)
+    path = tmp_path / "main.nyan"
+    path.write_text(nyan("+" * 20 + "[->+>+<<]>[->+<]>#" + "+" * 20 + "[-<+>]<#"), encoding="utf-8")
+    output = BytesIO()
+    cat = engine(path, output)
+    cat.run()
+    # loops compiled before are dropped, and compiled again once they're hot
+    assert len(cat.root.loops) == 1
+    assert output.getvalue() == b"{40}{60}\n\n"
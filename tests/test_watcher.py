@@ -0,0 +1,118 @@
+import os
+import threading
+from io import BytesIO, StringIO
+
+import pytest
+
+from nyanlang.nyan import NyanInterpreter, NyanIO
+from nyanlang.watcher import FileWatcher, NyanWatcher
+
+
+@pytest.fixture
+def program(tmp_path):
+    # main sends its cell to left and right in turn, and prints their replies
+    (tmp_path / "main.nyan").write_text("냥;:.먕;:.", encoding="utf-8")
+    (tmp_path / "main.mouse").write_text("0 -> 0: left.nyan\n1 -> 0: right.nyan", encoding="utf-8")
+    (tmp_path / "left.nyan").write_text("':냥;", encoding="utf-8")
+    (tmp_path / "right.nyan").write_text("':냥냥;", encoding="utf-8")
+    return tmp_path / "main.nyan"
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    names = []
+    parse_program = NyanInterpreter.parse_program
+
+    def record(self):
+        names.append(self.filename.name)
+        return parse_program(self)
+
+    monkeypatch.setattr(NyanInterpreter, "parse_program", record)
+    return names
+
+
+def watcher(program, **options):
+    output = BytesIO()
+    return NyanWatcher(
+        program, output=StringIO(), interval=0.01, cache=False, io=NyanIO(BytesIO(), output, mode="bytes"), **options
+    ), output
+
+
+def edit(path, text, delay=0.1):
+    # written from another thread while watcher waits
+    timer = threading.Timer(delay, path.write_text, (text,), {"encoding": "utf-8"})
+    timer.start()
+    return timer
+
+
+def test_stamp(tmp_path):
+    path = tmp_path / "main.nyan"
+    path.write_text("냥", encoding="utf-8")
+    files = FileWatcher()
+    stamps = files.stamps([path, tmp_path / "missing.mouse"])
+    assert stamps[tmp_path / "missing.mouse"] is None
+    assert files.changed(stamps) == set()
+    # same size and mtime, but other content
+    stat = path.stat()
+    path.write_text("냐", encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert files.changed(stamps) == {path}
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_wait(tmp_path, inotify):
+    path = tmp_path / "main.nyan"
+    path.write_text("냥", encoding="utf-8")
+    files = FileWatcher(interval=0.01, settle=0)
+    if not inotify:
+        # systems without inotify poll files
+        files.libc = False
+    stamps = files.stamps([path, tmp_path / "main.mouse"])
+    edit(tmp_path / "main.mouse", "0 -> 0: sub.nyan")
+    assert files.wait(stamps) == {tmp_path / "main.mouse"}
+
+
+def test_graph(program):
+    nyan, output = watcher(program)
+    stamps = nyan.run_once()
+    assert output.getvalue() == b"\x02\x04\n\n"
+    # mouse files of modules are watched even if missing
+    assert set(stamps) == {
+        program.parent / name for name in ("main.nyan", "main.mouse", "left.nyan", "left.mouse", "right.nyan",
+                                           "right.mouse")
+    }
+    assert nyan.output.getvalue().startswith("[watch] run 1 took ")
+
+
+def test_changed_module(program, parsed):
+    nyan, output = watcher(program)
+    nyan.run_once()
+    assert sorted(parsed) == ["left.nyan", "main.nyan", "right.nyan"]
+    parsed.clear()
+    (program.parent / "right.nyan").write_text("':냥냥냥;", encoding="utf-8")
+    nyan.forget({program.parent / "right.nyan"})
+    nyan.run_once()
+    # unchanged modules are kept compiled
+    assert parsed == ["right.nyan"]
+    assert output.getvalue() == b"\x02\x04\n\n\x02\x05\n\n"
+
+
+def test_run(program):
+    nyan, output = watcher(program)
+    edit(program.parent / "left.nyan", "':냥냥냥;")
+    nyan.run(runs=2)
+    assert output.getvalue() == b"\x02\x04\n\n\x04\x06\n\n"
+    assert "[watch] changed left.nyan\n" in nyan.output.getvalue()
+
+
+def test_broken(program):
+    nyan, output = watcher(program)
+    nyan.run_once()
+    (program.parent / "main.mouse").write_text("0 -> 0: missing.nyan", encoding="utf-8")
+    # files of last graph are still watched, so fixing broken file runs again
+    stamps = nyan.run_once()
+    assert "[watch] FileNotFoundError: " in nyan.output.getvalue()
+    assert program.parent / "right.nyan" in stamps
+    (program.parent / "main.mouse").write_text("0 -> 0: left.nyan\n1 -> 0: right.nyan", encoding="utf-8")
+    nyan.run_once()
+    assert output.getvalue() == b"\x02\x04\n\n" * 2
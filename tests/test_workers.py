@@ -0,0 +1,41 @@
+import pytest
+
+BF = {">": "?", "<": "!", "+": "냥", "-": "냐", "[": "~", "]": "-", ".": ".", ";": ";", ":": ":", "'": "'"}
+
+
+def nyan(source):
+    return "".join(BF[char] for char in source)
+
+
+@pytest.fixture
+def pingpong(tmp_path):
+    # main prints each value after sending it, pong prints its reply before sending it back
+    (tmp_path / "main.nyan").write_text(nyan(">+<+++++[>;.:<-]"), encoding="utf-8")
+    (tmp_path / "pong.nyan").write_text(nyan("'+++++[>:+.;<-]"), encoding="utf-8")
+    (tmp_path / "main.mouse").write_text("0 -> 0: pong.nyan", encoding="utf-8")
+    return tmp_path / "main.nyan"
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_hello_name(run, examples, workers):
+    path = examples / "hello name" / "main.nyan"
+    assert run(path, b"abc\n") == b"hello,abc\n\x00\n\n"
+    for _ in range(5):
+        assert run(path, b"abc\n", workers=workers) == b"hello,abc\n\x00\n\n"
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_turns(run, pingpong, workers):
+    # ; waits until receiver gives way, so cats take turns like in one process
+    expected = run(pingpong)
+    assert expected == b"\x02\x01\x03\x02\x04\x03\x05\x04\x06\x05\n\n"
+    for _ in range(3):
+        assert run(pingpong, workers=workers) == expected
+
+
+@pytest.mark.parametrize("channel_size", [2, 3])
+def test_channel_size(run, pingpong, channel_size):
+    # cats run at the same time while channel has room, so their output may interleave otherwise
+    output = run(pingpong, workers=2, channel_size=channel_size)
+    assert sorted(output) == sorted(run(pingpong, channel_size=channel_size))
+    assert output.endswith(b"\n\n")